@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
-from .models import User
+from .models import BlacklistedToken, Household, User
 
 
 @admin.register(User)
@@ -17,7 +17,7 @@ class UserAdmin(BaseUserAdmin):
     fieldsets = (
         (None, {'fields': ('username', 'email', 'password')}),
         (_('Informações Pessoais'), {'fields': ('first_name', 'last_name', 'phone', 'birth_date')}),
-        (_('Relacionamento'), {'fields': ('partner',)}),
+        (_('Relacionamento'), {'fields': ('household', 'partner')}),
         (_('Permissões'), {
             'fields': ('is_active', 'is_staff', 'is_superuser', 'groups', 'user_permissions'),
         }),
@@ -31,8 +31,45 @@ class UserAdmin(BaseUserAdmin):
         }),
     )
     
-    readonly_fields = ('date_joined', 'last_login', 'created_at', 'updated_at')
+    # O grupo muda pelo parceiro (Household.add_member), que também move os lançamentos
+    readonly_fields = ('household', 'date_joined', 'last_login', 'created_at', 'updated_at')
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('partner')
+        return super().get_queryset(request).select_related('partner', 'household')
 
+
+class MemberInline(admin.TabularInline):
+    model = User
+    fk_name = 'household'
+    fields = ('email', 'first_name', 'last_name')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+    show_change_link = True
+    
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Household)
+class HouseholdAdmin(admin.ModelAdmin):
+    """
+    Grupos familiares e seus membros.
+    """
+    list_display = ('__str__', 'created_at')
+    search_fields = ('name', 'members__email')
+    inlines = [MemberInline]
+
+
+@admin.register(BlacklistedToken)
+class BlacklistedTokenAdmin(admin.ModelAdmin):
+    """
+    Registro durável dos refresh tokens revogados (somente leitura).
+    """
+    list_display = ('jti', 'user', 'blacklisted_at', 'expires_at')
+    search_fields = ('jti', 'user__email')
+    list_select_related = ('user',)
+    readonly_fields = ('jti', 'user', 'blacklisted_at', 'expires_at')
+    
+    def has_add_permission(self, request):
+        return False
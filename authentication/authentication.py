@@ -0,0 +1,55 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication as BaseJWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class JWTAuthentication(BaseJWTAuthentication):
+    """
+    Autenticação JWT que carrega o grupo familiar junto com o usuário, na mesma
+    consulta, já que quase toda view financeira filtra ou decide por ele.
+    """
+    
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+        
+        try:
+            user = self.user_model.objects.select_related('household').get(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+        
+        return user
+
+
+class QueryStringJWTAuthentication(JWTAuthentication):
+    """
+    Aceita também o token de acesso no parâmetro `access_token`, para clientes que
+    não enviam cabeçalhos (EventSource do navegador). Usada apenas no stream de
+    eventos; o log de requisições registra o caminho sem a query string.
+    """
+    query_param = 'access_token'
+    
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            return result
+        
+        raw_token = request.query_params.get(self.query_param)
+        if not raw_token:
+            return None
+        validated_token = self.get_validated_token(raw_token.encode())
+        return self.get_user(validated_token), validated_token
@@ -0,0 +1,104 @@
+"""
+Lista de refresh tokens revogados.
+
+Cada token revogado é gravado no cache com a chave `jwt-blacklist:<jti>` e TTL
+igual ao tempo de vida que ainda resta ao token, de modo que a consulta é uma
+leitura de chave e as entradas somem sozinhas quando o token expira.
+
+O cache não é durável (reinício, LocMemCache por processo, despejo por memória),
+então a revogação também é gravada em BlacklistedToken. Em uma falta no cache a
+tabela é consultada pelo `jti` (índice único) e, se o token estiver lá, o cache
+é preenchido de novo. Linhas de tokens já expirados não têm mais utilidade e são
+removidas por `sweep_expired`.
+"""
+import math
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError
+from django.utils import timezone
+
+from monitoring.metrics import record_cache_access
+
+from .models import BlacklistedToken
+
+KEY_PREFIX = 'jwt-blacklist:'
+
+
+def get_cache():
+    return caches[settings.JWT_BLACKLIST_CACHE]
+
+
+def cache_key(jti):
+    return f'{KEY_PREFIX}{jti}'
+
+
+def remaining_seconds(expires_at, now=None):
+    """Segundos até `expires_at` (arredondado para cima); 0 se já expirou."""
+    now = now or timezone.now()
+    return max(math.ceil((expires_at - now).total_seconds()), 0)
+
+
+def expiration_of(payload):
+    return datetime.fromtimestamp(payload['exp'], tz=dt_timezone.utc)
+
+
+def blacklist(jti, expires_at, user_id=None):
+    """
+    Revoga o token `jti` até `expires_at`. Tokens já expirados não precisam ser
+    registrados: a verificação de `exp` já os rejeita.
+    """
+    ttl = remaining_seconds(expires_at)
+    if not ttl:
+        return False
+    
+    get_cache().set(cache_key(jti), 1, timeout=ttl)
+    if settings.JWT_BLACKLIST_DB_FALLBACK:
+        try:
+            BlacklistedToken.objects.get_or_create(
+                jti=jti,
+                defaults={'user_id': user_id, 'expires_at': expires_at}
+            )
+        except IntegrityError:
+            # Revogação concorrente do mesmo token
+            pass
+    return True
+
+
+def is_blacklisted(jti):
+    """Consulta o cache e, em uma falta, o registro durável."""
+    cache = get_cache()
+    cached = cache.get(cache_key(jti))
+    record_cache_access(bool(cached), 'jwt_blacklist')
+    if cached:
+        return True
+    if not settings.JWT_BLACKLIST_DB_FALLBACK:
+        return False
+    
+    expires_at = BlacklistedToken.objects.filter(
+        jti=jti, expires_at__gt=timezone.now()
+    ).values_list('expires_at', flat=True).first()
+    if expires_at is None:
+        return False
+    
+    ttl = remaining_seconds(expires_at)
+    if ttl:
+        cache.set(cache_key(jti), 1, timeout=ttl)
+    return True
+
+
+def sweep_expired(now=None, batch_size=5000):
+    """
+    Remove do registro durável os tokens já expirados, em lotes.
+    Retorna o número de linhas removidas.
+    """
+    now = now or timezone.now()
+    removed = 0
+    while True:
+        ids = list(
+            BlacklistedToken.objects.filter(expires_at__lte=now).values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return removed
+        removed += BlacklistedToken.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,103 @@
+"""
+Perfil de hash de senhas do login.
+
+O hasher padrão é o scrypt da stdlib (`hashlib.scrypt`) com custo configurável
+em settings (PASSWORD_SCRYPT_*), ajustado para uma latência alvo com o comando
+`benchmark_password_hashers --target-ms`. Hashes antigos (PBKDF2) continuam
+válidos e são regravados com o perfil atual no próximo login, assim como hashes
+scrypt com parâmetros diferentes dos configurados.
+
+O cálculo do scrypt roda em um pool de threads limitado (PASSWORD_HASHING_WORKERS),
+que limita o número de derivações simultâneas (cada uma reserva 128 * N * r bytes
+de memória). O login é uma view DRF síncrona: a thread do request espera a
+derivação, mas o `hashlib.scrypt` libera o GIL, então as demais threads do worker
+continuam atendendo requests enquanto isso.
+"""
+import base64
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+_executor = None
+_executor_lock = threading.Lock()
+_worker = threading.local()
+
+
+def _mark_worker():
+    _worker.active = True
+
+
+def in_worker():
+    return getattr(_worker, 'active', False)
+
+
+def pool_size():
+    return settings.PASSWORD_HASHING_WORKERS or os.cpu_count() or 1
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=pool_size(),
+                thread_name_prefix='password-hashing',
+                initializer=_mark_worker
+            )
+        return _executor
+
+
+def run_in_pool(function, *args, **kwargs):
+    """
+    Executa `function` no pool de hashing e aguarda o resultado. Chamadas feitas de
+    dentro de uma thread do pool rodam direto, para não esperar pelo próprio pool.
+    """
+    if in_worker() or not settings.PASSWORD_HASHING_POOL:
+        return function(*args, **kwargs)
+    return get_executor().submit(function, *args, **kwargs).result()
+
+
+def scrypt_maxmem(n, r, p):
+    # Memória do scrypt (128 * N * r, mais 128 * r * p) com folga para o OpenSSL
+    return 128 * r * (n + p) + 2 ** 20
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    """
+    Scrypt com parâmetros lidos de settings e derivação no pool de hashing.
+    Usa o mesmo formato e nome de algoritmo do hasher do Django.
+    """
+    
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_SCRYPT_WORK_FACTOR
+    
+    @property
+    def block_size(self):
+        return settings.PASSWORD_SCRYPT_BLOCK_SIZE
+    
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_SCRYPT_PARALLELISM
+    
+    def encode(self, password, salt, n=None, r=None, p=None):
+        self._check_encode_args(password, salt)
+        n = n or self.work_factor
+        r = r or self.block_size
+        p = p or self.parallelism
+        hash_ = run_in_pool(
+            hashlib.scrypt,
+            password.encode(),
+            salt=salt.encode(),
+            n=n,
+            r=r,
+            p=p,
+            maxmem=scrypt_maxmem(n, r, p),
+            dklen=64
+        )
+        hash_ = base64.b64encode(hash_).decode('ascii').strip()
+        return '%s$%d$%s$%d$%d$%s' % (self.algorithm, n, salt, r, p, hash_)
@@ -0,0 +1,99 @@
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from authentication.hashers import ScryptPasswordHasher
+
+PASSWORD = 'senha-de-teste-123'
+
+
+def logins_per_second(hasher, encoded, seconds, threads=1):
+    """Verificações de senha por segundo durante `seconds`, com `threads` em paralelo."""
+    def worker():
+        done = 0
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            hasher.verify(PASSWORD, encoded)
+            done += 1
+        return done
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        total = sum(executor.map(lambda _: worker(), range(threads)))
+    return total / (time.perf_counter() - started)
+
+
+def encode_ms(hasher, rounds=3):
+    salt = hasher.salt()
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        hasher.encode(PASSWORD, salt)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+class Command(BaseCommand):
+    """
+    Compara o PBKDF2 padrão do Django com o perfil scrypt configurado e sugere o
+    fator de custo do scrypt para uma latência alvo.
+    """
+    help = 'Mede logins/s por núcleo com PBKDF2 e com o perfil scrypt; --target-ms sugere PASSWORD_SCRYPT_WORK_FACTOR.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=2.0, help='Duração de cada medição')
+        parser.add_argument('--threads', type=int, default=os.cpu_count() or 1,
+                            help='Threads simultâneas na medição de vazão total')
+        parser.add_argument('--target-ms', type=float, help='Latência alvo de um login para ajustar o scrypt')
+    
+    def handle(self, *args, **options):
+        seconds, threads = options['seconds'], options['threads']
+        cores = min(threads, os.cpu_count() or 1)
+        
+        # Mede o custo puro dos hashers, sem o pool da aplicação
+        with override_settings(PASSWORD_HASHING_POOL=False):
+            hashers = [
+                (f'PBKDF2 ({PBKDF2PasswordHasher.iterations} iterações)', PBKDF2PasswordHasher()),
+                (f'scrypt (N={settings.PASSWORD_SCRYPT_WORK_FACTOR}, r={settings.PASSWORD_SCRYPT_BLOCK_SIZE}, '
+                 f'p={settings.PASSWORD_SCRYPT_PARALLELISM})', ScryptPasswordHasher()),
+            ]
+            
+            self.stdout.write(f'{"hasher":<40}{"ms/login":>10}{"logins/s/núcleo":>18}{f"total ({threads} threads)":>22}')
+            results = []
+            for name, hasher in hashers:
+                encoded = hasher.encode(PASSWORD, hasher.salt())
+                single = logins_per_second(hasher, encoded, seconds)
+                total = logins_per_second(hasher, encoded, seconds, threads)
+                results.append(single)
+                self.stdout.write(f'{name:<40}{1000 / single:>10.1f}{single:>18.1f}{total:>22.1f}')
+                if threads > 1:
+                    self.stdout.write(f'{"":<40}{"":>10}{total / cores:>18.1f}  (paralelo, por núcleo)')
+            
+            self.stdout.write(f'Ganho do perfil scrypt: {results[1] / results[0]:.1f}x')
+            
+            if options['target_ms']:
+                self.tune(options['target_ms'])
+    
+    def tune(self, target_ms):
+        hasher = ScryptPasswordHasher()
+        chosen = None
+        work_factor = 2 ** 12
+        while work_factor <= 2 ** 20:
+            with override_settings(PASSWORD_SCRYPT_WORK_FACTOR=work_factor):
+                elapsed = encode_ms(hasher)
+            self.stdout.write(f'N={work_factor:<8} {elapsed:>8.1f} ms')
+            if elapsed > target_ms:
+                break
+            chosen = work_factor
+            work_factor *= 2
+        
+        if chosen is None:
+            self.stdout.write(self.style.WARNING(f'Nenhum fator de custo fica abaixo de {target_ms} ms.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Sugestão para {target_ms} ms: PASSWORD_SCRYPT_WORK_FACTOR={chosen}'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from authentication.blacklist import sweep_expired
+
+
+class Command(BaseCommand):
+    """
+    Remove os refresh tokens revogados que já expiraram (rodar periodicamente, ex.: via cron).
+    """
+    help = 'Remove do banco os tokens revogados cujo prazo de validade já passou.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+    
+    def handle(self, *args, **options):
+        removed = sweep_expired(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{removed} tokens expirados removidos.'))
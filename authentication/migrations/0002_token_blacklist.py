@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-19 19:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlacklistedToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jti', models.CharField(max_length=255, unique=True, verbose_name='Identificador (jti)')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='Expira em')),
+                ('blacklisted_at', models.DateTimeField(auto_now_add=True, verbose_name='Revogado em')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='blacklisted_tokens', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Token Revogado',
+                'verbose_name_plural': 'Tokens Revogados',
+                'ordering': ['-blacklisted_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.4 on 2026-10-19 19:42
+
+import django.db.models.deletion
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def create_households(apps, schema_editor):
+    """
+    Um grupo por componente de parceiros: usuários ligados por `partner` (em
+    qualquer direção) ficam no mesmo grupo; os demais ganham um grupo próprio.
+    """
+    User = apps.get_model('authentication', 'User')
+    Household = apps.get_model('authentication', 'Household')
+    partners = dict(User.objects.values_list('id', 'partner_id'))
+    
+    parent = {user_id: user_id for user_id in partners}
+    
+    def find(user_id):
+        while parent[user_id] != user_id:
+            parent[user_id] = parent[parent[user_id]]
+            user_id = parent[user_id]
+        return user_id
+    
+    for user_id, partner_id in partners.items():
+        if partner_id in parent:
+            parent[find(user_id)] = find(partner_id)
+    
+    groups = defaultdict(list)
+    for user_id in partners:
+        groups[find(user_id)].append(user_id)
+    for members in groups.values():
+        household = Household.objects.create()
+        User.objects.filter(id__in=members).update(household=household)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_token_blacklist'),
+    ]
+    
+    operations = [
+        migrations.CreateModel(
+            name='Household',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(blank=True, max_length=100, verbose_name='Nome')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+            ],
+            options={
+                'verbose_name': 'Grupo Familiar',
+                'verbose_name_plural': 'Grupos Familiares',
+                'ordering': ['name', 'id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='household',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='members', to='authentication.household', verbose_name='Grupo Familiar'),
+        ),
+        migrations.RunPython(create_households, migrations.RunPython.noop),
+    ]
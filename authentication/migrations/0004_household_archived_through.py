@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 19:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_household'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='household',
+            name='archived_through',
+            field=models.DateField(blank=True, null=True, verbose_name='Arquivado até'),
+        ),
+    ]
@@ -1,5 +1,42 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+
+from .signals import household_changed
+
+
+class Household(models.Model):
+    """
+    Grupo de usuários que compartilham os dados financeiros (casal, família).
+    
+    Cada lançamento guarda o grupo em que foi criado (`household_id`), de modo que
+    as listagens filtram por uma única igualdade indexada em vez de uma lista de
+    usuários.
+    """
+    name = models.CharField(max_length=100, blank=True, verbose_name='Nome')
+    # Data do lançamento arquivado mais recente do grupo (None = nada arquivado)
+    archived_through = models.DateField(blank=True, null=True, verbose_name='Arquivado até')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
+    
+    class Meta:
+        verbose_name = 'Grupo Familiar'
+        verbose_name_plural = 'Grupos Familiares'
+        ordering = ['name', 'id']
+    
+    def __str__(self):
+        return self.name or f"Grupo #{self.pk}"
+    
+    def add_member(self, user):
+        """
+        Move o usuário para este grupo, levando junto os lançamentos criados por ele.
+        """
+        previous_id = user.household_id
+        if previous_id == self.pk:
+            return
+        
+        with transaction.atomic():
+            user.household = self
+            user.save(update_fields=['household'])
+            household_changed.send(sender=type(user), user=user, previous_id=previous_id)
 
 
 class User(AbstractUser):
@@ -16,6 +53,16 @@ class User(AbstractUser):
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
     is_active = models.BooleanField(default=True, verbose_name='Ativo')
     
+    # Grupo com quem os dados financeiros são compartilhados
+    household = models.ForeignKey(
+        Household,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='members',
+        verbose_name='Grupo Familiar'
+    )
+    
     # Campo para identificar o parceiro/cônjuge no sistema compartilhado
     partner = models.ForeignKey(
         'self', 
@@ -40,13 +87,48 @@ class User(AbstractUser):
     def full_name(self):
         return f"{self.first_name} {self.last_name}".strip()
     
+    def save(self, *args, **kwargs):
+        # Todo usuário pertence a um grupo; sem parceiro, o grupo tem só ele
+        if self.household_id is None:
+            self.household = Household.objects.create()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'household'}
+        super().save(*args, **kwargs)
+    
     def get_shared_users(self):
         """
-        Retorna lista de usuários que compartilham dados financeiros.
-        Inclui o próprio usuário e seu parceiro, se houver.
+        Retorna os usuários que compartilham dados financeiros: os membros do grupo
+        familiar (queryset, usado como subconsulta em filtros `__in`).
         """
-        users = [self]
-        if self.partner:
-            users.append(self.partner)
-        return users
+        if self.household_id is None:
+            return [self]
+        return User.objects.filter(household_id=self.household_id)
 
+
+class BlacklistedToken(models.Model):
+    """
+    Refresh token revogado (logout ou rotação), identificado pelo `jti`.
+    
+    A consulta principal é feita no cache (ver `authentication.blacklist`); esta
+    tabela é o registro durável, e as linhas vencidas são removidas pelo comando
+    `sweep_token_blacklist`.
+    """
+    jti = models.CharField(max_length=255, unique=True, verbose_name='Identificador (jti)')
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='blacklisted_tokens',
+        verbose_name='Usuário'
+    )
+    expires_at = models.DateTimeField(db_index=True, verbose_name='Expira em')
+    blacklisted_at = models.DateTimeField(auto_now_add=True, verbose_name='Revogado em')
+    
+    class Meta:
+        verbose_name = 'Token Revogado'
+        verbose_name_plural = 'Tokens Revogados'
+        ordering = ['-blacklisted_at']
+    
+    def __str__(self):
+        return self.jti
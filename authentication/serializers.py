@@ -1,8 +1,9 @@
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
 from .models import User
+from .tokens import RefreshToken
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -42,8 +43,8 @@ class UserProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'username', 'email', 'first_name', 'last_name', 'full_name', 
-                 'phone', 'birth_date', 'partner', 'partner_name', 'date_joined')
-        read_only_fields = ('id', 'username', 'date_joined')
+                 'phone', 'birth_date', 'partner', 'partner_name', 'household', 'date_joined')
+        read_only_fields = ('id', 'username', 'household', 'date_joined')
     
     def get_partner_name(self, obj):
         return obj.partner.full_name if obj.partner else None
@@ -61,6 +62,15 @@ class UserUpdateSerializer(serializers.ModelSerializer):
         if value and value == self.instance:
             raise serializers.ValidationError("Você não pode ser parceiro de si mesmo.")
         return value
+    
+    def update(self, instance, validated_data):
+        user = super().update(instance, validated_data)
+        
+        # Ao definir o parceiro, o usuário passa a compartilhar o grupo familiar dele
+        partner = validated_data.get('partner')
+        if partner and partner.household_id != user.household_id:
+            partner.household.add_member(user)
+        return user
 
 
 class ChangePasswordSerializer(serializers.Serializer):
@@ -87,6 +97,8 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """
     Serializer customizado para obtenção de tokens JWT.
     """
+    token_class = RefreshToken
+    
     def validate(self, attrs):
         data = super().validate(attrs)
         
@@ -103,6 +115,14 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         return data
 
 
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Renovação do access token; com a rotação ativa, o refresh token anterior é
+    revogado na lista em cache.
+    """
+    token_class = RefreshToken
+
+
 class PasswordResetRequestSerializer(serializers.Serializer):
     """
     Serializer para solicitação de reset de senha.
@@ -0,0 +1,4 @@
+from django.dispatch import Signal
+
+# Enviado quando um usuário muda de grupo familiar (argumentos: user, previous_id)
+household_changed = Signal()
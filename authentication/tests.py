@@ -1,3 +1,147 @@
-from django.test import TestCase
+import threading
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from . import blacklist, hashers
+from .models import BlacklistedToken, User
+from .tokens import RefreshToken
+
+
+class TokenBlacklistTests(APITestCase):
+    """
+    Revogação de refresh tokens pela lista em cache com registro no banco.
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='ana', email='ana@example.com', password='senha-segura-123',
+            first_name='Ana', last_name='Silva'
+        )
+        self.refresh = RefreshToken.for_user(self.user)
+    
+    def test_logout_blacklists_refresh_token(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post(reverse('authentication:logout'), {'refresh_token': str(self.refresh)})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(BlacklistedToken.objects.filter(jti=self.refresh['jti'], user=self.user).exists())
+        
+        response = self.client.post(reverse('authentication:token_refresh'), {'refresh': str(self.refresh)})
+        self.assertEqual(response.status_code, 401)
+    
+    def test_rotation_revokes_previous_token(self):
+        url = reverse('authentication:token_refresh')
+        response = self.client.post(url, {'refresh': str(self.refresh)})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.data)
+        rotated = response.data['refresh']
+        self.assertNotEqual(rotated, str(self.refresh))
+        
+        self.assertEqual(self.client.post(url, {'refresh': str(self.refresh)}).status_code, 401)
+        self.assertEqual(self.client.post(url, {'refresh': rotated}).status_code, 200)
+    
+    def test_cache_ttl_matches_remaining_lifetime(self):
+        self.refresh.set_exp(lifetime=timedelta(seconds=90))
+        self.assertTrue(self.refresh.blacklist())
+        
+        key = blacklist.cache_key(self.refresh['jti'])
+        expires = cache._expire_info[cache.make_key(key)]
+        remaining = expires - timezone.now().timestamp()
+        self.assertGreater(remaining, 80)
+        self.assertLessEqual(remaining, 91)
+    
+    def test_expired_token_is_not_stored(self):
+        self.assertFalse(blacklist.blacklist('expirado', timezone.now() - timedelta(seconds=1)))
+        self.assertFalse(BlacklistedToken.objects.exists())
+    
+    def test_lookup_hits_cache_without_queries(self):
+        self.refresh.blacklist()
+        with self.assertNumQueries(0):
+            self.assertTrue(blacklist.is_blacklisted(self.refresh['jti']))
+    
+    def test_database_fallback_repopulates_cache(self):
+        self.refresh.blacklist()
+        cache.clear()
+        
+        with self.assertNumQueries(1):
+            self.assertTrue(blacklist.is_blacklisted(self.refresh['jti']))
+        with self.assertNumQueries(0):
+            self.assertTrue(blacklist.is_blacklisted(self.refresh['jti']))
+        self.assertFalse(blacklist.is_blacklisted('desconhecido'))
+    
+    def test_sweep_removes_only_expired_rows(self):
+        now = timezone.now()
+        BlacklistedToken.objects.create(jti='vencido', expires_at=now - timedelta(days=1))
+        BlacklistedToken.objects.create(jti='valido', expires_at=now + timedelta(days=1))
+        
+        out = StringIO()
+        call_command('sweep_token_blacklist', batch_size=1, stdout=out)
+        self.assertIn('1 tokens', out.getvalue())
+        self.assertEqual(list(BlacklistedToken.objects.values_list('jti', flat=True)), ['valido'])
+
+
+@override_settings(PASSWORD_SCRYPT_WORK_FACTOR=2 ** 10)
+class PasswordHasherTests(APITestCase):
+    """
+    Perfil scrypt com regravação transparente dos hashes antigos no login.
+    """
+    def login(self, password='senha-segura-123'):
+        return self.client.post(reverse('authentication:login'), {'email': 'ana@example.com', 'password': password})
+    
+    def create_user(self, password):
+        return User.objects.create(
+            username='ana', email='ana@example.com', first_name='Ana', last_name='Silva', password=password
+        )
+    
+    def test_new_passwords_use_scrypt_profile(self):
+        user = User.objects.create_user(
+            username='ana', email='ana@example.com', password='senha-segura-123', first_name='Ana', last_name='Silva'
+        )
+        self.assertTrue(user.password.startswith('scrypt$1024$'))
+        self.assertTrue(user.check_password('senha-segura-123'))
+    
+    def test_pbkdf2_hash_is_upgraded_on_login(self):
+        user = self.create_user(make_password('senha-segura-123', hasher='pbkdf2_sha256'))
+        
+        self.assertEqual(self.login('senha-errada').status_code, 401)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$'))
+        
+        self.assertEqual(self.login().status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('scrypt$1024$'))
+        self.assertEqual(self.login().status_code, 200)
+    
+    def test_hash_is_upgraded_when_profile_changes(self):
+        user = self.create_user(make_password('senha-segura-123'))
+        with override_settings(PASSWORD_SCRYPT_WORK_FACTOR=2 ** 11):
+            self.assertEqual(self.login().status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('scrypt$2048$'))
+
+
+@override_settings(PASSWORD_SCRYPT_WORK_FACTOR=2 ** 10)
+class HashingPoolTests(SimpleTestCase):
+    """
+    Derivações executadas no pool de threads limitado.
+    """
+    def test_scrypt_runs_in_pool(self):
+        threads = []
+        
+        def record(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return b'x' * 64
+        
+        with self.settings(PASSWORD_HASHING_POOL=True):
+            hashers.run_in_pool(record)
+            self.assertTrue(threads[-1].startswith('password-hashing'))
+        with self.settings(PASSWORD_HASHING_POOL=False):
+            hashers.run_in_pool(record)
+            self.assertEqual(threads[-1], threading.current_thread().name)
@@ -0,0 +1,33 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+
+from . import blacklist as token_blacklist
+
+
+class RefreshToken(BaseRefreshToken):
+    """
+    Refresh token com revogação pela lista em cache (`authentication.blacklist`),
+    no lugar do app `token_blacklist` do simplejwt, que grava uma linha por token
+    emitido. Tokens emitidos não são registrados; apenas os revogados.
+    """
+    
+    def verify(self, *args, **kwargs):
+        self.check_blacklist()
+        super().verify(*args, **kwargs)
+    
+    def check_blacklist(self):
+        if token_blacklist.is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_('Token is blacklisted'))
+    
+    def blacklist(self):
+        return token_blacklist.blacklist(
+            self.payload[api_settings.JTI_CLAIM],
+            token_blacklist.expiration_of(self.payload),
+            self.payload.get(api_settings.USER_ID_CLAIM)
+        )
+    
+    def outstand(self):
+        # Sem registro de tokens emitidos: a rotação só revoga o token anterior
+        return None
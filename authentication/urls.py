@@ -1,8 +1,8 @@
 from django.urls import path
-from rest_framework_simplejwt.views import TokenRefreshView
 from .views import (
     UserRegistrationView,
     CustomTokenObtainPairView,
+    CustomTokenRefreshView,
     UserProfileView,
     UserUpdateView,
     ChangePasswordView,
@@ -19,7 +19,7 @@ urlpatterns = [
     # Autenticação
     path('register/', UserRegistrationView.as_view(), name='register'),
     path('login/', CustomTokenObtainPairView.as_view(), name='login'),
-    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('token/refresh/', CustomTokenRefreshView.as_view(), name='token_refresh'),
     path('logout/', LogoutView.as_view(), name='logout'),
     
     # Perfil do usuário
@@ -3,6 +3,9 @@ ASGI config for backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+O stream de eventos (/api/financial/events/) mantém conexões abertas e precisa
+ser servido por aqui, ex.: ``uvicorn backend.asgi:application``.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -14,3 +17,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_asgi_application()
+
+# Aquecimento antes de aceitar tráfego (STARTUP_WARMUP)
+from monitoring.startup import warm_up_on_boot  # noqa: E402
+
+warm_up_on_boot()
@@ -0,0 +1,134 @@
+"""
+Requisições em lote: várias leituras da API em uma única ida e volta HTTP.
+
+As sub-requisições são resolvidas pelo URLconf e executadas no mesmo processo e na
+mesma conexão de banco, com o usuário já autenticado na requisição do lote (o token
+é verificado uma única vez).
+"""
+import copy
+import json
+import logging
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.http import Http404, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import permissions, serializers, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from monitoring.budgets import get_query_budget
+
+logger = logging.getLogger(__name__)
+
+
+class BatchItemSerializer(serializers.Serializer):
+    """
+    Serializer para uma sub-requisição do lote.
+    """
+    id = serializers.CharField(required=False, max_length=50)
+    method = serializers.ChoiceField(choices=['GET'], default='GET')
+    path = serializers.CharField(max_length=2000)
+    params = serializers.DictField(child=serializers.CharField(allow_blank=True), required=False)
+    
+    def validate_path(self, value):
+        if not value.startswith('/api/'):
+            raise serializers.ValidationError('Apenas caminhos da API (/api/...) são permitidos.')
+        return value
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    """
+    Serializer para o corpo do lote, limitado a BATCH_MAX_REQUESTS itens.
+    """
+    requests = BatchItemSerializer(many=True, allow_empty=False)
+    
+    def validate_requests(self, value):
+        if len(value) > settings.BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(
+                f'O lote aceita no máximo {settings.BATCH_MAX_REQUESTS} requisições.'
+            )
+        return value
+
+
+def build_subrequest(request, path, query_string):
+    """Cópia da requisição original como GET para outro caminho, já autenticada."""
+    subrequest = copy.copy(request._request)
+    subrequest.method = 'GET'
+    subrequest.path = subrequest.path_info = path
+    subrequest.META = {**request._request.META, 'REQUEST_METHOD': 'GET', 'PATH_INFO': path,
+                       'QUERY_STRING': query_string}
+    subrequest.GET = QueryDict(query_string)
+    # O DRF usa este usuário/token em vez de autenticar de novo
+    subrequest._force_auth_user = request.user
+    subrequest._force_auth_token = request.auth
+    return subrequest
+
+
+def error(item_id, status_code, detail):
+    return {'id': item_id, 'status': status_code, 'body': {'detail': detail}}
+
+
+class BatchView(APIView):
+    """
+    View para requisições em lote.
+    
+    Recebe `{"requests": [{"id", "path", "params"}]}` com até BATCH_MAX_REQUESTS
+    leituras (GET) e devolve `{"responses": [{"id", "status", "body"}]}` na mesma
+    ordem. Cada item tem seu próprio status; falhas não interrompem os demais.
+    O orçamento de consultas do lote é a soma dos orçamentos das views chamadas.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        serializer = BatchRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        responses = []
+        budgets = []
+        for index, item in enumerate(serializer.validated_data['requests']):
+            item_id = item.get('id', str(index))
+            url = urlsplit(item['path'])
+            query_string = '&'.join(part for part in (url.query, urlencode(item.get('params', {}))) if part)
+            
+            try:
+                match = resolve(url.path)
+            except Resolver404:
+                responses.append(error(item_id, status.HTTP_404_NOT_FOUND, 'Caminho não encontrado.'))
+                continue
+            if getattr(match.func, 'view_class', None) is BatchView:
+                responses.append(error(item_id, status.HTTP_400_BAD_REQUEST, 'Lotes não podem ser aninhados.'))
+                continue
+            
+            subrequest = build_subrequest(request, url.path, query_string)
+            subrequest.resolver_match = match
+            try:
+                response = match.func(subrequest, *match.args, **match.kwargs)
+            except Http404:
+                responses.append(error(item_id, status.HTTP_404_NOT_FOUND, 'Não encontrado.'))
+                continue
+            except Exception:
+                logger.exception('Falha na sub-requisição %s do lote', url.path)
+                responses.append(error(item_id, status.HTTP_500_INTERNAL_SERVER_ERROR, 'Erro interno.'))
+                continue
+            budgets.append(get_query_budget(match.func))
+            
+            if response.streaming:
+                response.close()
+                responses.append(error(item_id, status.HTTP_400_BAD_REQUEST, 'Respostas em stream não são suportadas.'))
+                continue
+            responses.append({'id': item_id, 'status': response.status_code, 'body': self.response_body(response)})
+        
+        # Lido pelo QueryBudgetMiddleware após a resposta
+        if budgets and None not in budgets:
+            request._request.query_budget = sum(budgets)
+        return Response({'responses': responses})
+    
+    def response_body(self, response):
+        # Respostas do DRF entram sem renderizar e são serializadas junto com o lote
+        if isinstance(response, Response):
+            return response.data
+        content = response.content.decode(response.charset or 'utf-8')
+        if response.get('Content-Type', '').startswith('application/json'):
+            return json.loads(content)
+        return content
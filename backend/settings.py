@@ -49,15 +49,19 @@ INSTALLED_APPS = [
     'authentication',
     'financial',
     'reports',
+    'monitoring',
 ]
 
 MIDDLEWARE = [
+    'monitoring.middleware.MetricsMiddleware',
+    'monitoring.middleware.QueryBudgetMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'monitoring.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -93,6 +97,23 @@ DATABASES = {
 }
 
 
+# Hash de senhas: scrypt com custo ajustável (ver `benchmark_password_hashers --target-ms`).
+# Hashes PBKDF2 existentes continuam aceitos e são regravados no próximo login.
+PASSWORD_HASHERS = [
+    'authentication.hashers.ScryptPasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+PASSWORD_SCRYPT_WORK_FACTOR = config('PASSWORD_SCRYPT_WORK_FACTOR', default=2 ** 15, cast=int)
+PASSWORD_SCRYPT_BLOCK_SIZE = config('PASSWORD_SCRYPT_BLOCK_SIZE', default=8, cast=int)
+PASSWORD_SCRYPT_PARALLELISM = config('PASSWORD_SCRYPT_PARALLELISM', default=1, cast=int)
+
+# Pool de threads que executa as derivações de senha (0 = número de CPUs)
+PASSWORD_HASHING_POOL = config('PASSWORD_HASHING_POOL', default=True, cast=bool)
+PASSWORD_HASHING_WORKERS = config('PASSWORD_HASHING_WORKERS', default=0, cast=int)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -144,7 +165,7 @@ AUTH_USER_MODEL = 'authentication.User'
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.authentication.JWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -190,6 +211,19 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 
+# Cache (lista de refresh tokens revogados, date_hierarchy do admin)
+# Em produção com vários workers use um cache compartilhado (ex.: Redis/Memcached)
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='gestor-financeiro'),
+    }
+}
+
+# Refresh tokens revogados: consultados no cache abaixo, com o banco como registro durável
+JWT_BLACKLIST_CACHE = config('JWT_BLACKLIST_CACHE', default='default')
+JWT_BLACKLIST_DB_FALLBACK = config('JWT_BLACKLIST_DB_FALLBACK', default=True, cast=bool)
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -212,3 +246,78 @@ CORS_ALLOW_HEADERS = [
     'x-requested-with',
 ]
 
+# Monitoramento de consultas SQL por requisição
+# Quando ativo, requisições que estouram o orçamento da view levantam QueryBudgetExceeded
+QUERY_BUDGET_STRICT = config('QUERY_BUDGET_STRICT', default=False, cast=bool)
+
+# Profiling sob demanda (header X-Profile ou ?profile=1, apenas staff)
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=False, cast=bool)
+PROFILING_DIR = config('PROFILING_DIR', default=str(BASE_DIR / 'profiles'))
+PROFILING_MAX_FILES = config('PROFILING_MAX_FILES', default=50, cast=int)
+
+# Métricas Prometheus (/metrics), agregadas entre workers via diretório compartilhado
+METRICS_DIR = config('METRICS_DIR', default=str(BASE_DIR / 'metrics_data'))
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=1.0, cast=float)
+# Sem METRICS_TOKEN, /metrics só responde com DEBUG ativo ou para usuários staff
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Testes: METRICS_DIR em um diretório temporário (ver backend/test_runner.py)
+TEST_RUNNER = 'backend.test_runner.TestRunner'
+
+# Admin para tabelas grandes: acima deste número estimado de linhas o changelist
+# sem filtros não executa COUNT(*); o date_hierarchy fica em cache pelo tempo abaixo
+ADMIN_ESTIMATED_COUNT_THRESHOLD = config('ADMIN_ESTIMATED_COUNT_THRESHOLD', default=10000, cast=int)
+ADMIN_DATE_HIERARCHY_CACHE_TIMEOUT = config('ADMIN_DATE_HIERARCHY_CACHE_TIMEOUT', default=600, cast=int)
+
+# Simulação de cenários do planejamento: lotes a partir deste tamanho são
+# distribuídos em um pool de processos com o número de workers abaixo (0 = CPUs)
+PLANNING_SCENARIO_POOL_THRESHOLD = config('PLANNING_SCENARIO_POOL_THRESHOLD', default=16, cast=int)
+PLANNING_SCENARIO_WORKERS = config('PLANNING_SCENARIO_WORKERS', default=0, cast=int)
+
+# Arquivo de lançamentos: únicos e pagos de meses fechados, mais antigos que este
+# número de dias, são movidos para as tabelas de arquivo (comando archive_entries)
+ARCHIVE_RETENTION_DAYS = config('ARCHIVE_RETENTION_DAYS', default=730, cast=int)
+
+# Eventos ao vivo (SSE em /api/financial/events/, servido pelo ASGI)
+# O broker local distribui em memória por processo; com vários workers, use um pub/sub compartilhado
+EVENTS_BROKER = config('EVENTS_BROKER', default='financial.events.LocalBroker')
+EVENTS_HEARTBEAT_SECONDS = config('EVENTS_HEARTBEAT_SECONDS', default=15.0, cast=float)
+EVENTS_QUEUE_SIZE = config('EVENTS_QUEUE_SIZE', default=100, cast=int)
+
+# Requisições em lote (/api/batch/): máximo de sub-requisições por lote
+BATCH_MAX_REQUESTS = config('BATCH_MAX_REQUESTS', default=10, cast=int)
+
+# Moedas: cotações (CSV ou JSON com currency,date,rate) carregadas pelo comando
+# load_exchange_rates; o cache de cotações de cada processo é renovado após o tempo abaixo
+EXCHANGE_RATES_FILE = config('EXCHANGE_RATES_FILE', default=str(BASE_DIR / 'exchange_rates.csv'))
+EXCHANGE_RATE_CACHE_SECONDS = config('EXCHANGE_RATE_CACHE_SECONDS', default=300, cast=int)
+
+# Inicialização dos workers: aquece URLconf e serializers antes do primeiro request
+# (custo do boot medido com o comando startup_benchmark)
+STARTUP_WARMUP = config('STARTUP_WARMUP', default=True, cast=bool)
+
+# E-mail (lembretes de vencimento)
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='Gestor Financeiro <nao-responda@localhost>')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'monitoring': {
+            'handlers': ['console'],
+            'level': config('MONITORING_LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+    },
+}
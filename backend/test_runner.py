@@ -0,0 +1,34 @@
+"""
+Runner dos testes do projeto (TEST_RUNNER).
+"""
+import logging
+import shutil
+import tempfile
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Executa a suíte com METRICS_DIR em um diretório temporário: os arquivos de
+    métricas gravados pelos requests dos testes não vão para `BASE_DIR/metrics_data`.
+    
+    As linhas JSON do logger `monitoring` (uma por request) também são silenciadas;
+    os testes que as verificam usam assertLogs, que instala o próprio handler.
+    """
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.metrics_dir = tempfile.mkdtemp(prefix='metrics-test-')
+        self.test_settings = override_settings(METRICS_DIR=self.metrics_dir)
+        self.test_settings.enable()
+        
+        monitoring_logger = logging.getLogger('monitoring')
+        self.monitoring_handlers = monitoring_logger.handlers
+        monitoring_logger.handlers = [logging.NullHandler()]
+    
+    def teardown_test_environment(self, **kwargs):
+        logging.getLogger('monitoring').handlers = self.monitoring_handlers
+        self.test_settings.disable()
+        shutil.rmtree(self.metrics_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
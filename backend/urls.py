@@ -21,6 +21,9 @@ from django.conf.urls.static import static
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from monitoring.views import metrics_view
+
+from .batch import BatchView
 
 
 @api_view(['GET'])
@@ -35,7 +38,9 @@ def api_root(request):
         'endpoints': {
             'authentication': '/api/auth/',
             'financial': '/api/financial/',
+            'batch': '/api/batch/',
             'reports': '/api/reports/',
+            'metrics': '/metrics',
             'admin': '/admin/',
             'docs': '/api/docs/',
         },
@@ -50,6 +55,12 @@ urlpatterns = [
     # API Root
     path('api/', api_root, name='api_root'),
     
+    # Várias leituras da API em uma única requisição
+    path('api/batch/', BatchView.as_view(), name='batch'),
+    
+    # Métricas no formato Prometheus
+    path('metrics', metrics_view, name='metrics'),
+    
     # Authentication endpoints
     path('api/auth/', include('authentication.urls')),
     
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+# Aquecimento antes de aceitar tráfego (STARTUP_WARMUP)
+from monitoring.startup import warm_up_on_boot  # noqa: E402
+
+warm_up_on_boot()
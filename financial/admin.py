@@ -1,7 +1,149 @@
-from django.contrib import admin
+import hashlib
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ChangeList
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.db.models import Sum, Count, Min, Max, F, Value, QuerySet
+from django.db.models.functions import Coalesce
+from django.utils.functional import cached_property
 from django.utils.html import format_html
-from django.db.models import Sum
-from .models import Category, Income, Expense, CashFlow, FinancialSummary
+from monitoring.metrics import record_cache_access
+from . import budgets, currency, ledger, periods, rollups, sync
+from .models import Category, Income, Expense, CashFlow, FinancialSummary, MonthClose, ExchangeRate, Budget
+
+# Sentinela para distinguir uma falta no cache de um valor None cacheado
+MISSING = object()
+
+
+def format_money(amount, code=currency.BASE_CURRENCY):
+    prefix = 'R$' if code == currency.BASE_CURRENCY else code
+    return f"{prefix} {amount:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+
+
+def estimate_row_count(queryset):
+    """
+    Estimativa barata do número de linhas da tabela a partir das estatísticas do banco.
+    Retorna None quando o banco não oferece estatísticas (ex.: SQLite sem ANALYZE).
+    """
+    table = queryset.model._meta.db_table
+    connection = connections[queryset.db]
+    
+    if connection.vendor == 'postgresql':
+        sql, params = 'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table]
+    elif connection.vendor == 'mysql':
+        sql, params = 'SELECT table_rows FROM information_schema.tables WHERE table_name = %s', [table]
+    elif connection.vendor == 'sqlite':
+        sql, params = 'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table]
+    else:
+        return None
+    
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+    except Exception:
+        # sqlite_stat1 só existe depois de um ANALYZE
+        return None
+    
+    if not row or row[0] is None:
+        return None
+    # No SQLite a coluna `stat` começa pelo número de linhas ("12345 1")
+    return int(str(row[0]).split()[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginador para tabelas grandes.
+    
+    Sem filtros, usa a estimativa de linhas do banco em vez de COUNT(*). Com filtros,
+    conta e soma `sum_field` na mesma consulta agregada, guardando o resultado em
+    `totals` para o rodapé do changelist.
+    """
+    sum_field = 'amount'
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.totals = None
+        self.estimated = False
+    
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        threshold = getattr(settings, 'ADMIN_ESTIMATED_COUNT_THRESHOLD', 10000)
+        
+        if not queryset.query.where:
+            estimate = estimate_row_count(queryset)
+            if estimate is not None and estimate >= threshold:
+                self.estimated = True
+                return estimate
+        
+        self.totals = queryset.order_by().aggregate(
+            count=Count('pk'),
+            # Soma na moeda base: valores em moeda estrangeira convertidos na consulta
+            total=Coalesce(Sum(currency.converted(amount=F(self.sum_field))), Decimal('0')),
+        )
+        return self.totals['count']
+
+
+class CachedDateHierarchyQuerySet(QuerySet):
+    """
+    QuerySet usado pelo changelist para cachear as consultas do date_hierarchy
+    (Min/Max da data e datas distintas), que varrem toda a tabela filtrada.
+    """
+    def _cache_key(self, *parts):
+        sql, params = self.query.sql_with_params()
+        raw = repr((self.model._meta.label, sql, params) + parts)
+        return 'admin-date-hierarchy:' + hashlib.md5(raw.encode()).hexdigest()
+    
+    def _cached(self, key, compute):
+        value = cache.get(key, MISSING)
+        record_cache_access(value is not MISSING, 'admin_date_hierarchy')
+        if value is MISSING:
+            value = compute()
+            cache.set(key, value, getattr(settings, 'ADMIN_DATE_HIERARCHY_CACHE_TIMEOUT', 600))
+        return value
+    
+    def dates(self, field_name, kind, order='ASC'):
+        parent = super()
+        return self._cached(
+            self._cache_key('dates', field_name, kind, order),
+            lambda: list(parent.dates(field_name, kind, order))
+        )
+    
+    def aggregate(self, *args, **kwargs):
+        expressions = list(args) + list(kwargs.values())
+        if not expressions or not all(isinstance(expr, (Min, Max)) for expr in expressions):
+            return super().aggregate(*args, **kwargs)
+        
+        parent = super()
+        return self._cached(
+            self._cache_key('aggregate', sorted(kwargs), [repr(expr) for expr in expressions]),
+            lambda: parent.aggregate(*args, **kwargs)
+        )
+
+
+class LargeTableChangeList(ChangeList):
+    """
+    ChangeList que troca o queryset pela versão com date_hierarchy cacheado.
+    """
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        return CachedDateHierarchyQuerySet(
+            model=queryset.model, query=queryset.query.chain(), using=queryset._db, hints=queryset._hints
+        )
+    
+    @property
+    def totals_display(self):
+        totals = self.paginator.totals
+        if totals is None:
+            return None
+        # Soma já convertida para a moeda base (ver EstimatedCountPaginator)
+        return format_money(totals['total'])
 
 
 @admin.register(Category)
@@ -10,6 +152,7 @@ class CategoryAdmin(admin.ModelAdmin):
     Configuração do admin para categorias.
     """
     list_display = ('name', 'type', 'color_display', 'is_default', 'created_by', 'created_at')
+    list_select_related = ('created_by',)
     list_filter = ('type', 'is_default', 'created_at')
     search_fields = ('name', 'created_by__first_name', 'created_by__last_name')
     ordering = ('type', 'name')
@@ -26,16 +169,23 @@ class CategoryAdmin(admin.ModelAdmin):
 class BaseFinancialEntryAdmin(admin.ModelAdmin):
     """
     Admin base para receitas e despesas.
+    
+    Preparado para tabelas grandes: contagem estimada sem filtros, date_hierarchy
+    cacheado e rodapé com soma/contagem do filtro atual em uma única agregação.
     """
     list_display = ('description', 'amount_display', 'entry_type', 'status', 'responsible', 'due_day', 'created_by')
-    list_filter = ('entry_type', 'status', 'responsible', 'created_at', 'category')
+    list_select_related = ('category', 'created_by')
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    change_list_template = 'admin/financial/entry_change_list.html'
+    list_filter = ('entry_type', 'status', 'responsible', 'currency', 'created_at', 'category')
     search_fields = ('description', 'created_by__first_name', 'created_by__last_name')
     date_hierarchy = 'entry_date'
     ordering = ('-entry_date', '-created_at')
     
     fieldsets = (
         ('Informações Básicas', {
-            'fields': ('description', 'amount', 'category', 'responsible')
+            'fields': ('description', 'amount', 'currency', 'category', 'responsible')
         }),
         ('Datas e Vencimento', {
             'fields': ('entry_date', 'start_date', 'due_day')
@@ -49,22 +199,57 @@ class BaseFinancialEntryAdmin(admin.ModelAdmin):
     )
     
     def amount_display(self, obj):
-        return f"R$ {obj.amount:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+        return format_money(obj.amount, obj.currency)
     amount_display.short_description = 'Valor'
     amount_display.admin_order_field = 'amount'
     
-    def get_queryset(self, request):
-        return super().get_queryset(request).select_related('category', 'created_by')
+    def get_changelist(self, request, **kwargs):
+        return LargeTableChangeList
+    
+    def has_change_permission(self, request, obj=None):
+        # Lançamentos de meses fechados ficam somente leitura até a reabertura
+        if obj is not None and periods.is_closed(obj.created_by_id, obj.entry_date):
+            return False
+        return super().has_change_permission(request, obj)
+    
+    def has_delete_permission(self, request, obj=None):
+        if obj is not None and periods.is_closed(obj.created_by_id, obj.entry_date):
+            return False
+        return super().has_delete_permission(request, obj)
+    
+    def reject_closed_entries(self, request, queryset):
+        if periods.closed_entries(queryset).exists():
+            self.message_user(
+                request, 'A seleção contém lançamentos de meses fechados. Reabra o mês antes de alterá-los.',
+                level=messages.ERROR
+            )
+            return True
+        return False
     
     actions = ['mark_as_paid', 'mark_as_pending']
     
     def mark_as_paid(self, request, queryset):
-        updated = queryset.update(status='paid')
+        if self.reject_closed_entries(request, queryset):
+            return
+        with transaction.atomic():
+            rollups.apply_status_change(queryset, 'paid')
+            budgets.apply_status_change(queryset, 'paid')
+            ledger.apply_status_change(queryset, 'paid')
+            sync.record_queryset(self.model._meta.model_name, queryset)
+            # Mantém a data de pagamento já registrada; nas demais usa a data de hoje
+            updated = queryset.update(status='paid', paid_date=Coalesce(F('paid_date'), Value(date.today())))
         self.message_user(request, f'{updated} lançamentos marcados como pagos.')
     mark_as_paid.short_description = 'Marcar como pago'
     
     def mark_as_pending(self, request, queryset):
-        updated = queryset.update(status='pending', paid_date=None)
+        if self.reject_closed_entries(request, queryset):
+            return
+        with transaction.atomic():
+            rollups.apply_status_change(queryset, 'pending')
+            budgets.apply_status_change(queryset, 'pending')
+            ledger.apply_status_change(queryset, 'pending')
+            sync.record_queryset(self.model._meta.model_name, queryset)
+            updated = queryset.update(status='pending', paid_date=None)
         self.message_user(request, f'{updated} lançamentos marcados como pendentes.')
     mark_as_pending.short_description = 'Marcar como pendente'
 
@@ -91,23 +276,60 @@ class CashFlowAdmin(admin.ModelAdmin):
     Configuração do admin para fluxo de caixa.
     """
     list_display = ('description', 'amount_display', 'flow_type', 'responsible', 'date', 'created_by')
-    list_filter = ('flow_type', 'responsible', 'date', 'created_at')
+    list_select_related = ('created_by',)
+    list_filter = ('flow_type', 'responsible', 'currency', 'date', 'created_at')
     search_fields = ('description', 'created_by__first_name', 'created_by__last_name')
     date_hierarchy = 'date'
     ordering = ('-date', '-created_at')
     
     def amount_display(self, obj):
-        return f"R$ {obj.amount:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+        return format_money(obj.amount, obj.currency)
     amount_display.short_description = 'Valor'
     amount_display.admin_order_field = 'amount'
 
 
+@admin.register(ExchangeRate)
+class ExchangeRateAdmin(admin.ModelAdmin):
+    """
+    Configuração do admin para cotações (carregadas com o comando load_exchange_rates).
+    """
+    list_display = ('currency', 'date', 'rate')
+    list_filter = ('currency',)
+    date_hierarchy = 'date'
+    ordering = ('currency', '-date')
+
+
+@admin.register(Budget)
+class BudgetAdmin(admin.ModelAdmin):
+    """
+    Configuração do admin para orçamentos, com o consumo do período atual lido dos contadores.
+    """
+    list_display = ('category', 'period', 'limit_display', 'consumed_display', 'created_by')
+    list_select_related = ('category', 'created_by')
+    list_filter = ('period',)
+    search_fields = ('category__name',)
+    
+    def get_queryset(self, request):
+        return budgets.with_usage(super().get_queryset(request))
+    
+    def limit_display(self, obj):
+        return format_money(obj.limit)
+    limit_display.short_description = 'Limite'
+    limit_display.admin_order_field = 'limit'
+    
+    def consumed_display(self, obj):
+        return format_money(obj.consumed)
+    consumed_display.short_description = 'Consumido no período'
+    consumed_display.admin_order_field = 'consumed'
+
+
 @admin.register(FinancialSummary)
 class FinancialSummaryAdmin(admin.ModelAdmin):
     """
     Configuração do admin para resumos financeiros.
     """
     list_display = ('user', 'month_year', 'total_income_display', 'total_expenses_display', 'balance_display', 'calculated_at')
+    list_select_related = ('user',)
     list_filter = ('year', 'month', 'calculated_at')
     search_fields = ('user__first_name', 'user__last_name', 'user__email')
     ordering = ('-year', '-month')
@@ -138,3 +360,24 @@ class FinancialSummaryAdmin(admin.ModelAdmin):
     balance_display.short_description = 'Saldo'
     balance_display.admin_order_field = 'balance'
 
+
+@admin.register(MonthClose)
+class MonthCloseAdmin(admin.ModelAdmin):
+    """
+    Configuração do admin para fechamentos mensais (somente consulta e reabertura).
+    """
+    list_display = ('month_display', 'created_by', 'closed_by', 'closed_at')
+    list_select_related = ('created_by', 'closed_by')
+    list_filter = ('month',)
+    search_fields = ('created_by__first_name', 'created_by__last_name', 'created_by__email')
+    ordering = ('-month',)
+    readonly_fields = ('created_by', 'month', 'closed_by', 'closed_at')
+    
+    def month_display(self, obj):
+        return f"{obj.month:%m/%Y}"
+    month_display.short_description = 'Mês'
+    month_display.admin_order_field = 'month'
+    
+    def has_add_permission(self, request):
+        # O fechamento grava os totais congelados; é feito pela API
+        return False
@@ -0,0 +1,200 @@
+"""
+Arquivo de lançamentos antigos (hot/cold).
+
+Receitas e despesas únicas, pagas, de meses fechados e anteriores ao horizonte de
+retenção (ARCHIVE_RETENTION_DAYS) são movidas em lotes para ArchivedIncome /
+ArchivedExpense, com as mesmas colunas e o mesmo id. A cópia é um
+`INSERT ... SELECT` e a remoção um DELETE direto, sem sinais: agregados diários,
+razão de saldos e totais dos meses fechados continuam valendo, porque o histórico
+não muda (as verificações e reconstruções também leem o arquivo).
+
+Fixas e parceladas não são arquivadas, pois alimentam o planejamento e as dívidas.
+
+Cada grupo familiar guarda em `archived_through` a data do lançamento arquivado
+mais recente; as listagens só consultam o arquivo quando o período pedido chega
+até essa data.
+"""
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from authentication.models import Household
+
+from . import periods, search
+from .models import DueReminder
+from .rollups import ARCHIVE_MODELS, ENTRY_MODELS
+
+
+def retention_cutoff(today=None):
+    """Primeiro dia que ainda fica nas tabelas principais."""
+    return (today or date.today()) - timedelta(days=settings.ARCHIVE_RETENTION_DAYS)
+
+
+def archivable(model, cutoff):
+    """Lançamentos que podem ser arquivados: únicos, pagos e em meses fechados."""
+    return model.objects.filter(
+        periods.closed_month_exists(),
+        entry_type='single',
+        status='paid',
+        entry_date__lt=cutoff,
+        paid_date__lt=cutoff
+    )
+
+
+def entry_columns(kind):
+    return [field.column for field in ENTRY_MODELS[kind]._meta.concrete_fields]
+
+
+def _placeholders(values):
+    return ', '.join(['%s'] * len(values))
+
+
+def _move_rows(source, target, columns, ids, extra=None):
+    """
+    Copia as linhas `ids` de `source` para `target` e as remove da origem, sem
+    passar pelo ORM (e, portanto, sem sinais). `extra` acrescenta colunas fixas.
+    """
+    quote = connection.ops.quote_name
+    extra = extra or {}
+    names = ', '.join(quote(column) for column in columns)
+    target_names = ', '.join([names, *(quote(column) for column in extra)])
+    selected = ', '.join([names, *(['%s'] * len(extra))])
+    
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(target._meta.db_table)} ({target_names}) '
+            f'SELECT {selected} FROM {quote(source._meta.db_table)} WHERE id IN ({_placeholders(ids)})',
+            [*extra.values(), *ids]
+        )
+        cursor.execute(
+            f'DELETE FROM {quote(source._meta.db_table)} WHERE id IN ({_placeholders(ids)})',
+            ids
+        )
+
+
+def refresh_archived_through(household_ids):
+    """Recalcula `archived_through` dos grupos a partir do arquivo."""
+    for household_id in set(household_ids):
+        latest = [
+            model.objects.filter(household_id=household_id).aggregate(last=Max('entry_date'))['last']
+            for model in ARCHIVE_MODELS.values()
+        ]
+        latest = [day for day in latest if day is not None]
+        Household.objects.filter(pk=household_id).update(archived_through=max(latest) if latest else None)
+
+
+def archive_entries(cutoff=None, batch_size=1000):
+    """
+    Move para o arquivo, em lotes de `batch_size` (uma transação por lote), os
+    lançamentos elegíveis anteriores a `cutoff`. Retorna {tipo: quantidade}.
+    """
+    cutoff = cutoff or retention_cutoff()
+    archived_at = timezone.now()
+    moved = {}
+    
+    for kind, model in ENTRY_MODELS.items():
+        archive_model = ARCHIVE_MODELS[kind]
+        columns = entry_columns(kind)
+        moved[kind] = 0
+        while True:
+            with transaction.atomic():
+                rows = list(
+                    archivable(model, cutoff).order_by('id').values_list('id', 'household_id')[:batch_size]
+                )
+                if not rows:
+                    break
+                ids = [entry_id for entry_id, _ in rows]
+                
+                if kind == 'expense':
+                    DueReminder.objects.filter(expense_id__in=ids).delete()
+                search.remove_entries(kind, ids)
+                _move_rows(model, archive_model, columns, ids, {'archived_at': archived_at})
+                
+                latest = archive_model.objects.filter(pk__in=ids).values('household_id').annotate(
+                    last=Max('entry_date')
+                ).order_by()
+                for row in latest:
+                    Household.objects.filter(
+                        Q(archived_through__isnull=True) | Q(archived_through__lt=row['last']),
+                        pk=row['household_id']
+                    ).update(archived_through=row['last'])
+            moved[kind] += len(ids)
+    return moved
+
+
+def restore_entries(users=None, household_id=None, start=None, end=None, batch_size=1000):
+    """
+    Devolve às tabelas principais os lançamentos arquivados (dos usuários ou do
+    grupo, opcionalmente entre `start` e `end`). Retorna {tipo: quantidade}.
+    """
+    restored = {}
+    households = set()
+    for kind, archive_model in ARCHIVE_MODELS.items():
+        queryset = archive_model.objects.all()
+        if users is not None:
+            queryset = queryset.filter(created_by__in=users)
+        if household_id is not None:
+            queryset = queryset.filter(household_id=household_id)
+        if start is not None:
+            queryset = queryset.filter(entry_date__gte=start)
+        if end is not None:
+            queryset = queryset.filter(entry_date__lte=end)
+        
+        columns = entry_columns(kind)
+        restored[kind] = 0
+        while True:
+            with transaction.atomic():
+                rows = list(queryset.order_by('id').values_list('id', 'household_id')[:batch_size])
+                if not rows:
+                    break
+                ids = [entry_id for entry_id, _ in rows]
+                _move_rows(archive_model, ENTRY_MODELS[kind], columns, ids)
+                search.index_entries(kind, ids)
+            households.update(household for _, household in rows)
+            restored[kind] += len(ids)
+    
+    refresh_archived_through(households)
+    return restored
+
+
+def reaches_archive(household, start_date=None):
+    """
+    Indica se uma listagem a partir de `start_date` (None = sem limite) precisa
+    incluir o arquivo do grupo.
+    """
+    if household is None or household.archived_through is None:
+        return False
+    if start_date is None:
+        return True
+    if isinstance(start_date, str):
+        try:
+            start_date = date.fromisoformat(start_date)
+        except ValueError:
+            return True
+    return start_date <= household.archived_through
+
+
+def combine(live, archived):
+    """
+    UNION ALL das linhas principais com as arquivadas, mantendo a ordenação pedida.
+    As partes devem vir com os mesmos filtros; o resultado são tuplas na ordem de
+    `concrete_fields` (ver `as_instances`).
+    """
+    model = live.model
+    fields = [field.attname for field in model._meta.concrete_fields]
+    ordering = [
+        name for name in (live.query.order_by or model._meta.ordering)
+        if isinstance(name, str) and name.lstrip('-') in fields
+    ]
+    return live.order_by().values_list(*fields).union(
+        archived.order_by().values_list(*fields), all=True
+    ).order_by(*ordering or ['-id'])
+
+
+def as_instances(model, rows):
+    """Converte as tuplas de `combine` em instâncias do modelo principal."""
+    fields = [field.attname for field in model._meta.concrete_fields]
+    return [model.from_db(model.objects.db, fields, row) for row in rows]
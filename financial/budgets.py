@@ -0,0 +1,243 @@
+"""
+Orçamentos por categoria com contadores de consumo mantidos a cada gravação.
+
+Cada orçamento (categoria de despesa do grupo familiar, mensal ou anual) tem uma
+linha de BudgetUsage por período com o total pago e o em aberto (pendente ou
+atrasado), na moeda base. As gravações de despesas somam seus deltas nas linhas
+com UPDATE ... SET paid = paid + x (F()), na mesma transação do lançamento;
+mudanças de status em lote movem o valor entre as colunas antes do
+`queryset.update()`. A leitura do consumo (`/budgets/`) usa apenas os contadores.
+
+Despesas arquivadas continuam contando. `rebuild` recalcula os contadores a
+partir das tabelas e `find_drift` aponta as divergências (comando
+reconcile_budgets).
+"""
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, DateField, Exists, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, TruncMonth
+
+from . import currency
+from .models import ArchivedExpense, Budget, BudgetUsage, Expense
+
+# Lançamentos arquivados continuam contando no consumo
+EXPENSE_MODELS = (Expense, ArchivedExpense)
+
+# Campos do estado rastreado que afetam o consumo
+STATE_FIELDS = ('household_id', 'category_id', 'entry_date', 'status', 'amount', 'currency')
+
+ZERO = Decimal('0')
+
+
+def period_start(period, day):
+    """Primeiro dia do período (mês ou ano) que contém `day`."""
+    if period == 'yearly':
+        return date(day.year, 1, 1)
+    return day.replace(day=1)
+
+
+def with_usage(queryset, today=None):
+    """
+    Anota no queryset de Budget o início do período atual, o consumo desse período
+    lido dos contadores (0 se ainda não há consumo) e o saldo restante.
+    """
+    today = today or date.today()
+    usage = BudgetUsage.objects.filter(budget=OuterRef('pk'), period_start=OuterRef('period_start'))
+    return queryset.annotate(
+        period_start=Case(
+            When(period='yearly', then=Value(period_start('yearly', today))),
+            default=Value(period_start('monthly', today)),
+            output_field=DateField(),
+        ),
+    ).annotate(
+        paid=Coalesce(Subquery(usage.values('paid')[:1]), ZERO),
+        pending=Coalesce(Subquery(usage.values('pending')[:1]), ZERO),
+    ).annotate(
+        consumed=F('paid') + F('pending'),
+    ).annotate(
+        remaining=F('limit') - F('consumed'),
+    )
+
+
+def find_budgets(keys):
+    """Orçamentos das combinações (grupo familiar, categoria). Retorna {chave: [(id, período)]}."""
+    result = defaultdict(list)
+    if not keys:
+        return result
+    condition = reduce(or_, [Q(household_id=household_id, category_id=category_id)
+                             for household_id, category_id in keys])
+    for budget_id, period, household_id, category_id in Budget.objects.filter(condition).values_list(
+        'id', 'period', 'household_id', 'category_id'
+    ):
+        result[household_id, category_id].append((budget_id, period))
+    return result
+
+
+def apply_delta(budget_id, start, paid, pending):
+    """
+    Soma `paid`/`pending` no consumo do orçamento no período, criando a linha se necessário.
+    """
+    lookup = {'budget_id': budget_id, 'period_start': start}
+    updated = BudgetUsage.objects.filter(**lookup).update(paid=F('paid') + paid, pending=F('pending') + pending)
+    if updated:
+        return
+    
+    try:
+        with transaction.atomic():
+            BudgetUsage.objects.create(paid=paid, pending=pending, **lookup)
+    except IntegrityError:
+        # Outra transação criou a linha entre o UPDATE e o INSERT
+        BudgetUsage.objects.filter(**lookup).update(paid=F('paid') + paid, pending=F('pending') + pending)
+
+
+def apply_changes(changes):
+    """
+    Aplica uma lista de (grupo familiar, categoria, data, status, valor) aos orçamentos
+    correspondentes, somando antes os deltas que caem na mesma linha.
+    """
+    budgets = find_budgets({(household_id, category_id) for household_id, category_id, *_ in changes})
+    if not budgets:
+        return
+    
+    deltas = defaultdict(lambda: [ZERO, ZERO])
+    for household_id, category_id, day, status, amount in changes:
+        for budget_id, period in budgets.get((household_id, category_id), ()):
+            deltas[budget_id, period_start(period, day)][0 if status == 'paid' else 1] += amount
+    for (budget_id, start), (paid, pending) in deltas.items():
+        if paid or pending:
+            apply_delta(budget_id, start, paid, pending)
+
+
+def state_change(state, sign):
+    amount = currency.convert(state['amount'], state['currency'], state['entry_date'])
+    return (state['household_id'], state['category_id'], state['entry_date'], state['status'], sign * amount)
+
+
+def record_change(previous, current):
+    """
+    Atualiza o consumo após salvar uma despesa, a partir do estado anterior (None
+    para despesas novas) e do atual. Gravações que não mudam os campos do consumo
+    não consultam o banco.
+    """
+    if previous and all(previous[field] == current[field] for field in STATE_FIELDS):
+        return
+    changes = [state_change(current, 1)]
+    if previous:
+        changes.append(state_change(previous, -1))
+    apply_changes(changes)
+
+
+def record_delete(state):
+    apply_changes([state_change(state, -1)])
+
+
+def apply_status_change(queryset, status):
+    """
+    Move o consumo das despesas do queryset para o novo status, antes de um
+    `queryset.update(status=...)` (que não dispara sinais). Uma consulta agrupada
+    por categoria e mês.
+    """
+    if queryset.model is not Expense:
+        return
+    groups = queryset.exclude(status=status).values(
+        'household_id', 'category_id', 'status', month=TruncMonth('entry_date')
+    ).annotate(total=Sum(currency.converted())).order_by()
+    
+    changes = []
+    for group in groups:
+        key = (group['household_id'], group['category_id'], group['month'])
+        changes.append((*key, group['status'], -group['total']))
+        changes.append((*key, status, group['total']))
+    apply_changes(changes)
+
+
+def expected_usage(budgets=None):
+    """
+    Calcula o consumo diretamente das tabelas de despesas (incluindo o arquivo).
+    Retorna {(orçamento, início do período): (pago, pendente)}.
+    """
+    budget_rows = Budget.objects.all() if budgets is None else Budget.objects.filter(pk__in=budgets)
+    by_key = defaultdict(list)
+    for budget_id, period, household_id, category_id in budget_rows.values_list(
+        'id', 'period', 'household_id', 'category_id'
+    ):
+        by_key[household_id, category_id].append((budget_id, period))
+    
+    matching = budget_rows.filter(household_id=OuterRef('household_id'), category_id=OuterRef('category_id'))
+    result = defaultdict(lambda: [ZERO, ZERO])
+    for model in EXPENSE_MODELS:
+        rows = model.objects.filter(Exists(matching)).values(
+            'household_id', 'category_id', month=TruncMonth('entry_date')
+        ).annotate(
+            paid=Coalesce(Sum(currency.converted(), filter=Q(status='paid')), ZERO),
+            pending=Coalesce(Sum(currency.converted(), filter=~Q(status='paid')), ZERO),
+        ).order_by()
+        for row in rows:
+            for budget_id, period in by_key[row['household_id'], row['category_id']]:
+                usage = result[budget_id, period_start(period, row['month'])]
+                usage[0] += row['paid']
+                usage[1] += row['pending']
+    return {key: tuple(usage) for key, usage in result.items()}
+
+
+def rebuild(budgets=None):
+    """
+    Recria os contadores (de todos os orçamentos ou apenas dos ids informados).
+    Retorna o número de linhas gravadas.
+    """
+    expected = expected_usage(budgets)
+    with transaction.atomic():
+        existing = BudgetUsage.objects.all()
+        if budgets is not None:
+            existing = existing.filter(budget__in=budgets)
+        existing.delete()
+        BudgetUsage.objects.bulk_create(
+            [
+                BudgetUsage(budget_id=budget_id, period_start=start, paid=paid, pending=pending)
+                for (budget_id, start), (paid, pending) in expected.items()
+            ],
+            batch_size=1000
+        )
+    return len(expected)
+
+
+def find_drift(budgets=None):
+    """
+    Compara os contadores com as tabelas de despesas.
+    Retorna lista de (chave, esperado, armazenado), com (pago, pendente) em cada lado.
+    """
+    expected = expected_usage(budgets)
+    usages = BudgetUsage.objects.exclude(paid=0, pending=0)
+    if budgets is not None:
+        usages = usages.filter(budget__in=budgets)
+    stored = {
+        (row['budget_id'], row['period_start']): (row['paid'], row['pending'])
+        for row in usages.values('budget_id', 'period_start', 'paid', 'pending')
+    }
+    
+    empty = (ZERO, ZERO)
+    differences = []
+    for key in sorted(set(expected) | set(stored)):
+        if expected.get(key, empty) != stored.get(key, empty):
+            differences.append((key, expected.get(key, empty), stored.get(key, empty)))
+    return differences
+
+
+def repair(differences):
+    """Grava os valores esperados nas linhas divergentes, em um único comando."""
+    BudgetUsage.objects.bulk_create(
+        [
+            BudgetUsage(budget_id=budget_id, period_start=start, paid=paid, pending=pending)
+            for (budget_id, start), (paid, pending), _ in differences
+        ],
+        update_conflicts=True,
+        unique_fields=['budget', 'period_start'],
+        update_fields=['paid', 'pending'],
+        batch_size=1000
+    )
+    return len(differences)
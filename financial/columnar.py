@@ -0,0 +1,269 @@
+"""
+Motor colunar para cálculos financeiros em memória.
+
+Os lançamentos são carregados com `values_list` em colunas compactas de inteiros
+(`array('q')`, valores em centavos), sem instanciar modelos nem objetos Decimal.
+Somas por grupo, distribuição por mês e projeções operam sobre as colunas inteiras;
+a conversão para Decimal acontece apenas na serialização (ver `CentsField`).
+
+Quando o NumPy está instalado, as colunas são expostas como arrays NumPy sem cópia
+e as operações usam as rotinas vetorizadas; sem ele, o mesmo resultado é obtido
+em Python puro. O NumPy é carregado apenas no primeiro cálculo, fora da
+inicialização do worker.
+"""
+from array import array
+from bisect import bisect_right
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+from itertools import accumulate, compress
+
+from monitoring.startup import lazy_import
+
+np = lazy_import('numpy')  # Opcional: None se não estiver instalado
+
+ENTRY_TYPE_CODES = {
+    'fixed': 0,
+    'single': 1,
+    'installment': 2,
+}
+
+STATUS_CODES = {
+    'pending': 0,
+    'paid': 1,
+    'overdue': 2,
+}
+
+CENT = Decimal('0.01')
+
+
+def to_cents(value):
+    """Converte um valor monetário (Decimal, int ou texto) para centavos inteiros."""
+    return int((Decimal(value) / CENT).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents):
+    """Converte centavos inteiros de volta para Decimal com duas casas."""
+    return Decimal(int(cents)).scaleb(-2)
+
+
+def month_index(day):
+    """Índice contínuo do mês (ano * 12 + mês - 1), usado para agrupar por mês."""
+    return day.year * 12 + day.month - 1
+
+
+def month_from_index(index):
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def add_months(day, months):
+    """Primeiro dia do mês `months` meses depois (ou antes) do mês de `day`."""
+    return month_from_index(month_index(day) + months)
+
+
+def use_numpy():
+    return np is not None
+
+
+class EntryColumns:
+    """
+    Lançamentos (receitas ou despesas) em colunas de inteiros.
+    
+    `amount` em centavos; datas como ordinal (`date.toordinal()`) e índice de mês;
+    tipo e status codificados em ENTRY_TYPE_CODES / STATUS_CODES.
+    """
+    FIELDS = ('amount', 'entry_type', 'status', 'category_id', 'start_date', 'total_installments',
+              'current_installment', 'id')
+    COLUMNS = ('id', 'amount', 'entry_type', 'status', 'category', 'start_ordinal', 'start_month',
+               'total_installments', 'current_installment')
+    
+    def __init__(self):
+        self.id = array('q')
+        self.amount = array('q')
+        self.entry_type = array('b')
+        self.status = array('b')
+        self.category = array('q')
+        self.start_ordinal = array('q')
+        self.start_month = array('q')
+        self.total_installments = array('q')
+        self.current_installment = array('q')
+    
+    def __len__(self):
+        return len(self.amount)
+    
+    @classmethod
+    def from_queryset(cls, queryset, chunk_size=2000):
+        """
+        Carrega as colunas em uma única consulta, sem instanciar modelos. Os valores
+        chegam convertidos para a moeda base pela própria consulta.
+        """
+        # Importado aqui: o pool de cenários importa este módulo em processos sem os
+        # apps do Django carregados, e `currency` importa os modelos
+        from .currency import converted
+        
+        rows = queryset.order_by().annotate(base_amount=converted()).values_list('base_amount', *cls.FIELDS[1:])
+        return cls.from_rows(rows.iterator(chunk_size=chunk_size))
+    
+    @classmethod
+    def from_rows(cls, rows):
+        """Monta as colunas a partir de tuplas na ordem de FIELDS."""
+        columns = cls()
+        for amount, entry_type, status, category_id, start_date, total, current, entry_id in rows:
+            columns.append(amount, entry_type, status, category_id, start_date, total, current, entry_id)
+        return columns
+    
+    def append(self, amount, entry_type, status, category_id, start_date, total_installments=None,
+               current_installment=None, entry_id=0):
+        """Acrescenta um lançamento; `amount` em Decimal ou já em centavos (int)."""
+        self.id.append(entry_id or 0)
+        self.amount.append(amount if isinstance(amount, int) else to_cents(amount))
+        self.entry_type.append(ENTRY_TYPE_CODES[entry_type])
+        self.status.append(STATUS_CODES[status])
+        self.category.append(category_id or 0)
+        self.start_ordinal.append(start_date.toordinal())
+        self.start_month.append(month_index(start_date))
+        self.total_installments.append(total_installments or 0)
+        self.current_installment.append(current_installment or 0)
+    
+    def column(self, name):
+        """Retorna a coluna como array NumPy (sem cópia) ou como array.array."""
+        values = getattr(self, name)
+        if use_numpy():
+            return np.frombuffer(values, dtype=values.typecode)
+        return values
+    
+    def memory_bytes(self):
+        return sum(getattr(self, name).itemsize * len(self) for name in self.COLUMNS)
+    
+    def derive(self, remove_ids=(), amounts=None):
+        """
+        Retorna uma cópia sem os lançamentos de `remove_ids` e com os valores de
+        `amounts` ({id: centavos}) substituídos. A base não é alterada.
+        """
+        remove_ids = set(remove_ids)
+        amounts = amounts or {}
+        derived = type(self)()
+        if not remove_ids:
+            for name in self.COLUMNS:
+                setattr(derived, name, array(getattr(self, name).typecode, getattr(self, name)))
+        else:
+            keep = [entry_id not in remove_ids for entry_id in self.id]
+            for name in self.COLUMNS:
+                column = getattr(self, name)
+                setattr(derived, name, array(column.typecode, compress(column, keep)))
+        if amounts:
+            for index, entry_id in enumerate(derived.id):
+                if entry_id in amounts:
+                    derived.amount[index] = amounts[entry_id]
+        return derived
+
+
+def sum_where(columns, entry_type=None, status=None):
+    """Soma os centavos dos lançamentos com o tipo e/ou status informados."""
+    type_code = ENTRY_TYPE_CODES[entry_type] if entry_type else None
+    status_code = STATUS_CODES[status] if status else None
+    
+    if use_numpy() and len(columns):
+        mask = np.ones(len(columns), dtype=bool)
+        if type_code is not None:
+            mask &= columns.column('entry_type') == type_code
+        if status_code is not None:
+            mask &= columns.column('status') == status_code
+        return int(columns.column('amount')[mask].sum())
+    
+    return sum(
+        amount for amount, code, state in zip(columns.amount, columns.entry_type, columns.status)
+        if (type_code is None or code == type_code) and (status_code is None or state == status_code)
+    )
+
+
+def group_sum(keys, values):
+    """
+    Soma `values` agrupando por `keys` (colunas de mesmo tamanho).
+    Retorna {chave: soma em centavos}.
+    """
+    if use_numpy() and len(keys):
+        keys = np.asarray(keys, dtype=np.int64)
+        unique, inverse = np.unique(keys, return_inverse=True)
+        totals = np.zeros(len(unique), dtype=np.int64)
+        np.add.at(totals, inverse, np.asarray(values, dtype=np.int64))
+        return dict(zip(unique.tolist(), totals.tolist()))
+    
+    result = {}
+    for key, value in zip(keys, values):
+        result[key] = result.get(key, 0) + value
+    return result
+
+
+def sum_by_month(columns, entry_type):
+    """Soma por índice de mês de início, apenas para o tipo de lançamento informado."""
+    code = ENTRY_TYPE_CODES[entry_type]
+    if use_numpy() and len(columns):
+        mask = columns.column('entry_type') == code
+        return group_sum(columns.column('start_month')[mask], columns.column('amount')[mask])
+    
+    selected = [index for index, value in enumerate(columns.entry_type) if value == code]
+    return group_sum([columns.start_month[i] for i in selected], [columns.amount[i] for i in selected])
+
+
+def cumulative_sum_until(columns, entry_type, ordinals):
+    """
+    Para cada ordinal em `ordinals`, soma os lançamentos do tipo informado com data
+    de início até aquele dia (inclusive). Ordena uma vez e usa somas prefixadas.
+    """
+    code = ENTRY_TYPE_CODES[entry_type]
+    if use_numpy() and len(columns):
+        mask = columns.column('entry_type') == code
+        starts = columns.column('start_ordinal')[mask]
+        order = np.argsort(starts, kind='stable')
+        starts = starts[order]
+        prefix = np.concatenate(([0], np.cumsum(columns.column('amount')[mask][order])))
+        positions = np.searchsorted(starts, np.asarray(ordinals, dtype=np.int64), side='right')
+        return prefix[positions].tolist()
+    
+    pairs = sorted(
+        (start, amount)
+        for start, amount, value in zip(columns.start_ordinal, columns.amount, columns.entry_type)
+        if value == code
+    )
+    starts = [start for start, _ in pairs]
+    prefix = [0, *accumulate(amount for _, amount in pairs)]
+    return [prefix[bisect_right(starts, ordinal)] for ordinal in ordinals]
+
+
+def project_months(incomes, expenses, first_month, months, opening_balance=0):
+    """
+    Projeção mensal (em centavos) usada pelo planejamento futuro.
+    
+    Fixas entram em todos os meses; únicas no mês de início; parceladas a partir
+    do mês em que a data de início já passou (até o primeiro dia do mês).
+    """
+    first_index = month_index(first_month)
+    month_dates = [month_from_index(first_index + offset) for offset in range(months)]
+    ordinals = [month.toordinal() for month in month_dates]
+    
+    fixed_income = sum_where(incomes, 'fixed')
+    fixed_expenses = sum_where(expenses, 'fixed')
+    single_incomes = sum_by_month(incomes, 'single')
+    single_expenses = sum_by_month(expenses, 'single')
+    installment_incomes = cumulative_sum_until(incomes, 'installment', ordinals)
+    installment_expenses = cumulative_sum_until(expenses, 'installment', ordinals)
+    
+    projection = []
+    accumulated = opening_balance
+    for offset, month in enumerate(month_dates):
+        index = first_index + offset
+        total_income = fixed_income + single_incomes.get(index, 0) + installment_incomes[offset]
+        total_expenses = fixed_expenses + installment_expenses[offset] + single_expenses.get(index, 0)
+        estimated = total_income - total_expenses
+        accumulated += estimated
+        projection.append({
+            'year': month.year,
+            'month': month.month,
+            'total_income': total_income,
+            'fixed_expenses': fixed_expenses,
+            'installment_expenses': installment_expenses[offset],
+            'total_expenses': total_expenses,
+            'estimated_balance': estimated,
+            'accumulated_balance': accumulated,
+        })
+    return projection
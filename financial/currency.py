@@ -0,0 +1,154 @@
+"""
+Moedas dos lançamentos e conversão para a moeda base (BRL).
+
+Cada lançamento é convertido pela cotação vigente na sua data (`entry_date`; `date`
+no fluxo de caixa): a última cotação até a data ou, se a data for anterior à
+primeira cotação carregada, a primeira. Valores convertidos são arredondados
+para centavos, linha a linha, no SQL e em Python.
+
+- Agregações convertem dentro da consulta (`converted`), com uma subconsulta
+  correlacionada no índice (moeda, data) avaliada apenas para linhas em moeda
+  estrangeira.
+- Conversões de um único lançamento (razão de saldos, agregados diários,
+  serializers) usam o cache de cotações do processo (`convert`), carregado uma
+  vez por moeda e renovado a cada EXCHANGE_RATE_CACHE_SECONDS ou quando as
+  cotações mudam neste processo.
+"""
+import csv
+import json
+import threading
+import time
+from bisect import bisect_right
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Case, DecimalField, F, OuterRef, Subquery, When
+from django.db.models.functions import Coalesce, Round
+
+from .models import BaseFinancialEntry, ExchangeRate
+
+BASE_CURRENCY = 'BRL'
+CURRENCIES = {code for code, _ in BaseFinancialEntry.CURRENCY_CHOICES}
+CENT = Decimal('0.01')
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+class MissingExchangeRate(ValueError):
+    """
+    Nenhuma cotação carregada para a moeda.
+    """
+    def __init__(self, currency):
+        super().__init__(f'Nenhuma cotação carregada para {currency}.')
+        self.currency = currency
+
+
+def rate_expression(date_field='entry_date'):
+    """Cotação da moeda da linha externa vigente na data `date_field`."""
+    rates = ExchangeRate.objects.filter(currency=OuterRef('currency'))
+    return Coalesce(
+        Subquery(rates.filter(date__lte=OuterRef(date_field)).order_by('-date').values('rate')[:1]),
+        Subquery(rates.order_by('date').values('rate')[:1]),
+    )
+
+
+def converted(date_field='entry_date', amount=None):
+    """
+    Expressão com o valor da linha na moeda base, para uso em agregações.
+    Linhas em moeda sem cotação resultam em NULL (ignoradas em somas).
+    """
+    amount = amount if amount is not None else F('amount')
+    return Case(
+        When(currency=BASE_CURRENCY, then=amount),
+        default=Round(amount * rate_expression(date_field), 2),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def _load(currency):
+    rows = list(ExchangeRate.objects.filter(currency=currency).order_by('date').values_list('date', 'rate'))
+    return time.monotonic(), [day.toordinal() for day, _ in rows], [rate for _, rate in rows]
+
+
+def get_rate(currency, day):
+    """Cotação da moeda vigente em `day`, pelo cache do processo."""
+    if currency == BASE_CURRENCY:
+        return Decimal('1')
+    
+    with _cache_lock:
+        entry = _cache.get(currency)
+    if entry is None or time.monotonic() - entry[0] > settings.EXCHANGE_RATE_CACHE_SECONDS:
+        entry = _load(currency)
+        with _cache_lock:
+            _cache[currency] = entry
+    
+    _, ordinals, rates = entry
+    if not rates:
+        raise MissingExchangeRate(currency)
+    index = bisect_right(ordinals, day.toordinal()) - 1
+    return rates[max(index, 0)]
+
+
+def convert(amount, currency, day):
+    """Valor na moeda base, arredondado para centavos (mesma regra de `converted`)."""
+    if currency == BASE_CURRENCY:
+        return Decimal(amount)
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    return (Decimal(amount) * get_rate(currency, day)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def has_rates(currency):
+    try:
+        get_rate(currency, date.today())
+    except MissingExchangeRate:
+        return False
+    return True
+
+
+def read_rates(path):
+    """
+    Lê cotações de um arquivo CSV (colunas currency,date,rate) ou JSON (lista de
+    objetos com as mesmas chaves). `rate` é o valor de uma unidade em BRL.
+    """
+    path = Path(path)
+    with path.open(encoding='utf-8') as handle:
+        records = json.load(handle) if path.suffix == '.json' else list(csv.DictReader(handle))
+    
+    rates = {}
+    for number, record in enumerate(records, start=1):
+        try:
+            currency = str(record['currency']).strip().upper()
+            day = date.fromisoformat(str(record['date']).strip())
+            rate = Decimal(str(record['rate']).strip())
+        except (KeyError, ValueError, ArithmeticError) as error:
+            raise ValueError(f'Linha {number} inválida: {error}') from error
+        if currency not in CURRENCIES or currency == BASE_CURRENCY:
+            raise ValueError(f'Linha {number}: moeda não suportada ({currency}).')
+        if rate <= 0:
+            raise ValueError(f'Linha {number}: cotação deve ser positiva.')
+        # A última ocorrência de (moeda, data) no arquivo prevalece
+        rates[currency, day] = ExchangeRate(currency=currency, date=day, rate=rate)
+    return list(rates.values())
+
+
+def load_rates(path):
+    """Grava (ou atualiza) as cotações do arquivo. Retorna o número de cotações lidas."""
+    rates = read_rates(path)
+    ExchangeRate.objects.bulk_create(
+        rates,
+        update_conflicts=True,
+        unique_fields=['currency', 'date'],
+        update_fields=['rate'],
+        batch_size=1000
+    )
+    clear_cache()
+    return len(rates)
@@ -0,0 +1,161 @@
+"""
+Painel: todos os widgets da tela inicial a partir de uma varredura por tabela.
+
+Métricas, linha do mês no planejamento, vencidos, distribuição por categoria e
+últimos lançamentos filtram as mesmas linhas do grupo familiar. Em vez de uma
+consulta por widget, cada tabela é agregada uma única vez, por categoria, com
+todos os filtros condicionais; os totais gerais são a soma das categorias.
+
+Consultas: saldos (atual e de abertura do mês), receitas, despesas e a janela de
+lançamentos recentes (união das duas tabelas).
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db.models import CharField, Count, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from . import columnar, currency, debts, ledger
+from .models import Income, Expense
+
+RECENT_FIELDS = ('id', 'kind', 'description', 'amount', 'currency', 'entry_date', 'status', 'category_id', 'category__name',
+                 'created_at')
+CATEGORY_FIELDS = ('category_id', 'category__name', 'category__color')
+
+
+def total(condition, expression=None):
+    """Soma condicional, na moeda base."""
+    expression = expression if expression is not None else currency.converted()
+    return Coalesce(Sum(expression, filter=condition), Decimal('0'))
+
+
+def category_totals(queryset, **aggregates):
+    """Agregados condicionais por categoria, em uma consulta."""
+    return list(queryset.order_by().values(*CATEGORY_FIELDS).annotate(**aggregates))
+
+
+def sum_rows(rows, name):
+    return sum((row[name] for row in rows), Decimal('0'))
+
+
+def month_aggregates(today):
+    """Agregados comuns às duas tabelas (planejamento, métricas e distribuição do mês)."""
+    in_month = Q(start_date__year=today.year, start_date__month=today.month)
+    entry_month = Q(entry_date__year=today.year, entry_date__month=today.month)
+    return {
+        'fixed': total(Q(entry_type='fixed')),
+        'single_month': total(Q(entry_type='single') & in_month),
+        'installment_started': total(Q(entry_type='installment', start_date__lte=today.replace(day=1))),
+        'fixed_or_single_month': total(Q(entry_type__in=['fixed', 'single']) & in_month),
+        'month_total': total(entry_month),
+        'month_count': Count('id', filter=entry_month),
+    }
+
+
+def recent_entries(household_id, limit):
+    """
+    Últimos lançamentos (receitas e despesas) do grupo, em uma consulta. Cada lado
+    da união é restrito às suas `limit` linhas mais recentes por uma subconsulta
+    (o SQLite não aceita LIMIT dentro de uma união).
+    """
+    def window(model, kind):
+        queryset = model.objects.filter(household_id=household_id)
+        latest = queryset.order_by('-entry_date', '-created_at').values('pk')[:limit]
+        return queryset.filter(pk__in=latest).annotate(
+            kind=Value(kind, output_field=CharField())
+        ).order_by().values_list(*RECENT_FIELDS)
+    
+    rows = window(Income, 'income').union(window(Expense, 'expense'), all=True).order_by(
+        '-entry_date', '-created_at'
+    )[:limit]
+    return [dict(zip(RECENT_FIELDS, row)) for row in rows]
+
+
+def planning_row(incomes, expenses, today, opening_balance):
+    """Linha do mês atual no planejamento futuro (mesma regra de columnar.project_months), em centavos."""
+    def month_total(rows):
+        return columnar.to_cents(
+            sum_rows(rows, 'fixed') + sum_rows(rows, 'single_month') + sum_rows(rows, 'installment_started')
+        )
+    
+    total_income = month_total(incomes)
+    total_expenses = month_total(expenses)
+    estimated = total_income - total_expenses
+    return {
+        'year': today.year,
+        'month': today.month,
+        'total_income': total_income,
+        'fixed_expenses': columnar.to_cents(sum_rows(expenses, 'fixed')),
+        'installment_expenses': columnar.to_cents(sum_rows(expenses, 'installment_started')),
+        'total_expenses': total_expenses,
+        'estimated_balance': estimated,
+        'accumulated_balance': columnar.to_cents(opening_balance) + estimated,
+    }
+
+
+def category_breakdown(kind, rows):
+    """Distribuição do mês por categoria (pela data do lançamento), maiores primeiro."""
+    return [
+        {
+            'kind': kind,
+            'key': row['category_id'],
+            'label': row['category__name'],
+            'color': row['category__color'],
+            'total': row['month_total'],
+            'count': row['month_count'],
+        }
+        for row in sorted(rows, key=lambda row: row['month_total'], reverse=True)
+        if row['month_count']
+    ]
+
+
+def overdue_by_category(rows):
+    """Despesas vencidas por categoria, mais numerosas primeiro."""
+    return [
+        {'key': row['category_id'], 'label': row['category__name'], 'count': row['overdue_count'],
+         'amount': row['overdue']}
+        for row in sorted(rows, key=lambda row: (-row['overdue_count'], -row['overdue']))
+        if row['overdue_count']
+    ]
+
+
+def build_dashboard(household_id, today=None, recent=10):
+    """
+    Dados do painel do grupo familiar em quatro consultas. Os widgets reproduzem
+    as views de métricas, planejamento (primeiro mês) e distribuição.
+    """
+    today = today or date.today()
+    month_start = today.replace(day=1)
+    
+    balances = ledger.balances_as_of(household_id, [today, month_start - timedelta(days=1)])
+    
+    aggregates = month_aggregates(today)
+    incomes = category_totals(Income.objects.filter(household_id=household_id), **aggregates)
+    
+    overdue_filter = Q(status='pending', start_date__lt=today)
+    expenses = category_totals(
+        Expense.objects.filter(household_id=household_id),
+        paid=total(Q(status='paid', paid_date__year=today.year, paid_date__month=today.month)),
+        debt=total(Q(entry_type='installment'), debts.remaining_debt_expression(currency.converted())),
+        pending=total(Q(status='pending')),
+        overdue=total(overdue_filter),
+        overdue_count=Count('id', filter=overdue_filter),
+        **aggregates
+    )
+    
+    return {
+        'metrics': {
+            'current_balance': balances[today],
+            'monthly_fixed_expenses': sum_rows(expenses, 'fixed'),
+            'total_debt': sum_rows(expenses, 'debt'),
+            'monthly_income': sum_rows(incomes, 'fixed_or_single_month'),
+            'paid_amount': sum_rows(expenses, 'paid'),
+            'pending_amount': sum_rows(expenses, 'pending'),
+            'overdue_amount': sum_rows(expenses, 'overdue'),
+            'overdue_count': sum(row['overdue_count'] for row in expenses),
+        },
+        'planning': planning_row(incomes, expenses, today, balances[month_start - timedelta(days=1)]),
+        'overdue': overdue_by_category(expenses),
+        'breakdown': category_breakdown('income', incomes) + category_breakdown('expense', expenses),
+        'recent': recent_entries(household_id, recent),
+    }
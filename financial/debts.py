@@ -0,0 +1,171 @@
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, ExpressionWrapper, F, Q, Value, When
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractYear, Greatest, Least
+from django.db.models.lookups import GreaterThanOrEqual
+from django.utils import timezone
+
+from . import currency, sync
+from .columnar import month_from_index, month_index, to_cents
+from .models import Expense
+
+DEBT_FIELDS = ('id', 'description', 'category__name', 'base_amount', 'start_date', 'total_installments',
+               'current_installment', 'status', 'paid_date')
+
+
+def current_installment_expression():
+    # Parcelados sem a parcela atual preenchida estão na primeira
+    return Coalesce(F('current_installment'), Value(1))
+
+
+def current_parcel_paid_condition():
+    """
+    Condição SQL de `current_parcel_paid`: pago, sem data de pagamento ou com o
+    pagamento feito a partir do mês da parcela atual.
+    """
+    paid_month = ExtractYear('paid_date') * 12 + ExtractMonth('paid_date')
+    parcel_month = (
+        ExtractYear('start_date') * 12 + ExtractMonth('start_date') + current_installment_expression() - 1
+    )
+    return Q(status='paid') & (Q(paid_date__isnull=True) | Q(GreaterThanOrEqual(paid_month, parcel_month)))
+
+
+def parcels_left_expression():
+    """
+    Parcelas restantes calculadas no banco: da parcela atual até a última, sem
+    contar a atual quando ela já foi paga.
+    """
+    return Greatest(
+        F('total_installments') - current_installment_expression()
+        + Case(When(current_parcel_paid_condition(), then=Value(0)), default=Value(1)),
+        Value(0)
+    )
+
+
+def remaining_debt_expression(amount=None):
+    """
+    Saldo devedor (valor da parcela x parcelas restantes), para uso em agregações.
+    `amount` substitui o valor da parcela (ex.: convertido para a moeda base).
+    """
+    return ExpressionWrapper(
+        (amount if amount is not None else F('amount')) * parcels_left_expression(),
+        output_field=DecimalField(max_digits=14, decimal_places=2)
+    )
+
+
+def installment_debts(household_id):
+    """Despesas parceladas do grupo familiar (parcela na moeda base), em uma única consulta."""
+    return Expense.objects.filter(
+        household_id=household_id,
+        entry_type='installment',
+        total_installments__isnull=False
+    ).annotate(base_amount=currency.converted()).order_by('start_date', 'id').values_list(*DEBT_FIELDS)
+
+
+def current_parcel_paid(start_date, current, status, paid_date):
+    """
+    Indica se a parcela atual está paga. O status pago vale para a parcela em que o
+    pagamento foi feito: depois que `advance_installments` passa para a parcela
+    seguinte, um pagamento de um mês anterior ao da nova parcela não a quita.
+    """
+    if status != 'paid':
+        return False
+    return paid_date is None or month_index(paid_date) >= month_index(start_date) + (current or 1) - 1
+
+
+def parcels_left(total, current, paid):
+    return max(total - (current or 1) + (0 if paid else 1), 0)
+
+
+def compute_debts(rows, today=None):
+    """
+    Calcula, em uma única passada sobre os parcelados, o saldo devedor de cada
+    lançamento e o cronograma de quitação mês a mês (valores em centavos).
+    
+    Cada lançamento paga suas parcelas restantes em meses consecutivos a partir da
+    próxima parcela em aberto (parcelas atrasadas contam no mês atual). O cronograma
+    é montado com um vetor de diferenças: +parcela no primeiro mês e -parcela no mês
+    seguinte ao último, acumulados ao final.
+    """
+    current_month = month_index(today or date.today())
+    items = []
+    changes = {}
+    
+    for entry_id, description, category, amount, start_date, total, current, status, paid_date in rows:
+        paid = current_parcel_paid(start_date, current, status, paid_date)
+        left = parcels_left(total, current, paid)
+        if not left:
+            continue
+        
+        installment = to_cents(amount)
+        next_due = month_index(start_date) + (current or 1) - 1 + (1 if paid else 0)
+        first_month = max(next_due, current_month)
+        last_month = first_month + left - 1
+        changes[first_month] = changes.get(first_month, 0) + installment
+        changes[last_month + 1] = changes.get(last_month + 1, 0) - installment
+        
+        items.append({
+            'id': entry_id,
+            'description': description,
+            'category_name': category,
+            'installment_amount': installment,
+            'total_installments': total,
+            'current_installment': current or 1,
+            'parcels_left': left,
+            'remaining_balance': installment * left,
+            'next_due': month_from_index(first_month),
+            'payoff_month': month_from_index(last_month),
+        })
+    
+    schedule = []
+    remaining = sum(item['remaining_balance'] for item in items)
+    payment = 0
+    if changes:
+        for index in range(min(changes), max(changes)):
+            payment += changes.get(index, 0)
+            remaining -= payment
+            schedule.append({
+                'month': month_from_index(index),
+                'payment': payment,
+                'remaining_after': remaining,
+            })
+    
+    return {
+        'total_remaining': sum(item['remaining_balance'] for item in items),
+        'parcels_left': sum(item['parcels_left'] for item in items),
+        'monthly_payment': schedule[0]['payment'] if schedule else 0,
+        'payoff_month': schedule[-1]['month'] if schedule else None,
+        'items': items,
+        'schedule': schedule,
+    }
+
+
+def advance_installments(today=None, users=None):
+    """
+    Avança `current_installment` de todos os parcelados até a parcela do mês atual,
+    em um único UPDATE (parcela esperada = meses desde o início + 1, limitada ao total).
+    Os parcelados avançados são registrados no feed de sincronização.
+    
+    Status e data de pagamento não mudam: o pagamento registrado continua valendo
+    para a parcela em que foi feito (ver `current_parcel_paid`).
+    
+    Idempotente: rodar mais de uma vez no mesmo mês não avança de novo, e meses sem
+    execução são recuperados na próxima. Retorna o número de lançamentos avançados.
+    """
+    today = today or date.today()
+    expected = Least(
+        Value(today.year * 12 + today.month) - (ExtractYear('start_date') * 12 + ExtractMonth('start_date')) + 1,
+        F('total_installments')
+    )
+    queryset = Expense.objects.filter(entry_type='installment', total_installments__isnull=False)
+    if users is not None:
+        queryset = queryset.filter(created_by__in=users)
+    
+    behind = queryset.filter(Q(current_installment__isnull=True) | Q(current_installment__lt=expected))
+    with transaction.atomic():
+        sync.record_queryset('expense', behind)
+        return behind.update(
+            current_installment=Greatest(expected, Value(1)),
+            updated_at=timezone.now()
+        )
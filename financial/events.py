@@ -0,0 +1,177 @@
+"""
+Eventos ao vivo do grupo familiar (Server-Sent Events).
+
+Cada alteração registrada no feed de sincronização (ver `sync`) é publicada, após o
+commit, para as conexões abertas do grupo: um evento compacto com o tipo, os ids e
+o novo cursor do feed, a partir do qual o cliente busca os registros em
+`/changes/?since=`. Opcionalmente o evento leva as métricas do mês já recalculadas,
+uma única vez por evento para todas as conexões do grupo.
+
+A distribuição é feita pelo broker de EVENTS_BROKER. O padrão, LocalBroker, entrega
+em memória às conexões do mesmo processo; com vários workers cada um alcança apenas
+os próprios clientes, e o broker deve ser trocado por um pub/sub compartilhado com a
+mesma interface (`subscribe`, `unsubscribe`, `publish`). Como os eventos carregam o
+cursor, perder eventos intermediários não perde alterações.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .models import SyncChange
+
+# Intervalo de reconexão sugerido ao EventSource (ms)
+RETRY_MS = 5000
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+class Event:
+    """
+    Evento publicado para um grupo familiar. As métricas, quando pedidas, são
+    calculadas na primeira conexão que as solicita e compartilhadas com as demais.
+    """
+    def __init__(self, household_id, data):
+        self.household_id = household_id
+        self.data = data
+        self._metrics = None
+    
+    async def metrics(self):
+        if self._metrics is None:
+            self._metrics = asyncio.ensure_future(sync_to_async(load_metrics)(self.household_id))
+        return await self._metrics
+
+
+class Subscription:
+    """
+    Conexão aberta de um grupo: fila limitada no event loop da conexão. Com a fila
+    cheia, o evento mais antigo é descartado (o mais novo traz o cursor mais recente).
+    """
+    def __init__(self, household_id, loop, maxsize):
+        self.household_id = household_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+    
+    def deliver(self, event):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+    
+    async def next(self, timeout=None):
+        """Próximo evento; levanta asyncio.TimeoutError após `timeout` segundos."""
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class LocalBroker:
+    """
+    Pub/sub em memória, por grupo familiar. `publish` pode ser chamado de qualquer
+    thread (as gravações rodam fora do event loop no ASGI).
+    """
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+    
+    def subscribe(self, household_id):
+        subscription = Subscription(household_id, asyncio.get_running_loop(), settings.EVENTS_QUEUE_SIZE)
+        with self._lock:
+            self._subscriptions[household_id].add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.household_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.household_id]
+    
+    def subscriber_count(self, household_id):
+        with self._lock:
+            return len(self._subscriptions.get(household_id, ()))
+    
+    def publish(self, household_id, data):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(household_id, ()))
+        if not subscriptions:
+            return
+        
+        event = Event(household_id, data)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # Event loop encerrado sem desinscrever a conexão
+                self.unsubscribe(subscription)
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.EVENTS_BROKER)()
+    return _broker
+
+
+def publish(household_id, data):
+    """Publica o evento para o grupo quando a transação atual for confirmada."""
+    if household_id is not None:
+        transaction.on_commit(lambda: get_broker().publish(household_id, data))
+
+
+def load_metrics(household_id):
+    # Importados aqui: métricas e serializers dependem de módulos que publicam eventos
+    from .metrics import current_metrics
+    from .serializers import FinancialMetricsSerializer
+    
+    metrics = current_metrics(household_id)
+    return FinancialMetricsSerializer(metrics).data
+
+
+def latest_cursor(household_id):
+    return SyncChange.objects.filter(household_id=household_id).order_by('-id').values_list('id', flat=True).first()
+
+
+def format_event(name, data, event_id=None):
+    lines = [f'id: {event_id}'] if event_id is not None else []
+    lines.append(f'event: {name}')
+    lines.append(f'data: {json.dumps(data, separators=(",", ":"))}')
+    return '\n'.join(lines) + '\n\n'
+
+
+async def stream(household_id, last_event_id=None, with_metrics=False, broker=None):
+    """
+    Gera o stream SSE do grupo: `change` a cada alteração publicada e comentários
+    de keep-alive a cada EVENTS_HEARTBEAT_SECONDS sem eventos. Na reconexão
+    (`last_event_id` = último cursor recebido), envia `resync` se o feed avançou
+    enquanto o cliente esteve desconectado.
+    """
+    broker = broker or get_broker()
+    subscription = broker.subscribe(household_id)
+    try:
+        yield f'retry: {RETRY_MS}\n\n'
+        
+        if last_event_id is not None:
+            latest = await sync_to_async(latest_cursor)(household_id)
+            if latest is not None and latest > last_event_id:
+                yield format_event('resync', {'cursor': latest}, latest)
+        
+        while True:
+            try:
+                event = await subscription.next(settings.EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+                continue
+            
+            data = dict(event.data)
+            if with_metrics:
+                data['metrics'] = await event.metrics()
+            yield format_event('change', data, data['cursor'])
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,31 @@
+from rest_framework import filters
+
+from .search import KIND_BITS, build_match_query, search_available
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    Busca textual em receitas/despesas usando o índice FTS5 (descrição e nome da categoria).
+    
+    Cada palavra é buscada por prefixo e, sem `?ordering=` explícito, os resultados
+    vêm ordenados por relevância (bm25). Fora do SQLite, ou sem o índice, usa o
+    SearchFilter padrão com `search_fields` (também usado no arquivo).
+    
+    Deve vir depois do OrderingFilter em `filter_backends`, para que a ordenação
+    por relevância substitua a ordenação padrão da view.
+    """
+    def filter_queryset(self, request, queryset, view):
+        # Lançamentos arquivados não ficam no índice
+        if not search_available() or queryset.model._meta.model_name not in KIND_BITS:
+            return super().filter_queryset(request, queryset, view)
+        
+        term = request.query_params.get(self.search_param, '')
+        match = build_match_query(term)
+        if not match:
+            return queryset
+        
+        # Uma única consulta FTS5, juntada aos lançamentos pelo id (ver EntrySearch)
+        queryset = queryset.filter(search__kind=queryset.model._meta.model_name, search__document__match=match)
+        if not request.query_params.get(filters.OrderingFilter.ordering_param):
+            queryset = queryset.order_by('search__rank', *queryset.model._meta.ordering)
+        return queryset
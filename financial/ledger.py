@@ -0,0 +1,195 @@
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from . import currency
+from .models import ArchivedExpense, ArchivedIncome, BalanceCheckpoint, CashFlow, Income, Expense
+
+User = get_user_model()
+
+SIGNS = {
+    'income': 1,
+    'expense': -1,
+}
+
+
+def _as_date(value):
+    # paid_date pode chegar como texto (ex.: mark_paid com o valor do request)
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    return value
+
+
+def balance_effect(kind, state):
+    """
+    Retorna (usuário, data, valor) com o efeito de um registro no saldo, ou None.
+    Fluxo de caixa conta na sua data; receitas e despesas apenas quando pagas.
+    O valor é convertido para a moeda base pela cotação da data do registro.
+    """
+    if kind == 'cashflow':
+        day = _as_date(state['date'])
+        return state['created_by_id'], day, currency.convert(state['amount'], state['currency'], day)
+    if state['status'] != 'paid' or not state['paid_date']:
+        return None
+    amount = currency.convert(state['amount'], state['currency'], _as_date(state['entry_date']))
+    return state['created_by_id'], _as_date(state['paid_date']), SIGNS[kind] * amount
+
+
+def apply_delta(user_id, day, amount):
+    """
+    Soma `amount` ao ponto de controle do dia e a todos os pontos posteriores.
+    Lançamentos retroativos reescrevem apenas os pontos após a data alterada.
+    """
+    if not amount:
+        return
+    
+    updated = BalanceCheckpoint.objects.filter(created_by_id=user_id, date=day).update(
+        delta=F('delta') + amount,
+        balance=F('balance') + amount
+    )
+    if not updated:
+        opening = BalanceCheckpoint.objects.filter(
+            created_by_id=user_id, date__lt=day
+        ).order_by('-date').values_list('balance', flat=True).first() or Decimal('0')
+        try:
+            with transaction.atomic():
+                BalanceCheckpoint.objects.create(
+                    created_by_id=user_id, date=day, delta=amount, balance=opening + amount
+                )
+        except IntegrityError:
+            # Outra transação criou o ponto do dia entre o UPDATE e o INSERT
+            BalanceCheckpoint.objects.filter(created_by_id=user_id, date=day).update(
+                delta=F('delta') + amount,
+                balance=F('balance') + amount
+            )
+    
+    BalanceCheckpoint.objects.filter(created_by_id=user_id, date__gt=day).update(
+        balance=F('balance') + amount
+    )
+
+
+def record_change(kind, previous, current):
+    """Atualiza o razão após salvar um registro (previous é None para registros novos)."""
+    old = balance_effect(kind, previous) if previous else None
+    new = balance_effect(kind, current)
+    
+    if old and new and old[:2] == new[:2]:
+        apply_delta(new[0], new[1], new[2] - old[2])
+        return
+    if old:
+        apply_delta(old[0], old[1], -old[2])
+    if new:
+        apply_delta(*new)
+
+
+def record_delete(kind, state):
+    effect = balance_effect(kind, state)
+    if effect:
+        apply_delta(effect[0], effect[1], -effect[2])
+
+
+def apply_status_change(queryset, status):
+    """
+    Ajusta o razão antes de um `queryset.update()` de status (que não dispara sinais).
+    Ao marcar como pago usa a data de pagamento existente ou a de hoje, como as
+    ações do admin.
+    """
+    kind = queryset.model._meta.model_name
+    if status == 'paid':
+        groups = queryset.exclude(status='paid').values(
+            'created_by_id', day=Coalesce('paid_date', date.today())
+        ).annotate(total=Sum(currency.converted())).order_by()
+        sign = SIGNS[kind]
+    else:
+        groups = queryset.filter(status='paid', paid_date__isnull=False).values(
+            'created_by_id', day=F('paid_date')
+        ).annotate(total=Sum(currency.converted())).order_by()
+        sign = -SIGNS[kind]
+    
+    for group in groups:
+        apply_delta(group['created_by_id'], group['day'], sign * group['total'])
+
+
+def balance_as_of(household_id, day):
+    """
+    Saldo somado dos membros do grupo familiar ao fim do dia informado: uma consulta
+    que busca, para cada membro, o último ponto de controle até a data (índice
+    usuário/data). Os pontos de controle são por autor porque o saldo é acumulado.
+    """
+    return balances_as_of(household_id, [day])[day]
+
+
+def balances_as_of(household_id, days):
+    """
+    Como `balance_as_of`, para várias datas na mesma consulta (uma subconsulta por
+    data). Retorna {data: saldo}.
+    """
+    annotations = {
+        f'balance_{index}': Subquery(
+            BalanceCheckpoint.objects.filter(
+                created_by=OuterRef('pk'), date__lte=day
+            ).order_by('-date').values('balance')[:1]
+        )
+        for index, day in enumerate(days)
+    }
+    rows = User.objects.filter(household_id=household_id).annotate(**annotations).values_list(*annotations)
+    
+    totals = [Decimal('0')] * len(days)
+    for row in rows:
+        for index, balance in enumerate(row):
+            if balance is not None:
+                totals[index] += balance
+    return dict(zip(days, totals))
+
+
+def daily_movements(users=None):
+    """
+    Calcula a movimentação diária de cada usuário a partir das tabelas brutas
+    (incluindo os lançamentos arquivados, que estão todos pagos).
+    Retorna {usuário: {data: valor}}.
+    """
+    movements = defaultdict(lambda: defaultdict(Decimal))
+    sources = [
+        (CashFlow.objects.all(), 'date', 'date', 1),
+        (Income.objects.filter(status='paid', paid_date__isnull=False), 'paid_date', 'entry_date', 1),
+        (Expense.objects.filter(status='paid', paid_date__isnull=False), 'paid_date', 'entry_date', -1),
+        (ArchivedIncome.objects.filter(paid_date__isnull=False), 'paid_date', 'entry_date', 1),
+        (ArchivedExpense.objects.filter(paid_date__isnull=False), 'paid_date', 'entry_date', -1),
+    ]
+    for queryset, date_field, rate_date_field, sign in sources:
+        if users is not None:
+            queryset = queryset.filter(created_by__in=users)
+        rows = queryset.values('created_by_id', date_field).annotate(
+            total=Sum(currency.converted(rate_date_field))
+        ).order_by()
+        for row in rows:
+            movements[row['created_by_id']][row[date_field]] += sign * row['total']
+    return movements
+
+
+def rebuild_ledger(users=None):
+    """
+    Recria os pontos de controle a partir das tabelas brutas.
+    Retorna o número de pontos gravados.
+    """
+    checkpoints = []
+    for user_id, days in daily_movements(users).items():
+        balance = Decimal('0')
+        for day in sorted(days):
+            balance += days[day]
+            checkpoints.append(BalanceCheckpoint(
+                created_by_id=user_id, date=day, delta=days[day], balance=balance
+            ))
+    
+    with transaction.atomic():
+        existing = BalanceCheckpoint.objects.all()
+        if users is not None:
+            existing = existing.filter(created_by__in=users)
+        existing.delete()
+        BalanceCheckpoint.objects.bulk_create(checkpoints, batch_size=1000)
+    return len(checkpoints)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from financial.debts import advance_installments
+
+
+class Command(BaseCommand):
+    """
+    Avança a parcela atual das despesas parceladas (rodar mensalmente, ex.: via cron).
+    """
+    help = 'Avança current_installment de todos os parcelados até a parcela do mês atual.'
+    
+    def handle(self, *args, **options):
+        total = advance_installments()
+        self.stdout.write(self.style.SUCCESS(f'{total} parcelados avançados.'))
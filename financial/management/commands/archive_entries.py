@@ -0,0 +1,25 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from financial.archive import archive_entries, retention_cutoff
+
+
+class Command(BaseCommand):
+    """
+    Move para o arquivo os lançamentos únicos e pagos de meses fechados, anteriores
+    ao horizonte de retenção (rodar periodicamente, ex.: via cron).
+    """
+    help = 'Arquiva receitas e despesas pagas antigas (ARCHIVE_RETENTION_DAYS), em lotes.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--before', type=date.fromisoformat,
+                            help='Arquiva lançamentos anteriores a esta data (AAAA-MM-DD)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Lançamentos por lote/transação')
+    
+    def handle(self, *args, **options):
+        cutoff = options['before'] or retention_cutoff()
+        moved = archive_entries(cutoff, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Arquivados antes de {cutoff:%d/%m/%Y}: {moved['income']} receitas e {moved['expense']} despesas."
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from financial.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    """
+    Recria a tabela de agregados diários a partir das receitas e despesas.
+    """
+    help = 'Recria os agregados diários (DailyRollup) a partir das tabelas de lançamentos.'
+    
+    def handle(self, *args, **options):
+        total = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f'{total} agregados diários gravados.'))
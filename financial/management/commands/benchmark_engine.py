@@ -0,0 +1,130 @@
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from financial import columnar
+from financial.models import Income, Expense
+
+ENTRY_TYPES = ('fixed', 'single', 'installment')
+STATUSES = ('pending', 'paid')
+
+
+def generate_rows(count, seed):
+    """Gera tuplas sintéticas na ordem de EntryColumns.FIELDS."""
+    rng = random.Random(seed)
+    first_day = date.today().replace(day=1) - timedelta(days=3 * 365)
+    rows = []
+    for entry_id in range(1, count + 1):
+        entry_type = rng.choice(ENTRY_TYPES)
+        rows.append((
+            Decimal(rng.randint(100, 500000)).scaleb(-2),
+            entry_type,
+            rng.choice(STATUSES),
+            rng.randint(1, 30),
+            first_day + timedelta(days=rng.randint(0, 4 * 365)),
+            rng.randint(2, 24) if entry_type == 'installment' else None,
+            1 if entry_type == 'installment' else None,
+            entry_id,
+        ))
+    return rows
+
+
+def build_instances(model, rows):
+    return [
+        model(id=entry_id, amount=amount, entry_type=entry_type, status=status, category_id=category_id,
+              start_date=start_date, total_installments=total, current_installment=current)
+        for amount, entry_type, status, category_id, start_date, total, current, entry_id in rows
+    ]
+
+
+def project_with_instances(incomes, expenses, first_month, months, opening_balance):
+    """Projeção com instâncias de modelo e Decimal (mesma regra do planejamento)."""
+    def month_total(entries, month, entry_type):
+        if entry_type == 'fixed':
+            return sum((entry.amount for entry in entries if entry.entry_type == 'fixed'), Decimal('0'))
+        if entry_type == 'single':
+            return sum((
+                entry.amount for entry in entries
+                if entry.entry_type == 'single' and entry.start_date.year == month.year
+                and entry.start_date.month == month.month
+            ), Decimal('0'))
+        return sum((
+            entry.amount for entry in entries
+            if entry.entry_type == 'installment' and entry.start_date <= month
+        ), Decimal('0'))
+    
+    projection = []
+    accumulated = opening_balance
+    for offset in range(months):
+        month = columnar.month_from_index(columnar.month_index(first_month) + offset)
+        total_income = sum(month_total(incomes, month, entry_type) for entry_type in ENTRY_TYPES)
+        fixed_expenses = month_total(expenses, month, 'fixed')
+        installment_expenses = month_total(expenses, month, 'installment')
+        total_expenses = fixed_expenses + installment_expenses + month_total(expenses, month, 'single')
+        accumulated += total_income - total_expenses
+        projection.append((total_income, total_expenses, accumulated))
+    return projection
+
+
+def measure(function):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+class Command(BaseCommand):
+    """
+    Compara o motor colunar (centavos inteiros) com o caminho de instâncias e Decimal.
+    """
+    help = 'Mede tempo e memória da projeção mensal com instâncias/Decimal e com o motor colunar.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50000, help='Lançamentos sintéticos por tabela')
+        parser.add_argument('--months', type=int, default=12, help='Meses projetados')
+        parser.add_argument('--seed', type=int, default=42)
+    
+    def handle(self, *args, **options):
+        rows, months = options['rows'], options['months']
+        income_rows = generate_rows(rows, options['seed'])
+        expense_rows = generate_rows(rows, options['seed'] + 1)
+        first_month = date.today().replace(day=1)
+        
+        def decimal_path():
+            incomes = build_instances(Income, income_rows)
+            expenses = build_instances(Expense, expense_rows)
+            return project_with_instances(incomes, expenses, first_month, months, Decimal('0'))
+        
+        def columnar_path():
+            incomes = columnar.EntryColumns.from_rows(income_rows)
+            expenses = columnar.EntryColumns.from_rows(expense_rows)
+            return columnar.project_months(incomes, expenses, first_month, months)
+        
+        expected, decimal_time, decimal_peak = measure(decimal_path)
+        result, columnar_time, columnar_peak = measure(columnar_path)
+        
+        matches = all(
+            (columnar.to_cents(income), columnar.to_cents(expense), columnar.to_cents(accumulated))
+            == (month['total_income'], month['total_expenses'], month['accumulated_balance'])
+            for (income, expense, accumulated), month in zip(expected, result)
+        )
+        
+        backend = 'numpy' if columnar.use_numpy() else 'array'
+        self.stdout.write(f'{rows} lançamentos por tabela, {months} meses (motor: {backend})')
+        self.stdout.write(f'{"caminho":<22}{"tempo (s)":>12}{"pico (MiB)":>14}')
+        self.stdout.write(f'{"instâncias + Decimal":<22}{decimal_time:>12.3f}{decimal_peak / 2**20:>14.1f}')
+        self.stdout.write(f'{"colunar (centavos)":<22}{columnar_time:>12.3f}{columnar_peak / 2**20:>14.1f}')
+        if columnar_time:
+            self.stdout.write(f'Aceleração: {decimal_time / columnar_time:.1f}x')
+        
+        if matches:
+            self.stdout.write(self.style.SUCCESS('Resultados idênticos.'))
+        else:
+            self.stdout.write(self.style.ERROR('Os resultados divergem.'))
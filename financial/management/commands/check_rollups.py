@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from financial.rollups import find_inconsistencies, rebuild_rollups
+
+
+class Command(BaseCommand):
+    """
+    Compara os agregados diários com as tabelas de lançamentos.
+    """
+    help = 'Verifica se os agregados diários (DailyRollup) batem com receitas e despesas.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='Recria os agregados se houver divergências.')
+        parser.add_argument('--limit', type=int, default=20, help='Número máximo de divergências exibidas.')
+    
+    def handle(self, *args, **options):
+        differences = find_inconsistencies()
+        if not differences:
+            self.stdout.write(self.style.SUCCESS('Agregados consistentes.'))
+            return
+        
+        for key, expected, stored in differences[:options['limit']]:
+            user_id, day, kind, category_id, responsible, status = key
+            self.stdout.write(
+                f'{day} usuário={user_id} {kind} categoria={category_id} {responsible}/{status}: '
+                f'esperado R$ {expected[0]} ({expected[1]}), gravado R$ {stored[0]} ({stored[1]})'
+            )
+        
+        if options['fix']:
+            rebuild_rollups()
+            self.stdout.write(self.style.SUCCESS(f'{len(differences)} divergências corrigidas.'))
+            return
+        
+        raise CommandError(f'{len(differences)} divergências encontradas. Use --fix para recriar os agregados.')
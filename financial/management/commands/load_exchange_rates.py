@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from financial import budgets, ledger, rollups
+from financial.currency import load_rates
+
+
+class Command(BaseCommand):
+    """
+    Carrega cotações de um arquivo local (CSV ou JSON com currency, date, rate),
+    atualizando as já existentes na mesma data.
+    """
+    help = 'Carrega cotações de moedas estrangeiras (padrão: EXCHANGE_RATES_FILE).'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help='Arquivo .csv ou .json (padrão: EXCHANGE_RATES_FILE)')
+        parser.add_argument('--rebuild', action='store_true',
+                            help='Recalcula razão de saldos, agregados diários e consumo dos orçamentos com as novas cotações')
+    
+    def handle(self, *args, **options):
+        path = options['path'] or settings.EXCHANGE_RATES_FILE
+        try:
+            with transaction.atomic():
+                count = load_rates(path)
+        except FileNotFoundError:
+            raise CommandError(f'Arquivo não encontrado: {path}')
+        except ValueError as error:
+            raise CommandError(f'{path}: {error}')
+        self.stdout.write(self.style.SUCCESS(f'{count} cotações carregadas de {path}.'))
+        
+        # Razão, agregados e orçamentos guardam valores já convertidos: cotações novas
+        # para datas passadas só passam a valer neles após a reconstrução
+        if options['rebuild']:
+            checkpoints = ledger.rebuild_ledger()
+            rows = rollups.rebuild_rollups()
+            usages = budgets.rebuild()
+            self.stdout.write(f'Reconstruídos: {checkpoints} pontos do razão, {rows} agregados diários e '
+                              f'{usages} consumos de orçamento.')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from financial.ledger import rebuild_ledger
+
+
+class Command(BaseCommand):
+    """
+    Recria os pontos de controle do razão de saldos.
+    """
+    help = 'Recria os pontos de saldo diários (BalanceCheckpoint) a partir de caixa, receitas e despesas.'
+    
+    def handle(self, *args, **options):
+        total = rebuild_ledger()
+        self.stdout.write(self.style.SUCCESS(f'{total} pontos de saldo gravados.'))
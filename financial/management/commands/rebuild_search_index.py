@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from financial.search import rebuild_index, search_available
+
+
+class Command(BaseCommand):
+    """
+    Reconstrói o índice de busca textual (FTS5) de receitas e despesas.
+    """
+    help = 'Reconstrói o índice FTS5 de descrições e categorias dos lançamentos.'
+    
+    def handle(self, *args, **options):
+        if not search_available():
+            raise CommandError('Índice de busca indisponível (requer SQLite com FTS5 e migrações aplicadas).')
+        
+        total = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'{total} lançamentos indexados.'))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from financial.budgets import find_drift, repair
+
+
+class Command(BaseCommand):
+    """
+    Compara os contadores de consumo dos orçamentos com as despesas e corrige as divergências.
+    """
+    help = 'Reconcilia o consumo dos orçamentos (BudgetUsage) com as despesas.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Apenas lista as divergências, sem corrigir.')
+        parser.add_argument('--limit', type=int, default=20, help='Número máximo de divergências exibidas.')
+    
+    def handle(self, *args, **options):
+        differences = find_drift()
+        if not differences:
+            self.stdout.write(self.style.SUCCESS('Consumo dos orçamentos consistente.'))
+            return
+        
+        for (budget_id, start), expected, stored in differences[:options['limit']]:
+            self.stdout.write(
+                f'orçamento={budget_id} {start}: esperado pago R$ {expected[0]} / em aberto R$ {expected[1]}, '
+                f'gravado pago R$ {stored[0]} / em aberto R$ {stored[1]}'
+            )
+        
+        if options['dry_run']:
+            raise CommandError(f'{len(differences)} divergências encontradas. Rode sem --dry-run para corrigir.')
+        
+        repair(differences)
+        self.stdout.write(self.style.SUCCESS(f'{len(differences)} divergências corrigidas.'))
@@ -0,0 +1,33 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from financial.archive import restore_entries
+
+
+class Command(BaseCommand):
+    """
+    Devolve lançamentos arquivados às tabelas principais.
+    """
+    help = 'Restaura lançamentos arquivados (de um grupo familiar e/ou período).'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--household', type=int, help='Id do grupo familiar')
+        parser.add_argument('--from', dest='start', type=date.fromisoformat, help='Data inicial (AAAA-MM-DD)')
+        parser.add_argument('--to', dest='end', type=date.fromisoformat, help='Data final (AAAA-MM-DD)')
+        parser.add_argument('--all', action='store_true', help='Restaura todo o arquivo')
+        parser.add_argument('--batch-size', type=int, default=1000)
+    
+    def handle(self, *args, **options):
+        if not (options['all'] or options['household'] or options['start'] or options['end']):
+            raise CommandError('Informe --household, --from/--to ou --all.')
+        
+        restored = restore_entries(
+            household_id=options['household'],
+            start=options['start'],
+            end=options['end'],
+            batch_size=options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Restaurados: {restored['income']} receitas e {restored['expense']} despesas."
+        ))
@@ -0,0 +1,25 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from financial.reminders import send_due_reminders
+
+
+class Command(BaseCommand):
+    """
+    Envia lembretes das despesas pendentes que vencem nos próximos dias.
+    Pode ser executado várias vezes ao dia: vencimentos já avisados não são reenviados.
+    """
+    help = 'Envia um resumo por usuário com as despesas pendentes que vencem nos próximos dias.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=3, help='Janela de vencimento em dias (padrão: 3)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Usuários por lote de envio')
+        parser.add_argument('--dry-run', action='store_true', help='Apenas conta os lembretes, sem enviar')
+    
+    def handle(self, *args, **options):
+        users, reminders = send_due_reminders(
+            date.today(), days=options['days'], batch_size=options['batch_size'], dry_run=options['dry_run']
+        )
+        action = 'a enviar' if options['dry_run'] else 'enviados'
+        self.stdout.write(self.style.SUCCESS(f'{reminders} vencimentos em {users} resumos {action}.'))
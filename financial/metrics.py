@@ -0,0 +1,62 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+
+from . import currency, debts, ledger
+from .models import Income, Expense
+
+
+def current_metrics(household_id, today=None):
+    """
+    Métricas do mês atual do grupo familiar (saldo, receitas previstas e
+    indicadores de despesas), em três consultas. Valores em moeda estrangeira são
+    convertidos para a moeda base dentro das agregações.
+    """
+    today = today or date.today()
+    zero = Decimal('0')
+    amount = currency.converted()
+    
+    # Saldo atual (caixa + receitas pagas - despesas pagas) lido do razão de saldos
+    current_balance = ledger.balance_as_of(household_id, today)
+    
+    # Receitas previstas para o mês
+    monthly_income = Income.objects.filter(
+        household_id=household_id,
+        entry_type__in=['fixed', 'single'],
+        start_date__year=today.year,
+        start_date__month=today.month
+    ).aggregate(
+        total=Coalesce(Sum(amount), zero)
+    )['total']
+    
+    paid_this_month = Q(
+        status='paid',
+        paid_date__year=today.year,
+        paid_date__month=today.month
+    )
+    
+    # Despesas: todos os indicadores em uma única consulta
+    overdue_filter = Q(status='pending', start_date__lt=today)
+    expense_totals = Expense.objects.filter(
+        household_id=household_id
+    ).aggregate(
+        paid=Coalesce(Sum(amount, filter=paid_this_month), zero),
+        fixed=Coalesce(Sum(amount, filter=Q(entry_type='fixed')), zero),
+        debt=Coalesce(Sum(debts.remaining_debt_expression(amount), filter=Q(entry_type='installment')), zero),
+        pending=Coalesce(Sum(amount, filter=Q(status='pending')), zero),
+        overdue=Coalesce(Sum(amount, filter=overdue_filter), zero),
+        overdue_count=Count('id', filter=overdue_filter),
+    )
+    
+    return {
+        'current_balance': current_balance,
+        'monthly_fixed_expenses': expense_totals['fixed'],
+        'total_debt': expense_totals['debt'],
+        'monthly_income': monthly_income,
+        'paid_amount': expense_totals['paid'],
+        'pending_amount': expense_totals['pending'],
+        'overdue_amount': expense_totals['overdue'],
+        'overdue_count': expense_totals['overdue_count'],
+    }
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    # Índice FTS5 disponível apenas no SQLite; em outros bancos a busca usa o SearchFilter padrão
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE financial_entrysearch USING fts5("
+        "description, category_name, kind UNINDEXED, entry_id UNINDEXED, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    for kind, bit in (('income', 0), ('expense', 1)):
+        schema_editor.execute(
+            "INSERT INTO financial_entrysearch (rowid, kind, entry_id, description, category_name) "
+            f"SELECT e.id * 2 + {bit}, '{kind}', e.id, e.description, c.name "
+            f"FROM financial_{kind} e JOIN financial_category c ON c.id = e.category_id"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    schema_editor.execute('DROP TABLE IF EXISTS financial_entrysearch')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financial', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.4 on 2026-10-19 19:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_rollups(apps, schema_editor):
+    DailyRollup = apps.get_model('financial', 'DailyRollup')
+    for kind, model_name in (('income', 'Income'), ('expense', 'Expense')):
+        model = apps.get_model('financial', model_name)
+        rows = model.objects.values(
+            'created_by_id', 'entry_date', 'category_id', 'responsible', 'status'
+        ).annotate(total=Sum('amount'), count=Count('id')).order_by()
+        DailyRollup.objects.bulk_create([
+            DailyRollup(
+                created_by_id=row['created_by_id'],
+                date=row['entry_date'],
+                kind=kind,
+                category_id=row['category_id'],
+                responsible=row['responsible'],
+                status=row['status'],
+                total=row['total'],
+                count=row['count'],
+            )
+            for row in rows
+        ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financial', '0002_entry_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Data')),
+                ('kind', models.CharField(choices=[('income', 'Receita'), ('expense', 'Despesa')], max_length=10, verbose_name='Tipo')),
+                ('responsible', models.CharField(choices=[('person1', 'Pessoa 1'), ('person2', 'Pessoa 2'), ('both', 'Ambos')], max_length=10, verbose_name='Responsável')),
+                ('status', models.CharField(choices=[('pending', 'Pendente'), ('paid', 'Pago'), ('overdue', 'Atrasado')], max_length=10, verbose_name='Status')),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Soma')),
+                ('count', models.IntegerField(default=0, verbose_name='Quantidade')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='financial.category', verbose_name='Categoria')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Criado por')),
+            ],
+            options={
+                'verbose_name': 'Agregado Diário',
+                'verbose_name_plural': 'Agregados Diários',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['created_by', 'date'], name='rollup_user_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('created_by', 'date', 'kind', 'category', 'responsible', 'status'), name='unique_daily_rollup')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.4 on 2026-10-19 19:25
+
+import django.db.models.deletion
+from django.conf import settings
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_checkpoints(apps, schema_editor):
+    BalanceCheckpoint = apps.get_model('financial', 'BalanceCheckpoint')
+    sources = [
+        (apps.get_model('financial', 'CashFlow').objects.all(), 'date', 1),
+        (apps.get_model('financial', 'Income').objects.filter(status='paid', paid_date__isnull=False), 'paid_date', 1),
+        (apps.get_model('financial', 'Expense').objects.filter(status='paid', paid_date__isnull=False), 'paid_date', -1),
+    ]
+    movements = defaultdict(lambda: defaultdict(Decimal))
+    for queryset, date_field, sign in sources:
+        for row in queryset.values('created_by_id', date_field).annotate(total=Sum('amount')).order_by():
+            movements[row['created_by_id']][row[date_field]] += sign * row['total']
+
+    checkpoints = []
+    for user_id, days in movements.items():
+        balance = Decimal('0')
+        for day in sorted(days):
+            balance += days[day]
+            checkpoints.append(BalanceCheckpoint(created_by_id=user_id, date=day, delta=days[day], balance=balance))
+    BalanceCheckpoint.objects.bulk_create(checkpoints, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financial', '0003_daily_rollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BalanceCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Data')),
+                ('delta', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Movimentação do Dia')),
+                ('balance', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Saldo Acumulado')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Criado por')),
+            ],
+            options={
+                'verbose_name': 'Ponto de Saldo',
+                'verbose_name_plural': 'Pontos de Saldo',
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('created_by', 'date'), name='unique_balance_checkpoint')],
+            },
+        ),
+        migrations.RunPython(backfill_checkpoints, migrations.RunPython.noop),
+    ]
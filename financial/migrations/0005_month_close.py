@@ -0,0 +1,53 @@
+# Generated by Django 5.2.4 on 2026-10-19 19:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financial', '0004_balance_checkpoint'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthClose',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='Mês')),
+                ('closed_at', models.DateTimeField(auto_now_add=True, verbose_name='Fechado em')),
+                ('closed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Fechado por')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Fechamento Mensal',
+                'verbose_name_plural': 'Fechamentos Mensais',
+                'ordering': ['-month'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MonthSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('income', 'Receita'), ('expense', 'Despesa')], max_length=10, verbose_name='Tipo')),
+                ('responsible', models.CharField(choices=[('person1', 'Pessoa 1'), ('person2', 'Pessoa 2'), ('both', 'Ambos')], max_length=10, verbose_name='Responsável')),
+                ('status', models.CharField(choices=[('pending', 'Pendente'), ('paid', 'Pago'), ('overdue', 'Atrasado')], max_length=10, verbose_name='Status')),
+                ('entry_type', models.CharField(choices=[('fixed', 'Fixa'), ('single', 'Única'), ('installment', 'Parcelada')], max_length=15, verbose_name='Tipo de Lançamento')),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Soma')),
+                ('count', models.IntegerField(default=0, verbose_name='Quantidade')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='financial.category', verbose_name='Categoria')),
+                ('close', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='financial.monthclose', verbose_name='Fechamento')),
+            ],
+            options={
+                'verbose_name': 'Totais do Mês Fechado',
+                'verbose_name_plural': 'Totais dos Meses Fechados',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='monthclose',
+            constraint=models.UniqueConstraint(fields=('created_by', 'month'), name='unique_month_close'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.4 on 2026-10-19 19:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financial', '0005_month_close'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DueReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('due_date', models.DateField(verbose_name='Vencimento')),
+                ('sent_at', models.DateTimeField(auto_now_add=True, verbose_name='Enviado em')),
+            ],
+            options={
+                'verbose_name': 'Lembrete de Vencimento',
+                'verbose_name_plural': 'Lembretes de Vencimento',
+                'ordering': ['-due_date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['status', 'due_day'], name='expense_status_due_idx'),
+        ),
+        migrations.AddField(
+            model_name='duereminder',
+            name='expense',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='financial.expense', verbose_name='Despesa'),
+        ),
+        migrations.AddIndex(
+            model_name='duereminder',
+            index=models.Index(fields=['due_date'], name='reminder_due_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='duereminder',
+            constraint=models.UniqueConstraint(fields=('expense', 'due_date'), name='unique_due_reminder'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.4 on 2026-10-19 19:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_households(apps, schema_editor):
+    User = apps.get_model('authentication', 'User')
+    owners = {
+        'Category': 'created_by_id',
+        'Income': 'created_by_id',
+        'Expense': 'created_by_id',
+        'CashFlow': 'created_by_id',
+        'FinancialSummary': 'user_id',
+    }
+    for model_name, owner_field in owners.items():
+        household = User.objects.filter(pk=OuterRef(owner_field)).values('household_id')[:1]
+        apps.get_model('financial', model_name).objects.filter(
+            household__isnull=True
+        ).update(household_id=Subquery(household))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_household'),
+        ('financial', '0006_due_reminders'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+    
+    operations = [
+        migrations.AddField(
+            model_name='cashflow',
+            name='household',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='authentication.household', verbose_name='Grupo Familiar'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='household',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='authentication.household', verbose_name='Grupo Familiar'),
+        ),
+        migrations.AddField(
+            model_name='expense',
+            name='household',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='authentication.household', verbose_name='Grupo Familiar'),
+        ),
+        migrations.AddField(
+            model_name='financialsummary',
+            name='household',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='authentication.household', verbose_name='Grupo Familiar'),
+        ),
+        migrations.AddField(
+            model_name='income',
+            name='household',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='authentication.household', verbose_name='Grupo Familiar'),
+        ),
+        migrations.AddIndex(
+            model_name='cashflow',
+            index=models.Index(fields=['household', 'date'], name='cashflow_household_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['household', 'entry_date'], name='expense_household_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['household', 'entry_date'], name='income_household_date_idx'),
+        ),
+        migrations.RunPython(backfill_households, migrations.RunPython.noop),
+    ]
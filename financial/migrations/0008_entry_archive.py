@@ -0,0 +1,77 @@
+# Generated by Django 5.2.4 on 2026-10-19 19:46
+
+import django.core.validators
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_household_archived_through'),
+        ('financial', '0007_household'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedExpense',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('description', models.CharField(max_length=200, verbose_name='Descrição')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('0.01'))], verbose_name='Valor')),
+                ('entry_date', models.DateField(verbose_name='Data do Lançamento')),
+                ('start_date', models.DateField(verbose_name='Data de Início')),
+                ('due_day', models.IntegerField(validators=[django.core.validators.MinValueValidator(1)], verbose_name='Dia do Vencimento')),
+                ('entry_type', models.CharField(choices=[('fixed', 'Fixa'), ('single', 'Única'), ('installment', 'Parcelada')], max_length=15, verbose_name='Tipo')),
+                ('responsible', models.CharField(choices=[('person1', 'Pessoa 1'), ('person2', 'Pessoa 2'), ('both', 'Ambos')], max_length=10, verbose_name='Responsável')),
+                ('total_installments', models.IntegerField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(1)], verbose_name='Total de Parcelas')),
+                ('current_installment', models.IntegerField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(1)], verbose_name='Parcela Atual')),
+                ('status', models.CharField(choices=[('pending', 'Pendente'), ('paid', 'Pago'), ('overdue', 'Atrasado')], default='pending', max_length=10, verbose_name='Status')),
+                ('paid_date', models.DateField(blank=True, null=True, verbose_name='Data do Pagamento')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('archived_at', models.DateTimeField(verbose_name='Arquivado em')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_expenses', to='financial.category', verbose_name='Categoria')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Criado por')),
+                ('household', models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='authentication.household', verbose_name='Grupo Familiar')),
+            ],
+            options={
+                'verbose_name': 'Despesa Arquivada',
+                'verbose_name_plural': 'Despesas Arquivadas',
+                'ordering': ['-entry_date', '-created_at'],
+                'indexes': [models.Index(fields=['household', 'entry_date'], name='archexpense_household_date_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedIncome',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('description', models.CharField(max_length=200, verbose_name='Descrição')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('0.01'))], verbose_name='Valor')),
+                ('entry_date', models.DateField(verbose_name='Data do Lançamento')),
+                ('start_date', models.DateField(verbose_name='Data de Início')),
+                ('due_day', models.IntegerField(validators=[django.core.validators.MinValueValidator(1)], verbose_name='Dia do Vencimento')),
+                ('entry_type', models.CharField(choices=[('fixed', 'Fixa'), ('single', 'Única'), ('installment', 'Parcelada')], max_length=15, verbose_name='Tipo')),
+                ('responsible', models.CharField(choices=[('person1', 'Pessoa 1'), ('person2', 'Pessoa 2'), ('both', 'Ambos')], max_length=10, verbose_name='Responsável')),
+                ('total_installments', models.IntegerField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(1)], verbose_name='Total de Parcelas')),
+                ('current_installment', models.IntegerField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(1)], verbose_name='Parcela Atual')),
+                ('status', models.CharField(choices=[('pending', 'Pendente'), ('paid', 'Pago'), ('overdue', 'Atrasado')], default='pending', max_length=10, verbose_name='Status')),
+                ('paid_date', models.DateField(blank=True, null=True, verbose_name='Data do Pagamento')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('archived_at', models.DateTimeField(verbose_name='Arquivado em')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_incomes', to='financial.category', verbose_name='Categoria')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Criado por')),
+                ('household', models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='authentication.household', verbose_name='Grupo Familiar')),
+            ],
+            options={
+                'verbose_name': 'Receita Arquivada',
+                'verbose_name_plural': 'Receitas Arquivadas',
+                'ordering': ['-entry_date', '-created_at'],
+                'indexes': [models.Index(fields=['household', 'entry_date'], name='archincome_household_date_idx')],
+            },
+        ),
+    ]
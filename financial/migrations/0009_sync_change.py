@@ -0,0 +1,46 @@
+# Generated by Django 5.2.4 on 2026-10-19 19:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_changes(apps, schema_editor):
+    SyncChange = apps.get_model('financial', 'SyncChange')
+    changes = []
+    for kind, model_name in (('category', 'Category'), ('income', 'Income'), ('expense', 'Expense'),
+                             ('cashflow', 'CashFlow')):
+        rows = apps.get_model('financial', model_name).objects.filter(
+            household__isnull=False
+        ).order_by('id').values_list('household_id', 'id')
+        changes.extend(SyncChange(household_id=household_id, kind=kind, object_id=object_id)
+                       for household_id, object_id in rows)
+    SyncChange.objects.bulk_create(changes, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_household_archived_through'),
+        ('financial', '0008_entry_archive'),
+    ]
+    
+    operations = [
+        migrations.CreateModel(
+            name='SyncChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('category', 'Categoria'), ('income', 'Receita'), ('expense', 'Despesa'), ('cashflow', 'Fluxo de Caixa')], max_length=10, verbose_name='Tipo')),
+                ('object_id', models.BigIntegerField(verbose_name='Registro')),
+                ('deleted', models.BooleanField(default=False, verbose_name='Excluído')),
+                ('changed_at', models.DateTimeField(auto_now_add=True, verbose_name='Alterado em')),
+                ('household', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='authentication.household', verbose_name='Grupo Familiar')),
+            ],
+            options={
+                'verbose_name': 'Alteração Sincronizável',
+                'verbose_name_plural': 'Alterações Sincronizáveis',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['household', 'id'], name='sync_household_cursor_idx'), models.Index(fields=['household', 'kind', 'object_id'], name='sync_household_object_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_changes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.4 on 2026-10-19 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financial', '0009_sync_change'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedexpense',
+            name='currency',
+            field=models.CharField(choices=[('BRL', 'Real'), ('USD', 'Dólar americano'), ('EUR', 'Euro')], default='BRL', max_length=3, verbose_name='Moeda'),
+        ),
+        migrations.AddField(
+            model_name='archivedincome',
+            name='currency',
+            field=models.CharField(choices=[('BRL', 'Real'), ('USD', 'Dólar americano'), ('EUR', 'Euro')], default='BRL', max_length=3, verbose_name='Moeda'),
+        ),
+        migrations.AddField(
+            model_name='cashflow',
+            name='currency',
+            field=models.CharField(choices=[('BRL', 'Real'), ('USD', 'Dólar americano'), ('EUR', 'Euro')], default='BRL', max_length=3, verbose_name='Moeda'),
+        ),
+        migrations.AddField(
+            model_name='expense',
+            name='currency',
+            field=models.CharField(choices=[('BRL', 'Real'), ('USD', 'Dólar americano'), ('EUR', 'Euro')], default='BRL', max_length=3, verbose_name='Moeda'),
+        ),
+        migrations.AddField(
+            model_name='income',
+            name='currency',
+            field=models.CharField(choices=[('BRL', 'Real'), ('USD', 'Dólar americano'), ('EUR', 'Euro')], default='BRL', max_length=3, verbose_name='Moeda'),
+        ),
+        migrations.CreateModel(
+            name='ExchangeRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('currency', models.CharField(choices=[('BRL', 'Real'), ('USD', 'Dólar americano'), ('EUR', 'Euro')], max_length=3, verbose_name='Moeda')),
+                ('date', models.DateField(verbose_name='Data')),
+                ('rate', models.DecimalField(decimal_places=8, max_digits=18, verbose_name='Cotação')),
+            ],
+            options={
+                'verbose_name': 'Cotação',
+                'verbose_name_plural': 'Cotações',
+                'ordering': ['currency', '-date'],
+                'constraints': [models.UniqueConstraint(fields=('currency', 'date'), name='unique_exchange_rate')],
+            },
+        ),
+    ]
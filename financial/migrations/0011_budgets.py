@@ -0,0 +1,60 @@
+# Generated by Django 5.2.4 on 2026-10-19 20:11
+
+import django.core.validators
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_household_archived_through'),
+        ('financial', '0010_multi_currency'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Budget',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('monthly', 'Mensal'), ('yearly', 'Anual')], default='monthly', max_length=10, verbose_name='Período')),
+                ('limit', models.DecimalField(decimal_places=2, max_digits=12, validators=[django.core.validators.MinValueValidator(Decimal('0.01'))], verbose_name='Limite')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('category', models.ForeignKey(limit_choices_to={'type': 'expense'}, on_delete=django.db.models.deletion.CASCADE, related_name='budgets', to='financial.category', verbose_name='Categoria')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Criado por')),
+                ('household', models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='authentication.household', verbose_name='Grupo Familiar')),
+            ],
+            options={
+                'verbose_name': 'Orçamento',
+                'verbose_name_plural': 'Orçamentos',
+                'ordering': ['category__name', 'period'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BudgetUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateField(verbose_name='Início do período')),
+                ('paid', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Pago')),
+                ('pending', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Pendente')),
+                ('budget', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usages', to='financial.budget', verbose_name='Orçamento')),
+            ],
+            options={
+                'verbose_name': 'Consumo de Orçamento',
+                'verbose_name_plural': 'Consumos de Orçamento',
+                'ordering': ['-period_start'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='budget',
+            constraint=models.UniqueConstraint(fields=('household', 'category', 'period'), name='unique_budget'),
+        ),
+        migrations.AddConstraint(
+            model_name='budgetusage',
+            constraint=models.UniqueConstraint(fields=('budget', 'period_start'), name='unique_budget_usage'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.4 on 2026-10-19 20:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_households(apps, schema_editor):
+    User = apps.get_model('authentication', 'User')
+    household = User.objects.filter(pk=OuterRef('created_by_id')).values('household_id')[:1]
+    for model_name in ('DailyRollup', 'MonthClose'):
+        apps.get_model('financial', model_name).objects.filter(
+            household__isnull=True
+        ).update(household_id=Subquery(household))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_household_archived_through'),
+        ('financial', '0011_budgets'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+    
+    
+    operations = [
+        migrations.AddField(
+            model_name='dailyrollup',
+            name='household',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='authentication.household', verbose_name='Grupo Familiar'),
+        ),
+        migrations.AddField(
+            model_name='monthclose',
+            name='household',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='authentication.household', verbose_name='Grupo Familiar'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyrollup',
+            index=models.Index(fields=['household', 'date'], name='rollup_household_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monthclose',
+            index=models.Index(fields=['household', 'month'], name='close_household_month_idx'),
+        ),
+        migrations.RunPython(backfill_households, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-19 20:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financial', '0012_household_rollups_and_closes'),
+    ]
+    
+    operations = [
+        migrations.CreateModel(
+            name='EntrySearch',
+            fields=[
+                ('rowid', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(max_length=10)),
+                ('entry_id', models.BigIntegerField()),
+                ('description', models.TextField()),
+                ('category_name', models.TextField()),
+                ('document', models.TextField(db_column='financial_entrysearch')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'financial_entrysearch',
+                'managed': False,
+            },
+        ),
+    ]
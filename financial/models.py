@@ -1,9 +1,8 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 from datetime import date, timedelta
-from dateutil.relativedelta import relativedelta
 
 User = get_user_model()
 
@@ -23,6 +22,15 @@ class Category(models.Model):
     icon = models.CharField(max_length=50, blank=True, null=True, verbose_name='Ícone')
     is_default = models.BooleanField(default=False, verbose_name='Categoria Padrão')
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='Criado por')
+    household = models.ForeignKey(
+        'authentication.Household',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        verbose_name='Grupo Familiar'
+    )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
     
     class Meta:
@@ -35,7 +43,62 @@ class Category(models.Model):
         return f"{self.name} ({self.get_type_display()})"
 
 
-class BaseFinancialEntry(models.Model):
+class TrackedStateModel(models.Model):
+    """
+    Modelo base abstrato que guarda o estado carregado do banco para os campos em
+    TRACKED_FIELDS, permitindo calcular o delta de cada gravação (agregados e
+    razão de saldos) sem reler a linha.
+    """
+    TRACKED_FIELDS = ()
+    
+    class Meta:
+        abstract = True
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._tracked_state = instance.get_tracked_state()
+        return instance
+    
+    def get_tracked_state(self):
+        """
+        Retorna os valores atuais dos campos rastreados, ou None se algum foi adiado.
+        """
+        deferred = self.get_deferred_fields()
+        if any(field in deferred for field in self.TRACKED_FIELDS):
+            return None
+        return {field: getattr(self, field) for field in self.TRACKED_FIELDS}
+    
+    def capture_previous_state(self):
+        """
+        Guarda o estado anterior ao save. Usa o estado carregado do banco quando
+        disponível e só consulta o banco para instâncias sem esse registro.
+        """
+        previous = getattr(self, '_tracked_state', None)
+        if previous is None and self.pk is not None and not self._state.adding:
+            previous = type(self).objects.filter(pk=self.pk).values(*self.TRACKED_FIELDS).first()
+        self._tracked_previous = previous
+    
+    def pop_state_change(self):
+        """
+        Retorna (estado anterior, estado atual) da última gravação e passa a
+        considerar o estado atual como o carregado.
+        """
+        previous = getattr(self, '_tracked_previous', None)
+        current = self.get_tracked_state()
+        if current is None:
+            current = type(self).objects.filter(pk=self.pk).values(*self.TRACKED_FIELDS).get()
+        self._tracked_state = current
+        self._tracked_previous = None
+        return previous, current
+    
+    def save(self, *args, **kwargs):
+        # Registro e dados derivados (atualizados via post_save) na mesma transação
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+
+class BaseFinancialEntry(TrackedStateModel):
     """
     Modelo base abstrato para receitas e despesas.
     """
@@ -57,6 +120,12 @@ class BaseFinancialEntry(models.Model):
         ('overdue', 'Atrasado'),
     ]
     
+    CURRENCY_CHOICES = [
+        ('BRL', 'Real'),
+        ('USD', 'Dólar americano'),
+        ('EUR', 'Euro'),
+    ]
+    
     # Campos básicos
     description = models.CharField(max_length=200, verbose_name='Descrição')
     amount = models.DecimalField(
@@ -65,6 +134,7 @@ class BaseFinancialEntry(models.Model):
         validators=[MinValueValidator(Decimal('0.01'))],
         verbose_name='Valor'
     )
+    currency = models.CharField(max_length=3, choices=CURRENCY_CHOICES, default='BRL', verbose_name='Moeda')
     
     # Datas
     entry_date = models.DateField(verbose_name='Data do Lançamento')
@@ -98,6 +168,16 @@ class BaseFinancialEntry(models.Model):
     
     # Metadados
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='Criado por')
+    # Grupo familiar do autor na criação (preenchido no pre_save)
+    household = models.ForeignKey(
+        'authentication.Household',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        verbose_name='Grupo Familiar'
+    )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
     
@@ -105,6 +185,10 @@ class BaseFinancialEntry(models.Model):
         abstract = True
         ordering = ['-entry_date', '-created_at']
     
+    # Campos que alimentam os agregados diários, o razão de saldos e os orçamentos
+    TRACKED_FIELDS = ('created_by_id', 'household_id', 'entry_date', 'category_id', 'responsible', 'status',
+                      'paid_date', 'amount', 'currency')
+    
     def __str__(self):
         return f"{self.description} - R$ {self.amount}"
     
@@ -142,6 +226,9 @@ class BaseFinancialEntry(models.Model):
         if self.entry_type != 'installment' or not self.total_installments:
             return []
         
+        # Importado aqui: o dateutil só é necessário neste caminho pouco usado
+        from dateutil.relativedelta import relativedelta
+        
         dates = []
         current_date = self.start_date
         
@@ -180,6 +267,9 @@ class Income(BaseFinancialEntry):
         verbose_name = 'Receita'
         verbose_name_plural = 'Receitas'
         ordering = ['-entry_date', '-created_at']
+        indexes = [
+            models.Index(fields=['household', 'entry_date'], name='income_household_date_idx'),
+        ]
 
 
 class Expense(BaseFinancialEntry):
@@ -197,9 +287,108 @@ class Expense(BaseFinancialEntry):
         verbose_name = 'Despesa'
         verbose_name_plural = 'Despesas'
         ordering = ['-entry_date', '-created_at']
+        indexes = [
+            models.Index(fields=['household', 'entry_date'], name='expense_household_date_idx'),
+            # Busca de contas a vencer (lembretes): pendentes por dia de vencimento
+            models.Index(fields=['status', 'due_day'], name='expense_status_due_idx'),
+        ]
 
 
-class CashFlow(models.Model):
+class ArchivedIncome(BaseFinancialEntry):
+    """
+    Receita paga e antiga movida para o arquivo (mesmas colunas e id da original).
+    """
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.PROTECT,
+        related_name='archived_incomes',
+        verbose_name='Categoria'
+    )
+    archived_at = models.DateTimeField(verbose_name='Arquivado em')
+    
+    class Meta:
+        verbose_name = 'Receita Arquivada'
+        verbose_name_plural = 'Receitas Arquivadas'
+        ordering = ['-entry_date', '-created_at']
+        indexes = [
+            models.Index(fields=['household', 'entry_date'], name='archincome_household_date_idx'),
+        ]
+
+
+class ArchivedExpense(BaseFinancialEntry):
+    """
+    Despesa paga e antiga movida para o arquivo (mesmas colunas e id da original).
+    """
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.PROTECT,
+        related_name='archived_expenses',
+        verbose_name='Categoria'
+    )
+    archived_at = models.DateTimeField(verbose_name='Arquivado em')
+    
+    class Meta:
+        verbose_name = 'Despesa Arquivada'
+        verbose_name_plural = 'Despesas Arquivadas'
+        ordering = ['-entry_date', '-created_at']
+        indexes = [
+            models.Index(fields=['household', 'entry_date'], name='archexpense_household_date_idx'),
+        ]
+
+
+class FullTextMatch(models.Lookup):
+    """Lookup `match`: consulta FTS5 (`coluna MATCH termo`)."""
+    lookup_name = 'match'
+    
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+class EntrySearch(models.Model):
+    """
+    Índice FTS5 de receitas e despesas (tabela virtual criada na migração 0002,
+    apenas no SQLite e mantida por `financial.search`).
+    
+    Modelo não gerenciado: serve para juntar o índice às consultas de lançamentos
+    (`search__document__match`, ordenação por `search__rank`) em uma única consulta.
+    """
+    rowid = models.BigIntegerField(primary_key=True)
+    kind = models.CharField(max_length=10)
+    entry_id = models.BigIntegerField()
+    description = models.TextField()
+    category_name = models.TextField()
+    # Colunas ocultas do FTS5: a de mesmo nome da tabela recebe o MATCH e `rank`
+    # traz a relevância (bm25) da consulta
+    document = models.TextField(db_column='financial_entrysearch')
+    rank = models.FloatField()
+    income = models.ForeignObject(
+        Income,
+        on_delete=models.DO_NOTHING,
+        from_fields=['entry_id'],
+        to_fields=['id'],
+        related_name='search_entries',
+        related_query_name='search'
+    )
+    expense = models.ForeignObject(
+        Expense,
+        on_delete=models.DO_NOTHING,
+        from_fields=['entry_id'],
+        to_fields=['id'],
+        related_name='search_entries',
+        related_query_name='search'
+    )
+    
+    class Meta:
+        managed = False
+        db_table = 'financial_entrysearch'
+
+
+EntrySearch._meta.get_field('document').register_lookup(FullTextMatch)
+
+
+class CashFlow(TrackedStateModel):
     """
     Modelo para controle de caixa inicial e movimentações.
     """
@@ -211,6 +400,12 @@ class CashFlow(models.Model):
     
     description = models.CharField(max_length=200, verbose_name='Descrição')
     amount = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='Valor')
+    currency = models.CharField(
+        max_length=3,
+        choices=BaseFinancialEntry.CURRENCY_CHOICES,
+        default='BRL',
+        verbose_name='Moeda'
+    )
     flow_type = models.CharField(max_length=15, choices=FLOW_TYPES, verbose_name='Tipo')
     date = models.DateField(verbose_name='Data')
     responsible = models.CharField(
@@ -220,13 +415,27 @@ class CashFlow(models.Model):
     )
     
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='Criado por')
+    household = models.ForeignKey(
+        'authentication.Household',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        verbose_name='Grupo Familiar'
+    )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
     
+    TRACKED_FIELDS = ('created_by_id', 'date', 'amount', 'currency')
+    
     class Meta:
         verbose_name = 'Fluxo de Caixa'
         verbose_name_plural = 'Fluxos de Caixa'
         ordering = ['-date', '-created_at']
+        indexes = [
+            models.Index(fields=['household', 'date'], name='cashflow_household_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.description} - R$ {self.amount} ({self.get_flow_type_display()})"
@@ -237,6 +446,15 @@ class FinancialSummary(models.Model):
     Modelo para armazenar resumos financeiros mensais calculados.
     """
     user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='Usuário')
+    household = models.ForeignKey(
+        'authentication.Household',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        verbose_name='Grupo Familiar'
+    )
     year = models.IntegerField(verbose_name='Ano')
     month = models.IntegerField(verbose_name='Mês')
     
@@ -263,3 +481,312 @@ class FinancialSummary(models.Model):
     def __str__(self):
         return f"Resumo {self.month:02d}/{self.year} - {self.user.full_name}"
 
+
+class BalanceCheckpoint(models.Model):
+    """
+    Ponto de controle diário do saldo de um usuário.
+    
+    `delta` é a movimentação do dia (fluxo de caixa + receitas pagas - despesas
+    pagas) e `balance` o saldo acumulado até o fim do dia. Só existem linhas para
+    dias com movimentação; o saldo em qualquer data é o do último ponto anterior.
+    """
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='Criado por')
+    date = models.DateField(verbose_name='Data')
+    delta = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='Movimentação do Dia')
+    balance = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='Saldo Acumulado')
+    
+    class Meta:
+        verbose_name = 'Ponto de Saldo'
+        verbose_name_plural = 'Pontos de Saldo'
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['created_by', 'date'], name='unique_balance_checkpoint'),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} - R$ {self.balance}"
+
+
+class DailyRollup(models.Model):
+    """
+    Agregado diário de receitas e despesas, mantido incrementalmente a cada gravação.
+    
+    Cada linha soma os lançamentos de um usuário em um dia com a mesma combinação de
+    tipo, categoria, responsável e status. Relatórios por período somam poucas
+    centenas destas linhas em vez de varrer as tabelas de lançamentos. O grupo
+    familiar do autor é copiado em cada linha e acompanha o autor ao mudar de grupo.
+    """
+    KIND_CHOICES = Category.CATEGORY_TYPES
+    
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='Criado por')
+    household = models.ForeignKey(
+        'authentication.Household',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        verbose_name='Grupo Familiar'
+    )
+    date = models.DateField(verbose_name='Data')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, verbose_name='Tipo')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, verbose_name='Categoria')
+    responsible = models.CharField(
+        max_length=10,
+        choices=BaseFinancialEntry.RESPONSIBLE_CHOICES,
+        verbose_name='Responsável'
+    )
+    status = models.CharField(max_length=10, choices=BaseFinancialEntry.STATUS_CHOICES, verbose_name='Status')
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='Soma')
+    count = models.IntegerField(default=0, verbose_name='Quantidade')
+    
+    class Meta:
+        verbose_name = 'Agregado Diário'
+        verbose_name_plural = 'Agregados Diários'
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['created_by', 'date', 'kind', 'category', 'responsible', 'status'],
+                name='unique_daily_rollup'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['created_by', 'date'], name='rollup_user_date_idx'),
+            models.Index(fields=['household', 'date'], name='rollup_household_date_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} {self.get_kind_display()} - R$ {self.total} ({self.count})"
+
+
+class MonthClose(models.Model):
+    """
+    Fechamento de um mês para um usuário.
+    
+    Enquanto o mês estiver fechado, receitas e despesas do usuário com data de
+    lançamento no mês não podem ser criadas, alteradas ou excluídas, e os relatórios
+    leem os totais congelados em MonthSnapshot em vez dos lançamentos.
+    O mês é fechado para todos os membros do grupo familiar de uma vez.
+    """
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='Usuário')
+    household = models.ForeignKey(
+        'authentication.Household',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        verbose_name='Grupo Familiar'
+    )
+    month = models.DateField(verbose_name='Mês')
+    closed_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Fechado por'
+    )
+    closed_at = models.DateTimeField(auto_now_add=True, verbose_name='Fechado em')
+    
+    class Meta:
+        verbose_name = 'Fechamento Mensal'
+        verbose_name_plural = 'Fechamentos Mensais'
+        ordering = ['-month']
+        constraints = [
+            models.UniqueConstraint(fields=['created_by', 'month'], name='unique_month_close'),
+        ]
+        indexes = [
+            models.Index(fields=['household', 'month'], name='close_household_month_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.month:%m/%Y} - {self.created_by}"
+
+
+class MonthSnapshot(models.Model):
+    """
+    Totais congelados de um mês fechado por tipo, categoria, responsável, status e
+    tipo de lançamento. Gravado uma única vez no fechamento e removido na reabertura.
+    """
+    close = models.ForeignKey(
+        MonthClose,
+        on_delete=models.CASCADE,
+        related_name='snapshots',
+        verbose_name='Fechamento'
+    )
+    kind = models.CharField(max_length=10, choices=Category.CATEGORY_TYPES, verbose_name='Tipo')
+    category = models.ForeignKey(Category, on_delete=models.PROTECT, verbose_name='Categoria')
+    responsible = models.CharField(
+        max_length=10,
+        choices=BaseFinancialEntry.RESPONSIBLE_CHOICES,
+        verbose_name='Responsável'
+    )
+    status = models.CharField(max_length=10, choices=BaseFinancialEntry.STATUS_CHOICES, verbose_name='Status')
+    entry_type = models.CharField(max_length=15, choices=BaseFinancialEntry.ENTRY_TYPES, verbose_name='Tipo de Lançamento')
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='Soma')
+    count = models.IntegerField(default=0, verbose_name='Quantidade')
+    
+    class Meta:
+        verbose_name = 'Totais do Mês Fechado'
+        verbose_name_plural = 'Totais dos Meses Fechados'
+    
+    def __str__(self):
+        return f"{self.close.month:%m/%Y} {self.get_kind_display()} - R$ {self.total} ({self.count})"
+
+
+class DueReminder(models.Model):
+    """
+    Registro de lembrete de vencimento enviado, um por despesa e data de vencimento.
+    Garante que execuções repetidas do envio não dupliquem e-mails.
+    """
+    expense = models.ForeignKey(Expense, on_delete=models.CASCADE, related_name='reminders', verbose_name='Despesa')
+    due_date = models.DateField(verbose_name='Vencimento')
+    sent_at = models.DateTimeField(auto_now_add=True, verbose_name='Enviado em')
+    
+    class Meta:
+        verbose_name = 'Lembrete de Vencimento'
+        verbose_name_plural = 'Lembretes de Vencimento'
+        ordering = ['-due_date']
+        constraints = [
+            models.UniqueConstraint(fields=['expense', 'due_date'], name='unique_due_reminder'),
+        ]
+        indexes = [
+            models.Index(fields=['due_date'], name='reminder_due_date_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.expense} - {self.due_date}"
+
+
+class SyncChange(models.Model):
+    """
+    Última alteração de um registro sincronizável (categoria, receita, despesa ou
+    movimentação de caixa) de um grupo familiar.
+    
+    Cada gravação substitui a linha do registro por uma nova, de id maior: o id é o
+    cursor monotônico do feed de alterações e cada registro aparece uma única vez.
+    Exclusões mantêm a linha com `deleted` (tombstone).
+    """
+    KIND_CHOICES = [
+        ('category', 'Categoria'),
+        ('income', 'Receita'),
+        ('expense', 'Despesa'),
+        ('cashflow', 'Fluxo de Caixa'),
+    ]
+    
+    household = models.ForeignKey(
+        'authentication.Household',
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Grupo Familiar'
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, verbose_name='Tipo')
+    object_id = models.BigIntegerField(verbose_name='Registro')
+    deleted = models.BooleanField(default=False, verbose_name='Excluído')
+    changed_at = models.DateTimeField(auto_now_add=True, verbose_name='Alterado em')
+    
+    class Meta:
+        verbose_name = 'Alteração Sincronizável'
+        verbose_name_plural = 'Alterações Sincronizáveis'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['household', 'id'], name='sync_household_cursor_idx'),
+            models.Index(fields=['household', 'kind', 'object_id'], name='sync_household_object_idx'),
+        ]
+    
+    def __str__(self):
+        action = 'excluído' if self.deleted else 'alterado'
+        return f"#{self.id} {self.get_kind_display()} {self.object_id} ({action})"
+
+
+class ExchangeRate(models.Model):
+    """
+    Cotação de uma moeda estrangeira em uma data: valor de uma unidade em BRL.
+    Carregada de arquivo pelo comando load_exchange_rates (ver `currency`).
+    """
+    currency = models.CharField(max_length=3, choices=BaseFinancialEntry.CURRENCY_CHOICES, verbose_name='Moeda')
+    date = models.DateField(verbose_name='Data')
+    rate = models.DecimalField(max_digits=18, decimal_places=8, verbose_name='Cotação')
+    
+    class Meta:
+        verbose_name = 'Cotação'
+        verbose_name_plural = 'Cotações'
+        ordering = ['currency', '-date']
+        constraints = [
+            models.UniqueConstraint(fields=['currency', 'date'], name='unique_exchange_rate'),
+        ]
+    
+    def __str__(self):
+        return f"{self.currency} {self.date}: {self.rate}"
+
+
+class Budget(models.Model):
+    """
+    Orçamento de uma categoria de despesa do grupo familiar: limite por mês ou por ano.
+    O consumo de cada período fica em BudgetUsage (ver `budgets`).
+    """
+    PERIOD_CHOICES = [
+        ('monthly', 'Mensal'),
+        ('yearly', 'Anual'),
+    ]
+    
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        limit_choices_to={'type': 'expense'},
+        related_name='budgets',
+        verbose_name='Categoria'
+    )
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES, default='monthly', verbose_name='Período')
+    limit = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        validators=[MinValueValidator(Decimal('0.01'))],
+        verbose_name='Limite'
+    )
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='Criado por')
+    household = models.ForeignKey(
+        'authentication.Household',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        verbose_name='Grupo Familiar'
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
+    
+    class Meta:
+        verbose_name = 'Orçamento'
+        verbose_name_plural = 'Orçamentos'
+        ordering = ['category__name', 'period']
+        constraints = [
+            models.UniqueConstraint(fields=['household', 'category', 'period'], name='unique_budget'),
+        ]
+    
+    def __str__(self):
+        return f"{self.category.name} ({self.get_period_display()}) - R$ {self.limit}"
+
+
+class BudgetUsage(models.Model):
+    """
+    Consumo de um orçamento em um período (mês ou ano iniciado em `period_start`),
+    na moeda base, mantido incrementalmente a cada gravação de despesa.
+    """
+    budget = models.ForeignKey(Budget, on_delete=models.CASCADE, related_name='usages', verbose_name='Orçamento')
+    period_start = models.DateField(verbose_name='Início do período')
+    paid = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='Pago')
+    pending = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='Pendente')
+    
+    class Meta:
+        verbose_name = 'Consumo de Orçamento'
+        verbose_name_plural = 'Consumos de Orçamento'
+        ordering = ['-period_start']
+        constraints = [
+            models.UniqueConstraint(fields=['budget', 'period_start'], name='unique_budget_usage'),
+        ]
+    
+    def __str__(self):
+        return f"{self.budget} {self.period_start}: R$ {self.paid + self.pending}"
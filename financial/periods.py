@@ -0,0 +1,155 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, DateField, Exists, ExpressionWrapper, OuterRef, Q, Sum
+from django.db.models.functions import TruncMonth
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .columnar import add_months
+from .currency import converted
+from .models import MonthClose, MonthSnapshot
+from .rollups import ENTRY_MODELS
+
+User = get_user_model()
+
+SNAPSHOT_FIELDS = ('category_id', 'responsible', 'status', 'entry_type')
+
+
+class ClosedPeriodError(APIException):
+    """
+    Tentativa de alterar um lançamento de um mês fechado.
+    """
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'O mês deste lançamento está fechado. Reabra o mês para alterá-lo.'
+    default_code = 'period_closed'
+
+
+def month_start(day):
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    return day.replace(day=1)
+
+
+def check_open(*points):
+    """
+    Garante que nenhum dos pares (usuário, data) informados cai em um mês fechado.
+    Uma única consulta, feita apenas se houver algum par.
+    """
+    condition = Q()
+    for user_id, day in points:
+        if user_id is not None and day is not None:
+            condition |= Q(created_by_id=user_id, month=month_start(day))
+    if condition and MonthClose.objects.filter(condition).exists():
+        raise ClosedPeriodError()
+
+
+def check_entry_open(instance, previous=None):
+    """
+    Verifica o mês atual e o anterior (antes da edição) de um lançamento.
+    """
+    points = [(instance.created_by_id, instance.entry_date)]
+    if previous:
+        points.append((previous['created_by_id'], previous['entry_date']))
+    check_open(*points)
+
+
+def is_closed(user_id, day):
+    return MonthClose.objects.filter(created_by_id=user_id, month=month_start(day)).exists()
+
+
+def closed_month_exists(field='entry_date', start=None, end=None):
+    """
+    Expressão Exists que indica se a linha externa pertence a um mês fechado do
+    seu autor, opcionalmente restrita aos meses entre `start` e `end`.
+    """
+    closes = MonthClose.objects.filter(
+        created_by=OuterRef('created_by'),
+        month=TruncMonth(ExpressionWrapper(OuterRef(field), output_field=DateField()))
+    )
+    if start is not None:
+        closes = closes.filter(month__gte=start)
+    if end is not None:
+        closes = closes.filter(month__lte=end)
+    return Exists(closes)
+
+
+def closed_entries(queryset):
+    """Filtra do queryset os lançamentos que estão em meses fechados."""
+    return queryset.filter(closed_month_exists())
+
+
+def full_months(start, end):
+    """
+    Retorna (primeiro, último) mês inteiramente contido em [start, end], ou None.
+    """
+    first = start if start.day == 1 else add_months(start, 1)
+    last = add_months(end + timedelta(days=1), -1)
+    if first > last:
+        return None
+    return first, last
+
+
+def close_month(household_id, month, closed_by=None):
+    """
+    Fecha o mês para os membros do grupo familiar, gravando os totais congelados.
+    Membros com o mês já fechado são ignorados. Retorna os fechamentos criados.
+    """
+    month = month_start(month)
+    next_month = add_months(month, 1)
+    
+    with transaction.atomic():
+        already_closed = MonthClose.objects.filter(household_id=household_id, month=month).values('created_by_id')
+        members = User.objects.filter(household_id=household_id).exclude(pk__in=already_closed)
+        closes = {
+            user_id: MonthClose.objects.create(
+                created_by_id=user_id, household_id=household_id, month=month, closed_by=closed_by
+            )
+            for user_id in members.values_list('pk', flat=True)
+        }
+        if not closes:
+            return []
+        
+        snapshots = []
+        for kind, model in ENTRY_MODELS.items():
+            rows = model.objects.filter(
+                household_id=household_id,
+                created_by__in=list(closes),
+                entry_date__gte=month,
+                entry_date__lt=next_month
+            ).values('created_by_id', *SNAPSHOT_FIELDS).annotate(
+                sum=Sum(converted()), entries=Count('id')
+            ).order_by()
+            for row in rows:
+                snapshots.append(MonthSnapshot(
+                    close=closes[row['created_by_id']],
+                    kind=kind,
+                    total=row['sum'],
+                    count=row['entries'],
+                    **{field: row[field] for field in SNAPSHOT_FIELDS}
+                ))
+        MonthSnapshot.objects.bulk_create(snapshots, batch_size=1000)
+    return list(closes.values())
+
+
+def reopen_month(household_id, month):
+    """
+    Reabre o mês para o grupo familiar, descartando os totais congelados.
+    Retorna o número de fechamentos removidos.
+    """
+    deleted, per_model = MonthClose.objects.filter(household_id=household_id, month=month_start(month)).delete()
+    return per_model.get(MonthClose._meta.label, 0)
+
+
+def snapshot_rows(household_id, kind, start, end):
+    """
+    Totais congelados dos meses fechados do grupo familiar entre `start` e `end`
+    (primeiros dias do mês).
+    """
+    return MonthSnapshot.objects.filter(
+        close__household_id=household_id,
+        close__month__gte=start,
+        close__month__lte=end,
+        kind=kind
+    )
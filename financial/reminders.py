@@ -0,0 +1,135 @@
+import calendar
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection, send_mass_mail
+from django.db import transaction
+from django.db.models import Q
+
+from . import currency
+from .columnar import month_index
+from .models import DueReminder, Expense
+
+REMINDER_FIELDS = ('id', 'description', 'amount', 'currency', 'entry_date', 'due_day', 'entry_type', 'start_date',
+                   'total_installments', 'created_by_id', 'created_by__email', 'created_by__first_name')
+
+
+def window_dates(today, days):
+    """Datas de hoje até `days` dias à frente (inclusive)."""
+    return [today + timedelta(days=offset) for offset in range(days + 1)]
+
+
+def due_day_filter(dates):
+    """
+    Filtro por dia de vencimento para as datas da janela. No último dia do mês também
+    vencem os lançamentos com dia maior que o mês (ex.: dia 31 em fevereiro).
+    """
+    condition = Q(due_day__in={day.day for day in dates})
+    for day in dates:
+        if day.day == calendar.monthrange(day.year, day.month)[1]:
+            condition |= Q(due_day__gt=day.day)
+    return condition
+
+
+def matches_due_day(due_day, day):
+    last_day = calendar.monthrange(day.year, day.month)[1]
+    return min(due_day, last_day) == day.day
+
+
+def is_due_on(entry_type, start_date, total_installments, day):
+    """Indica se a despesa tem parcela/ocorrência vencendo no mês de `day`."""
+    offset = month_index(day) - month_index(start_date)
+    if entry_type == 'single':
+        return offset == 0
+    if entry_type == 'installment':
+        return 0 <= offset < (total_installments or 1)
+    return offset >= 0
+
+
+def find_due_expenses(today, days):
+    """
+    Despesas pendentes que vencem na janela, de todos os usuários, em uma única
+    consulta (índice status + due_day). Retorna tuplas (linha, data de vencimento).
+    """
+    dates = window_dates(today, days)
+    rows = Expense.objects.filter(
+        due_day_filter(dates),
+        status='pending',
+        start_date__lte=dates[-1]
+    ).order_by('created_by_id', 'due_day', 'id').values(*REMINDER_FIELDS)
+    
+    due = []
+    for row in rows.iterator(chunk_size=2000):
+        for day in dates:
+            if matches_due_day(row['due_day'], day) and is_due_on(
+                row['entry_type'], row['start_date'], row['total_installments'], day
+            ):
+                due.append((row, day))
+                break
+    return due
+
+
+def exclude_already_sent(due, today, days):
+    """Remove os vencimentos que já tiveram lembrete enviado (uma consulta para a janela)."""
+    sent = set(DueReminder.objects.filter(
+        due_date__gte=today, due_date__lte=today + timedelta(days=days)
+    ).values_list('expense_id', 'due_date'))
+    return [(row, day) for row, day in due if (row['id'], day) not in sent]
+
+
+def format_amount(value, code=currency.BASE_CURRENCY):
+    prefix = 'R$' if code == currency.BASE_CURRENCY else code
+    return f"{prefix} {value:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+
+
+def build_digest(user_rows, days):
+    """Monta o e-mail (assunto, corpo, remetente, destinatários) de um usuário."""
+    first = user_rows[0][0]
+    lines = [f"Olá, {first['created_by__first_name'] or first['created_by__email']}!", '']
+    lines.append(f'Você tem {len(user_rows)} conta(s) a vencer nos próximos {days} dias:')
+    lines.append('')
+    for row, day in sorted(user_rows, key=lambda item: (item[1], item[0]['description'])):
+        lines.append(f"- {day:%d/%m}: {row['description']} ({format_amount(row['amount'], row['currency'])})")
+    lines.append('')
+    # Total na moeda base, pelo cache de cotações
+    total = sum(currency.convert(row['amount'], row['currency'], row['entry_date']) for row, _ in user_rows)
+    lines.append(f'Total: {format_amount(total)}')
+    subject = f'Contas a vencer nos próximos {days} dias'
+    return subject, '\n'.join(lines), settings.DEFAULT_FROM_EMAIL, [first['created_by__email']]
+
+
+def send_due_reminders(today, days=3, batch_size=500, dry_run=False):
+    """
+    Envia um resumo por usuário com as despesas que vencem na janela.
+    
+    As mensagens saem em lotes de `batch_size` usuários por uma única conexão SMTP.
+    Antes de cada lote os lembretes são registrados em DueReminder (ignorando os já
+    existentes); se o envio do lote falhar, os registros do lote são desfeitos e
+    serão tentados na próxima execução. Retorna (usuários, vencimentos).
+    """
+    due = exclude_already_sent(find_due_expenses(today, days), today, days)
+    
+    by_user = defaultdict(list)
+    for row, day in due:
+        if row['created_by__email']:
+            by_user[row['created_by_id']].append((row, day))
+    if dry_run or not by_user:
+        return len(by_user), sum(len(rows) for rows in by_user.values())
+    
+    users = list(by_user.values())
+    connection = get_connection(fail_silently=False)
+    connection.open()
+    try:
+        for start in range(0, len(users), batch_size):
+            batch = users[start:start + batch_size]
+            with transaction.atomic():
+                DueReminder.objects.bulk_create(
+                    [DueReminder(expense_id=row['id'], due_date=day) for rows in batch for row, day in rows],
+                    ignore_conflicts=True,
+                    batch_size=1000
+                )
+                send_mass_mail([build_digest(rows, days) for rows in batch], connection=connection)
+    finally:
+        connection.close()
+    return len(by_user), len(due)
@@ -0,0 +1,193 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from . import currency
+from .models import ArchivedExpense, ArchivedIncome, DailyRollup, Income, Expense
+
+User = get_user_model()
+
+ENTRY_MODELS = {
+    'income': Income,
+    'expense': Expense,
+}
+
+# Lançamentos arquivados continuam contando nos agregados
+ARCHIVE_MODELS = {
+    'income': ArchivedIncome,
+    'expense': ArchivedExpense,
+}
+
+KEY_FIELDS = ('created_by_id', 'date', 'kind', 'category_id', 'responsible', 'status')
+
+
+def entry_key(kind, state):
+    """Monta a chave do agregado a partir do estado de um lançamento."""
+    return (
+        state['created_by_id'],
+        state['entry_date'],
+        kind,
+        state['category_id'],
+        state['responsible'],
+        state['status'],
+    )
+
+
+def base_amount(state):
+    """Valor do lançamento na moeda base (cotação da data do lançamento)."""
+    return currency.convert(state['amount'], state['currency'], state['entry_date'])
+
+
+def apply_delta(key, total, count, household_id=None):
+    """
+    Soma `total`/`count` na linha do agregado com a chave dada, criando-a se necessário
+    (com o grupo familiar do autor).
+    """
+    lookup = dict(zip(KEY_FIELDS, key))
+    updated = DailyRollup.objects.filter(**lookup).update(
+        total=F('total') + total,
+        count=F('count') + count
+    )
+    if updated:
+        return
+    
+    try:
+        with transaction.atomic():
+            DailyRollup.objects.create(total=total, count=count, household_id=household_id, **lookup)
+    except IntegrityError:
+        # Outra transação criou a linha entre o UPDATE e o INSERT
+        DailyRollup.objects.filter(**lookup).update(
+            total=F('total') + total,
+            count=F('count') + count
+        )
+
+
+def record_change(kind, previous, current):
+    """
+    Atualiza os agregados após salvar um lançamento, a partir do estado anterior
+    (None para lançamentos novos) e do estado atual.
+    """
+    old_key = entry_key(kind, previous) if previous else None
+    new_key = entry_key(kind, current)
+    
+    if old_key == new_key:
+        difference = base_amount(current) - base_amount(previous)
+        if difference:
+            apply_delta(new_key, difference, 0, current['household_id'])
+    else:
+        if previous:
+            apply_delta(old_key, -base_amount(previous), -1, previous['household_id'])
+        apply_delta(new_key, base_amount(current), 1, current['household_id'])
+
+
+def record_delete(kind, state):
+    apply_delta(entry_key(kind, state), -base_amount(state), -1, state['household_id'])
+
+
+def apply_status_change(queryset, status):
+    """
+    Move os agregados dos lançamentos do queryset para o novo status, antes de um
+    `queryset.update(status=...)` (que não dispara sinais). Uma consulta agrupada
+    e duas atualizações por grupo, independente do número de lançamentos.
+    """
+    kind = queryset.model._meta.model_name
+    groups = queryset.exclude(status=status).values(
+        'created_by_id', 'household_id', 'entry_date', 'category_id', 'responsible', 'status'
+    ).annotate(total=Sum(currency.converted()), count=Count('id')).order_by()
+    
+    for group in groups:
+        household_id = group['household_id']
+        apply_delta(entry_key(kind, group), -group['total'], -group['count'], household_id)
+        apply_delta(entry_key(kind, {**group, 'status': status}), group['total'], group['count'], household_id)
+
+
+def aggregate_entries(users=None):
+    """
+    Calcula os agregados diretamente das tabelas de lançamentos (incluindo o arquivo).
+    Retorna {chave: (soma, quantidade)}.
+    """
+    result = {}
+    for kind, model in [*ENTRY_MODELS.items(), *ARCHIVE_MODELS.items()]:
+        queryset = model.objects.all()
+        if users is not None:
+            queryset = queryset.filter(created_by__in=users)
+        rows = queryset.values(
+            'created_by_id', 'entry_date', 'category_id', 'responsible', 'status'
+        ).annotate(total=Sum(currency.converted()), count=Count('id')).order_by()
+        for row in rows:
+            key = entry_key(kind, row)
+            total, count = result.get(key, (Decimal('0'), 0))
+            result[key] = (total + row['total'], count + row['count'])
+    return result
+
+
+def rebuild_rollups(users=None):
+    """
+    Recria os agregados (de todos os usuários ou apenas dos informados), com o
+    grupo familiar atual de cada autor. Retorna o número de linhas gravadas.
+    """
+    expected = aggregate_entries(users)
+    with transaction.atomic():
+        existing = DailyRollup.objects.all()
+        if users is not None:
+            existing = existing.filter(created_by__in=users)
+        existing.delete()
+        DailyRollup.objects.bulk_create(
+            [
+                DailyRollup(total=total, count=count, **dict(zip(KEY_FIELDS, key)))
+                for key, (total, count) in expected.items()
+            ],
+            batch_size=1000
+        )
+        household = User.objects.filter(pk=OuterRef('created_by_id')).values('household_id')[:1]
+        existing.update(household_id=Subquery(household))
+    return len(expected)
+
+
+def find_inconsistencies(users=None):
+    """
+    Compara os agregados com as tabelas de lançamentos.
+    Retorna lista de (chave, esperado, armazenado), com (soma, quantidade) em cada lado.
+    """
+    expected = aggregate_entries(users)
+    stored = {}
+    rollups = DailyRollup.objects.exclude(count=0, total=0)
+    if users is not None:
+        rollups = rollups.filter(created_by__in=users)
+    for row in rollups.values(*KEY_FIELDS, 'total', 'count'):
+        stored[tuple(row[field] for field in KEY_FIELDS)] = (row['total'], row['count'])
+    
+    empty = (Decimal('0'), 0)
+    differences = []
+    for key in sorted(set(expected) | set(stored), key=repr):
+        if expected.get(key, empty) != stored.get(key, empty):
+            differences.append((key, expected.get(key, empty), stored.get(key, empty)))
+    return differences
+
+
+def breakdown(household_id, start, end, kind=None, group='category'):
+    """
+    Soma os agregados do grupo familiar em um período, agrupando por categoria,
+    responsável ou status.
+    """
+    group_field = {
+        'category': 'category_id',
+        'responsible': 'responsible',
+        'status': 'status',
+    }[group]
+    values = ['kind', group_field]
+    if group == 'category':
+        values += ['category__name', 'category__color']
+    
+    queryset = DailyRollup.objects.filter(household_id=household_id, date__gte=start, date__lte=end)
+    if kind:
+        queryset = queryset.filter(kind=kind)
+    
+    return queryset.values(*values).annotate(
+        sum=Coalesce(Sum('total'), Decimal('0')),
+        entries=Sum('count')
+    ).filter(entries__gt=0).order_by('kind', '-sum')
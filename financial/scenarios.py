@@ -0,0 +1,107 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from . import columnar
+
+# Este módulo e `columnar` não importam modelos do Django ao serem carregados: os
+# processos do pool (inclusive com o método spawn) os importam sem os apps do
+# Django prontos, e as funções executadas lá recebem apenas colunas e dicionários
+# simples, com os valores já convertidos para centavos na moeda base.
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_workers = None
+
+
+def get_pool(workers):
+    """Pool de processos do worker atual, criado sob demanda e reaproveitado."""
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _pool_workers = workers
+    return _pool
+
+
+def reset_pool():
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = _pool_workers = None
+
+
+def apply_scenario(incomes, expenses, scenario):
+    """
+    Aplica as alterações do cenário sobre cópias das colunas da base.
+    
+    `scenario` tem `remove` e `amounts` por tipo ({'income': ..., 'expense': ...}) e
+    `add`, lista de lançamentos hipotéticos com valores em centavos.
+    """
+    base = {'income': incomes, 'expense': expenses}
+    result = {}
+    for kind, columns in base.items():
+        changed = (
+            scenario['remove'].get(kind) or scenario['amounts'].get(kind)
+            or any(entry['kind'] == kind for entry in scenario['add'])
+        )
+        if changed:
+            columns = columns.derive(scenario['remove'].get(kind, ()), scenario['amounts'].get(kind))
+        result[kind] = columns
+    
+    for entry in scenario['add']:
+        installment = entry['entry_type'] == 'installment'
+        result[entry['kind']].append(
+            entry['amount'], entry['entry_type'], 'pending', 0, entry['start_date'],
+            entry.get('total_installments') if installment else None, 1 if installment else None
+        )
+    return result['income'], result['expense']
+
+
+def lowest_balance(projection):
+    """Mês com o menor saldo acumulado (o primeiro, em caso de empate)."""
+    return min(projection, key=lambda month: month['accumulated_balance'])
+
+
+def evaluate(incomes, expenses, scenario, first_month, months, opening_balance):
+    incomes, expenses = apply_scenario(incomes, expenses, scenario)
+    projection = columnar.project_months(incomes, expenses, first_month, months, opening_balance)
+    return {
+        'name': scenario['name'],
+        'months': projection,
+        'lowest_balance': lowest_balance(projection),
+    }
+
+
+def evaluate_chunk(incomes, expenses, scenarios, first_month, months, opening_balance):
+    return [evaluate(incomes, expenses, scenario, first_month, months, opening_balance) for scenario in scenarios]
+
+
+def evaluate_batch(incomes, expenses, scenarios, first_month, months, opening_balance,
+                   workers=0, pool_threshold=16):
+    """
+    Avalia todos os cenários sobre a mesma base carregada.
+    
+    Lotes grandes são divididos em um bloco por worker, e cada bloco recebe a base
+    uma única vez. Se o pool não puder ser usado, o lote é avaliado no processo atual
+    (e a falha é registrada no log).
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(scenarios) >= pool_threshold:
+        size = -(-len(scenarios) // workers)
+        chunks = [scenarios[index:index + size] for index in range(0, len(scenarios), size)]
+        try:
+            pool = get_pool(workers)
+            futures = [
+                pool.submit(evaluate_chunk, incomes, expenses, chunk, first_month, months, opening_balance)
+                for chunk in chunks
+            ]
+            return [result for future in futures for result in future.result()]
+        except (BrokenProcessPool, OSError) as exc:
+            logger.warning('Pool de cenários indisponível (%r); avaliando no processo atual.', exc)
+            reset_pool()
+    
+    return evaluate_chunk(incomes, expenses, scenarios, first_month, months, opening_balance)
@@ -0,0 +1,142 @@
+import re
+
+from django.db import connection
+
+SEARCH_TABLE = 'financial_entrysearch'
+
+# Cada lançamento ocupa o rowid `id * 2 + bit`, permitindo atualizar e remover
+# entradas do índice por chave, sem varrer a tabela FTS.
+KIND_BITS = {
+    'income': 0,
+    'expense': 1,
+}
+
+# Resposta de `search_available` por alias, descartada a cada nova conexão e após
+# as migrações (que podem criar ou remover a tabela FTS)
+_availability = {}
+
+
+def search_available():
+    """
+    Indica se o índice FTS5 existe no banco atual (apenas SQLite).
+    """
+    if connection.vendor != 'sqlite':
+        return False
+    
+    alias = connection.alias
+    if alias not in _availability:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [SEARCH_TABLE]
+            )
+            _availability[alias] = cursor.fetchone() is not None
+    return _availability[alias]
+
+
+def reset_availability(alias=None):
+    """Descarta a resposta guardada de `search_available` (de um alias ou de todos)."""
+    if alias is None:
+        _availability.clear()
+    else:
+        _availability.pop(alias, None)
+
+
+def build_match_query(term):
+    """
+    Converte o texto digitado em uma consulta FTS5 com prefixo em cada palavra.
+    Ex.: "sal mar" -> '"sal"* "mar"*' (todas as palavras precisam casar).
+    """
+    tokens = re.findall(r'\w+', term)
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def _rowid(kind, entry_id):
+    return entry_id * 2 + KIND_BITS[kind]
+
+
+def index_entry(entry):
+    """Insere ou atualiza um lançamento (Income/Expense) no índice."""
+    if not search_available():
+        return
+    
+    kind = entry._meta.model_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT OR REPLACE INTO {SEARCH_TABLE} (rowid, kind, entry_id, description, category_name) '
+            'VALUES (%s, %s, %s, %s, %s)',
+            [_rowid(kind, entry.pk), kind, entry.pk, entry.description, entry.category.name]
+        )
+
+
+def remove_entry(entry):
+    """Remove um lançamento do índice."""
+    if not search_available():
+        return
+    
+    kind = entry._meta.model_name
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [_rowid(kind, entry.pk)])
+
+
+def remove_entries(kind, ids):
+    """Remove vários lançamentos do índice pela chave."""
+    if not search_available() or not ids:
+        return
+    
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({", ".join(["%s"] * len(ids))})',
+            [_rowid(kind, entry_id) for entry_id in ids]
+        )
+
+
+def index_entries(kind, ids):
+    """Indexa vários lançamentos de uma vez, lendo descrição e categoria das tabelas."""
+    if not search_available() or not ids:
+        return
+    
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT OR REPLACE INTO {SEARCH_TABLE} (rowid, kind, entry_id, description, category_name) '
+            f'SELECT e.id * 2 + %s, %s, e.id, e.description, c.name '
+            f'FROM financial_{kind} e JOIN financial_category c ON c.id = e.category_id '
+            f'WHERE e.id IN ({", ".join(["%s"] * len(ids))})',
+            [KIND_BITS[kind], kind, *ids]
+        )
+
+
+def reindex_category(category):
+    """Atualiza o nome da categoria em todos os lançamentos indexados que a usam."""
+    if not search_available():
+        return
+    
+    kind = category.type
+    table = f'financial_{kind}'
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {SEARCH_TABLE} SET category_name = %s '
+            f'WHERE rowid IN (SELECT id * 2 + %s FROM {table} WHERE category_id = %s)',
+            [category.name, KIND_BITS[kind], category.pk]
+        )
+
+
+def rebuild_index():
+    """
+    Reconstrói o índice a partir das tabelas de receitas e despesas.
+    Retorna o número de lançamentos indexados.
+    """
+    if not search_available():
+        return 0
+    
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        for kind, bit in KIND_BITS.items():
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE} (rowid, kind, entry_id, description, category_name) '
+                f'SELECT e.id * 2 + %s, %s, e.id, e.description, c.name '
+                f'FROM financial_{kind} e JOIN financial_category c ON c.id = e.category_id',
+                [bit, kind]
+            )
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+        cursor.execute(f'SELECT COUNT(*) FROM {SEARCH_TABLE}')
+        return cursor.fetchone()[0]
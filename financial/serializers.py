@@ -1,10 +1,115 @@
-from rest_framework import serializers
+from rest_framework import permissions, serializers
 from django.db.models import Q
 from datetime import date, timedelta
-from .models import Category, Income, Expense, CashFlow, FinancialSummary
+from decimal import Decimal
+from . import currency
+from .columnar import from_cents
+from .models import Category, BaseFinancialEntry, Income, Expense, CashFlow, FinancialSummary, Budget
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CentsField(serializers.DecimalField):
+    """
+    Campo decimal que também aceita valores em centavos inteiros (motor colunar),
+    convertendo-os para Decimal apenas na serialização.
+    """
+    def to_representation(self, value):
+        if isinstance(value, int):
+            value = from_cents(value)
+        return super().to_representation(value)
+
+
+class ConvertedAmountField(serializers.DecimalField):
+    """
+    Valor do registro convertido para a moeda base pelo cache de cotações do
+    processo (sem consultas por linha). `date_field` é a data da cotação.
+    """
+    def __init__(self, date_field, **kwargs):
+        self.date_field = date_field
+        kwargs.update(source='*', read_only=True, max_digits=14, decimal_places=2)
+        super().__init__(**kwargs)
+    
+    def to_representation(self, instance):
+        try:
+            value = currency.convert(instance.amount, instance.currency, getattr(instance, self.date_field))
+        except currency.MissingExchangeRate:
+            return None
+        return super().to_representation(value)
+
+
+def validate_currency_rates(value):
+    """Moedas estrangeiras exigem cotações carregadas (comando load_exchange_rates)."""
+    if value != currency.BASE_CURRENCY and not currency.has_rates(value):
+        raise serializers.ValidationError(f'Nenhuma cotação carregada para {value}.')
+    return value
+
+
+def query_param_list(request, name):
+    value = request.query_params.get(name, '')
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+class SparseFieldsetMixin:
+    """
+    Campos da resposta escolhidos pelo cliente em leituras: `?fields=a,b` mantém
+    apenas os campos listados e `?omit=a,b` remove os listados. Nomes desconhecidos
+    são rejeitados com 400, listados por parâmetro.
+    
+    `model_columns()` traduz os campos mantidos para as colunas e relações do modelo
+    que eles leem, para a view podar o queryset (`only` / `select_related`). Campos
+    calculados declaram suas colunas em `Meta.field_sources`; `get_<campo>_display`
+    e fontes diretas ou com ponto (`category.name`) são resolvidos automaticamente.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.is_sparse = False
+        
+        request = self.context.get('request')
+        if request is None or request.method not in permissions.SAFE_METHODS:
+            return
+        
+        keep = query_param_list(request, 'fields')
+        omit = set(query_param_list(request, 'omit'))
+        if not keep and not omit:
+            return
+        
+        errors = {}
+        for param, names in (('fields', keep), ('omit', omit)):
+            unknown = sorted(set(names) - set(self.fields))
+            if unknown:
+                errors[param] = [f'Campos desconhecidos: {", ".join(unknown)}.']
+        if errors:
+            raise serializers.ValidationError(errors)
+        
+        allowed = set(keep) if keep else set(self.fields)
+        for name in list(self.fields):
+            if name not in allowed or name in omit:
+                self.fields.pop(name)
+        self.is_sparse = True
+    
+    def model_columns(self):
+        """Retorna (colunas para `only`, relações para `select_related`) dos campos mantidos."""
+        sources = getattr(self.Meta, 'field_sources', {})
+        columns = {'id'}
+        relations = set()
+        
+        for name, field in self.fields.items():
+            if name in sources:
+                paths = sources[name]
+            elif field.source == '*':
+                paths = ()
+            elif field.source.startswith('get_') and field.source.endswith('_display'):
+                paths = (field.source[len('get_'):-len('_display')],)
+            else:
+                paths = (field.source.replace('.', '__'),)
+            
+            for path in paths:
+                columns.add(path)
+                if '__' in path:
+                    relations.add(path.split('__', 1)[0])
+        return columns, relations
+
+
+class CategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer para categorias.
     """
@@ -18,7 +123,7 @@ class CategorySerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class BaseFinancialEntrySerializer(serializers.ModelSerializer):
+class BaseFinancialEntrySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer base para receitas e despesas.
     """
@@ -29,14 +134,24 @@ class BaseFinancialEntrySerializer(serializers.ModelSerializer):
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     is_overdue = serializers.ReadOnlyField()
     installment_info = serializers.SerializerMethodField()
+    converted_amount = ConvertedAmountField('entry_date')
     
     class Meta:
-        fields = ('id', 'description', 'amount', 'category', 'category_name', 'category_color',
+        fields = ('id', 'description', 'amount', 'currency', 'converted_amount', 'category', 'category_name', 'category_color',
                  'entry_date', 'start_date', 'due_day', 'entry_type', 'entry_type_display',
                  'responsible', 'responsible_display', 'total_installments', 'current_installment',
                  'status', 'status_display', 'paid_date', 'is_overdue', 'installment_info',
                  'created_at', 'updated_at')
         read_only_fields = ('id', 'created_at', 'updated_at')
+        # Colunas lidas pelos campos calculados (poda do queryset com ?fields= / ?omit=)
+        field_sources = {
+            'is_overdue': ('status', 'start_date', 'due_day'),
+            'installment_info': ('entry_type', 'total_installments', 'current_installment'),
+            'converted_amount': ('amount', 'currency', 'entry_date'),
+        }
+    
+    def validate_currency(self, value):
+        return validate_currency_rates(value)
     
     def get_installment_info(self, obj):
         if obj.entry_type == 'installment' and obj.total_installments:
@@ -94,18 +209,71 @@ class ExpenseSerializer(BaseFinancialEntrySerializer):
         return value
 
 
-class CashFlowSerializer(serializers.ModelSerializer):
+class CashFlowSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer para fluxo de caixa.
     """
     flow_type_display = serializers.CharField(source='get_flow_type_display', read_only=True)
     responsible_display = serializers.CharField(source='get_responsible_display', read_only=True)
+    converted_amount = ConvertedAmountField('date')
     
     class Meta:
         model = CashFlow
-        fields = ('id', 'description', 'amount', 'flow_type', 'flow_type_display',
+        fields = ('id', 'description', 'amount', 'currency', 'converted_amount', 'flow_type', 'flow_type_display',
                  'date', 'responsible', 'responsible_display', 'created_at', 'updated_at')
         read_only_fields = ('id', 'created_at', 'updated_at')
+        field_sources = {
+            'converted_amount': ('amount', 'currency', 'date'),
+        }
+    
+    def validate_currency(self, value):
+        return validate_currency_rates(value)
+    
+    def create(self, validated_data):
+        validated_data['created_by'] = self.context['request'].user
+        return super().create(validated_data)
+
+
+class BudgetSerializer(serializers.ModelSerializer):
+    """
+    Serializer para orçamentos. O período atual e seu consumo (`paid`, `pending`,
+    `consumed`, `remaining`) vêm anotados pela view a partir dos contadores
+    (ver `budgets.with_usage`).
+    """
+    category_name = serializers.CharField(source='category.name', read_only=True)
+    category_color = serializers.CharField(source='category.color', read_only=True)
+    period_display = serializers.CharField(source='get_period_display', read_only=True)
+    period_start = serializers.DateField(read_only=True)
+    paid = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    pending = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    consumed = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    remaining = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    
+    class Meta:
+        model = Budget
+        fields = ('id', 'category', 'category_name', 'category_color', 'period', 'period_display', 'limit',
+                 'period_start', 'paid', 'pending', 'consumed', 'remaining', 'created_at', 'updated_at')
+        read_only_fields = ('id', 'created_at', 'updated_at')
+    
+    def validate_category(self, value):
+        household_id = self.context['request'].user.household_id
+        if value.type != 'expense':
+            raise serializers.ValidationError("Categoria deve ser do tipo 'Despesa'.")
+        if not value.is_default and value.household_id != household_id:
+            raise serializers.ValidationError('Categoria não encontrada.')
+        return value
+    
+    def validate(self, attrs):
+        category = attrs.get('category', getattr(self.instance, 'category', None))
+        period = attrs.get('period', getattr(self.instance, 'period', 'monthly'))
+        existing = Budget.objects.filter(
+            household_id=self.context['request'].user.household_id, category=category, period=period
+        )
+        if self.instance is not None:
+            existing = existing.exclude(pk=self.instance.pk)
+        if existing.exists():
+            raise serializers.ValidationError('Já existe um orçamento desta categoria para o período.')
+        return attrs
     
     def create(self, validated_data):
         validated_data['created_by'] = self.context['request'].user
@@ -151,12 +319,12 @@ class FuturePlanningSerializer(serializers.Serializer):
     year = serializers.IntegerField()
     month = serializers.IntegerField()
     month_name = serializers.CharField()
-    total_income = serializers.DecimalField(max_digits=12, decimal_places=2)
-    fixed_expenses = serializers.DecimalField(max_digits=12, decimal_places=2)
-    installment_expenses = serializers.DecimalField(max_digits=12, decimal_places=2)
-    total_expenses = serializers.DecimalField(max_digits=12, decimal_places=2)
-    estimated_balance = serializers.DecimalField(max_digits=12, decimal_places=2)
-    accumulated_balance = serializers.DecimalField(max_digits=12, decimal_places=2)
+    total_income = CentsField(max_digits=12, decimal_places=2)
+    fixed_expenses = CentsField(max_digits=12, decimal_places=2)
+    installment_expenses = CentsField(max_digits=12, decimal_places=2)
+    total_expenses = CentsField(max_digits=12, decimal_places=2)
+    estimated_balance = CentsField(max_digits=12, decimal_places=2)
+    accumulated_balance = CentsField(max_digits=12, decimal_places=2)
 
 
 class QuickEntrySerializer(serializers.Serializer):
@@ -166,12 +334,16 @@ class QuickEntrySerializer(serializers.Serializer):
     type = serializers.ChoiceField(choices=['income', 'expense'])
     description = serializers.CharField(max_length=200)
     amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+    currency = serializers.ChoiceField(choices=BaseFinancialEntry.CURRENCY_CHOICES, default=currency.BASE_CURRENCY)
     category_id = serializers.IntegerField()
     responsible = serializers.ChoiceField(choices=['person1', 'person2', 'both'])
     due_day = serializers.IntegerField(min_value=1, max_value=31)
     entry_type = serializers.ChoiceField(choices=['fixed', 'single', 'installment'], default='single')
     total_installments = serializers.IntegerField(required=False, min_value=2)
     
+    def validate_currency(self, value):
+        return validate_currency_rates(value)
+    
     def validate(self, attrs):
         # Validação de categoria
         try:
@@ -187,3 +359,302 @@ class QuickEntrySerializer(serializers.Serializer):
         
         return attrs
 
+
+class TimeSeriesQuerySerializer(serializers.Serializer):
+    """
+    Serializer para validação dos parâmetros da série temporal.
+    """
+    to = serializers.DateField(required=False)
+    group = serializers.ChoiceField(choices=['category', 'responsible', 'entry_type'], required=False)
+    interval = serializers.ChoiceField(choices=['month', 'week', 'day'], default='month')
+    
+    # Limite de buckets por requisição (ex.: 10 anos de meses ou ~1 ano de dias)
+    MAX_BUCKETS = 400
+    
+    def get_fields(self):
+        # "from" é palavra reservada e não pode ser declarado como atributo
+        fields = super().get_fields()
+        fields['from'] = serializers.DateField(required=False)
+        return fields
+    
+    def validate(self, attrs):
+        if attrs.get('from') and attrs.get('to') and attrs['from'] > attrs['to']:
+            raise serializers.ValidationError("A data inicial deve ser anterior à data final.")
+        return attrs
+
+
+class TimeSeriesGroupSerializer(serializers.Serializer):
+    """
+    Serializer para o valor de um grupo (categoria, responsável ou tipo) em um período.
+    """
+    key = serializers.CharField()
+    label = serializers.CharField()
+    total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    count = serializers.IntegerField()
+
+
+class TimeSeriesValueSerializer(serializers.Serializer):
+    """
+    Serializer para os totais de receitas ou despesas em um período.
+    """
+    total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    count = serializers.IntegerField()
+    groups = TimeSeriesGroupSerializer(many=True, required=False)
+
+
+class TimeSeriesBucketSerializer(serializers.Serializer):
+    """
+    Serializer para um período (mês, semana ou dia) da série temporal.
+    """
+    period = serializers.DateField()
+    incomes = TimeSeriesValueSerializer()
+    expenses = TimeSeriesValueSerializer()
+
+
+class BreakdownQuerySerializer(serializers.Serializer):
+    """
+    Serializer para validação dos parâmetros da distribuição por período.
+    """
+    days = serializers.IntegerField(required=False, min_value=1, max_value=3660)
+    to = serializers.DateField(required=False)
+    kind = serializers.ChoiceField(choices=['income', 'expense'], required=False)
+    group = serializers.ChoiceField(choices=['category', 'responsible', 'status'], default='category')
+    
+    def get_fields(self):
+        # "from" é palavra reservada e não pode ser declarado como atributo
+        fields = super().get_fields()
+        fields['from'] = serializers.DateField(required=False)
+        return fields
+    
+    def validate(self, attrs):
+        if attrs.get('from') and attrs.get('to') and attrs['from'] > attrs['to']:
+            raise serializers.ValidationError("A data inicial deve ser anterior à data final.")
+        return attrs
+
+
+class BreakdownItemSerializer(serializers.Serializer):
+    """
+    Serializer para um item da distribuição (categoria, responsável ou status).
+    """
+    kind = serializers.CharField()
+    key = serializers.CharField()
+    label = serializers.CharField()
+    color = serializers.CharField(allow_null=True)
+    total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    count = serializers.IntegerField()
+
+
+class MonthCloseRequestSerializer(serializers.Serializer):
+    """
+    Serializer para validação do mês a fechar.
+    """
+    year = serializers.IntegerField(min_value=2000, max_value=2100)
+    month = serializers.IntegerField(min_value=1, max_value=12)
+    
+    def validate(self, attrs):
+        month = date(attrs['year'], attrs['month'], 1)
+        if month >= date.today().replace(day=1):
+            raise serializers.ValidationError("Apenas meses já encerrados podem ser fechados.")
+        attrs['date'] = month
+        return attrs
+
+
+class MonthCloseSerializer(serializers.Serializer):
+    """
+    Serializer para um mês fechado com os totais congelados.
+    """
+    year = serializers.IntegerField(source='month.year')
+    month = serializers.IntegerField(source='month.month')
+    closed_at = serializers.DateTimeField()
+    total_income = serializers.DecimalField(max_digits=14, decimal_places=2)
+    total_expenses = serializers.DecimalField(max_digits=14, decimal_places=2)
+    entries = serializers.IntegerField()
+
+
+class ScenarioEntrySerializer(serializers.Serializer):
+    """
+    Serializer para um lançamento hipotético adicionado em um cenário.
+    """
+    type = serializers.ChoiceField(choices=['income', 'expense'])
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
+    entry_type = serializers.ChoiceField(choices=['fixed', 'single', 'installment'], default='single')
+    start_date = serializers.DateField(required=False)
+    total_installments = serializers.IntegerField(required=False, min_value=2)
+    
+    def validate(self, attrs):
+        if attrs['entry_type'] == 'installment' and not attrs.get('total_installments'):
+            raise serializers.ValidationError("Total de parcelas é obrigatório para lançamentos parcelados.")
+        return attrs
+
+
+class ScenarioEntryChangeSerializer(serializers.Serializer):
+    """
+    Serializer para um lançamento existente removido ou com valor alterado no cenário.
+    """
+    type = serializers.ChoiceField(choices=['income', 'expense'])
+    id = serializers.IntegerField()
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'), required=False)
+
+
+class ScenarioSerializer(serializers.Serializer):
+    """
+    Serializer para um cenário: lançamentos adicionados, removidos e alterados.
+    """
+    name = serializers.CharField(max_length=100)
+    add = ScenarioEntrySerializer(many=True, required=False)
+    remove = ScenarioEntryChangeSerializer(many=True, required=False)
+    change = ScenarioEntryChangeSerializer(many=True, required=False)
+    
+    def validate_change(self, value):
+        if any('amount' not in item for item in value):
+            raise serializers.ValidationError("Informe o novo valor de cada lançamento alterado.")
+        return value
+
+
+class ScenarioRequestSerializer(serializers.Serializer):
+    """
+    Serializer para validação do lote de cenários.
+    """
+    MAX_SCENARIOS = 500
+    
+    months = serializers.IntegerField(min_value=1, max_value=60, default=12)
+    scenarios = ScenarioSerializer(many=True, allow_empty=False, max_length=MAX_SCENARIOS)
+
+
+class ScenarioMonthSerializer(serializers.Serializer):
+    """
+    Serializer para um mês da projeção de um cenário (valores em centavos na entrada).
+    """
+    year = serializers.IntegerField()
+    month = serializers.IntegerField()
+    total_income = CentsField(max_digits=14, decimal_places=2)
+    total_expenses = CentsField(max_digits=14, decimal_places=2)
+    estimated_balance = CentsField(max_digits=14, decimal_places=2)
+    accumulated_balance = CentsField(max_digits=14, decimal_places=2)
+
+
+class ScenarioResultSerializer(serializers.Serializer):
+    """
+    Serializer para o resultado de um cenário.
+    """
+    name = serializers.CharField()
+    months = ScenarioMonthSerializer(many=True)
+    lowest_balance = ScenarioMonthSerializer()
+
+
+class DebtItemSerializer(serializers.Serializer):
+    """
+    Serializer para o saldo devedor de uma despesa parcelada (valores em centavos na entrada).
+    """
+    id = serializers.IntegerField()
+    description = serializers.CharField()
+    category_name = serializers.CharField()
+    installment_amount = CentsField(max_digits=14, decimal_places=2)
+    total_installments = serializers.IntegerField()
+    current_installment = serializers.IntegerField()
+    parcels_left = serializers.IntegerField()
+    remaining_balance = CentsField(max_digits=14, decimal_places=2)
+    next_due = serializers.DateField()
+    payoff_month = serializers.DateField()
+
+
+class DebtScheduleSerializer(serializers.Serializer):
+    """
+    Serializer para um mês do cronograma de quitação.
+    """
+    month = serializers.DateField()
+    payment = CentsField(max_digits=14, decimal_places=2)
+    remaining_after = CentsField(max_digits=14, decimal_places=2)
+
+
+class DebtSerializer(serializers.Serializer):
+    """
+    Serializer para o resumo das dívidas parceladas com o cronograma de quitação.
+    """
+    total_remaining = CentsField(max_digits=14, decimal_places=2)
+    parcels_left = serializers.IntegerField()
+    monthly_payment = CentsField(max_digits=14, decimal_places=2)
+    payoff_month = serializers.DateField(allow_null=True)
+    items = DebtItemSerializer(many=True)
+    schedule = DebtScheduleSerializer(many=True)
+
+
+class ChangesQuerySerializer(serializers.Serializer):
+    """
+    Serializer para validação dos parâmetros do feed de alterações.
+    """
+    since = serializers.IntegerField(min_value=0, default=0)
+    limit = serializers.IntegerField(min_value=1, max_value=1000, default=500)
+
+
+class ChangedRecordsSerializer(serializers.Serializer):
+    """
+    Serializer para os registros alterados desde o cursor, por tipo.
+    """
+    category = CategorySerializer(many=True)
+    income = IncomeSerializer(many=True)
+    expense = ExpenseSerializer(many=True)
+    cashflow = CashFlowSerializer(many=True)
+
+
+class DeletedRecordsSerializer(serializers.Serializer):
+    """
+    Serializer para os ids excluídos desde o cursor (tombstones), por tipo.
+    """
+    category = serializers.ListField(child=serializers.IntegerField())
+    income = serializers.ListField(child=serializers.IntegerField())
+    expense = serializers.ListField(child=serializers.IntegerField())
+    cashflow = serializers.ListField(child=serializers.IntegerField())
+
+
+class ChangeFeedSerializer(serializers.Serializer):
+    """
+    Serializer para uma página do feed de alterações.
+    """
+    cursor = serializers.IntegerField()
+    has_more = serializers.BooleanField()
+    changes = ChangedRecordsSerializer()
+    deleted = DeletedRecordsSerializer()
+
+
+class DashboardQuerySerializer(serializers.Serializer):
+    """
+    Serializer para validação dos parâmetros do painel.
+    """
+    recent = serializers.IntegerField(min_value=0, max_value=50, default=10)
+
+
+class DashboardEntrySerializer(serializers.Serializer):
+    """
+    Serializer para um lançamento recente do painel (receita ou despesa).
+    """
+    id = serializers.IntegerField()
+    kind = serializers.CharField()
+    description = serializers.CharField()
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    currency = serializers.CharField()
+    entry_date = serializers.DateField()
+    status = serializers.CharField()
+    category_id = serializers.IntegerField()
+    category_name = serializers.CharField(source='category__name')
+
+
+class OverdueCategorySerializer(serializers.Serializer):
+    """
+    Serializer para as despesas vencidas de uma categoria.
+    """
+    key = serializers.CharField()
+    label = serializers.CharField()
+    count = serializers.IntegerField()
+    amount = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class DashboardSerializer(serializers.Serializer):
+    """
+    Serializer para o painel (todos os widgets da tela inicial).
+    """
+    metrics = FinancialMetricsSerializer()
+    planning = FuturePlanningSerializer()
+    overdue = OverdueCategorySerializer(many=True)
+    breakdown = BreakdownItemSerializer(many=True)
+    recent = DashboardEntrySerializer(many=True)
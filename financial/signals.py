@@ -0,0 +1,171 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from authentication.signals import household_changed
+
+from . import budgets, currency, ledger, periods, rollups, search, sync
+from .models import (
+    Category, Income, Expense, CashFlow, FinancialSummary, ExchangeRate, Budget, DailyRollup, MonthClose
+)
+
+HOUSEHOLD_MODELS = {
+    Category: 'created_by',
+    Income: 'created_by',
+    Expense: 'created_by',
+    CashFlow: 'created_by',
+    FinancialSummary: 'user',
+    Budget: 'created_by',
+    DailyRollup: 'created_by',
+    MonthClose: 'created_by',
+}
+
+
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Income)
+@receiver(pre_save, sender=Expense)
+@receiver(pre_save, sender=CashFlow)
+@receiver(pre_save, sender=FinancialSummary)
+@receiver(pre_save, sender=Budget)
+@receiver(pre_save, sender=MonthClose)
+def assign_household(sender, instance, raw=False, **kwargs):
+    """Registra no lançamento o grupo familiar do autor, na criação."""
+    if raw or instance.household_id is not None:
+        return
+    owner = getattr(instance, HOUSEHOLD_MODELS[sender])
+    instance.household_id = owner.household_id
+
+
+@receiver(household_changed)
+def move_user_entries(sender, user, previous_id, **kwargs):
+    """
+    Ao mudar de grupo, os registros criados pelo usuário vão junto, inclusive seus
+    agregados e fechamentos (um UPDATE por tabela). O razão de saldos é por autor e
+    não muda; o consumo dos orçamentos dos dois grupos é recalculado.
+    """
+    for model, owner in HOUSEHOLD_MODELS.items():
+        model.objects.filter(**{owner: user}).update(household_id=user.household_id)
+    budgets.rebuild(Budget.objects.filter(household_id__in=[previous_id, user.household_id]).values('pk'))
+    sync.record_move({kind: {'created_by': user} for kind in sync.SYNC_MODELS}, previous_id, user.household_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Income)
+@receiver(post_save, sender=Expense)
+@receiver(post_save, sender=CashFlow)
+def record_sync_change(sender, instance, raw=False, **kwargs):
+    """Registra a alteração no feed de sincronização, na mesma transação."""
+    if raw:
+        return
+    sync.record_changes(sender._meta.model_name, instance.household_id, [instance.pk])
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Income)
+@receiver(post_delete, sender=Expense)
+@receiver(post_delete, sender=CashFlow)
+def record_sync_tombstone(sender, instance, **kwargs):
+    sync.record_changes(sender._meta.model_name, instance.household_id, [instance.pk], deleted=True)
+
+
+@receiver(post_save, sender=Income)
+@receiver(post_save, sender=Expense)
+def index_financial_entry(sender, instance, **kwargs):
+    """Mantém o índice de busca sincronizado ao salvar lançamentos."""
+    search.index_entry(instance)
+
+
+@receiver(post_delete, sender=Income)
+@receiver(post_delete, sender=Expense)
+def unindex_financial_entry(sender, instance, **kwargs):
+    search.remove_entry(instance)
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_entries(sender, instance, created, **kwargs):
+    if not created:
+        search.reindex_category(instance)
+
+
+@receiver(connection_created)
+def reset_search_on_connect(sender, connection, **kwargs):
+    search.reset_availability(connection.alias)
+
+
+@receiver(post_migrate)
+def reset_search_after_migrate(sender, using='default', **kwargs):
+    """As migrações podem criar ou remover o índice FTS5."""
+    search.reset_availability(using)
+
+
+@receiver(pre_save, sender=Income)
+@receiver(pre_save, sender=Expense)
+@receiver(pre_save, sender=CashFlow)
+def capture_tracked_state(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    
+    instance.capture_previous_state()
+    if sender is not CashFlow:
+        # Bloqueia lançamentos que estão (ou passariam a estar) em um mês fechado
+        periods.check_entry_open(instance, instance._tracked_previous)
+
+
+@receiver(pre_delete, sender=Income)
+@receiver(pre_delete, sender=Expense)
+def protect_closed_period_entry(sender, instance, origin=None, **kwargs):
+    # Exclusões em cascata (ex.: do usuário) não são bloqueadas
+    origin_model = getattr(origin, 'model', type(origin))
+    if origin_model is sender:
+        periods.check_entry_open(instance)
+
+
+@receiver(post_save, sender=Income)
+@receiver(post_save, sender=Expense)
+@receiver(post_save, sender=CashFlow)
+def update_derived_data_on_save(sender, instance, raw=False, **kwargs):
+    """
+    Atualiza agregados diários, razão de saldos e consumo dos orçamentos na mesma
+    transação do registro.
+    """
+    if raw:
+        return
+    
+    kind = sender._meta.model_name
+    previous, current = instance.pop_state_change()
+    if kind != 'cashflow':
+        rollups.record_change(kind, previous, current)
+    if kind == 'expense':
+        budgets.record_change(previous, current)
+    ledger.record_change(kind, previous, current)
+
+
+@receiver(post_delete, sender=Income)
+@receiver(post_delete, sender=Expense)
+@receiver(post_delete, sender=CashFlow)
+def update_derived_data_on_delete(sender, instance, **kwargs):
+    kind = sender._meta.model_name
+    state = getattr(instance, '_tracked_state', None) or instance.get_tracked_state()
+    if state is None:
+        return
+    
+    if kind != 'cashflow':
+        rollups.record_delete(kind, state)
+    if kind == 'expense':
+        budgets.record_delete(state)
+    ledger.record_delete(kind, state)
+
+
+@receiver(post_save, sender=ExchangeRate)
+@receiver(post_delete, sender=ExchangeRate)
+def clear_exchange_rate_cache(sender, **kwargs):
+    """Cotações alteradas neste processo (ex.: pelo admin) invalidam o cache local."""
+    currency.clear_cache()
+
+
+@receiver(post_save, sender=Budget)
+def rebuild_budget_usage(sender, instance, raw=False, **kwargs):
+    """Orçamento criado ou alterado (categoria ou período): recalcula seu consumo."""
+    if raw:
+        return
+    budgets.rebuild([instance.pk])
@@ -0,0 +1,178 @@
+"""
+Feed de alterações para clientes com réplica local (sincronização incremental).
+
+Cada gravação de categoria, receita, despesa ou movimentação de caixa registra em
+SyncChange uma nova linha para o registro (removendo a anterior), na mesma
+transação. O cliente guarda o maior id recebido como cursor e pede apenas o que
+mudou depois dele; exclusões chegam como tombstones. Com `since=0` o feed devolve
+o estado completo do grupo familiar.
+
+O cursor só é seguro se os ids de um grupo forem confirmados na ordem em que são
+alocados; senão um id menor pode ser confirmado depois que o cliente já leu um
+maior, e a alteração se perde. Por isso toda gravação no feed passa por
+`lock_households`, que serializa os escritores de cada grupo até o commit.
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from authentication.models import Household
+
+from . import events
+from .models import Category, Income, Expense, CashFlow, ArchivedIncome, ArchivedExpense, SyncChange
+
+SYNC_MODELS = {
+    'category': Category,
+    'income': Income,
+    'expense': Expense,
+    'cashflow': CashFlow,
+}
+
+# Lançamentos alterados e depois arquivados continuam visíveis para o cliente
+ARCHIVE_FALLBACK = {
+    'income': ArchivedIncome,
+    'expense': ArchivedExpense,
+}
+
+
+@contextmanager
+def lock_households(household_ids):
+    """
+    Bloqueia até o commit (SELECT ... FOR UPDATE, em ordem de id) os grupos cujo
+    feed será gravado. O segundo escritor de um grupo só aloca seus ids depois do
+    commit do primeiro, então os ids do grupo são confirmados em ordem.
+    `household_ids` pode ser uma lista ou um subquery.
+    
+    No SQLite não há FOR UPDATE nem consulta extra: a primeira escrita da transação
+    já bloqueia o banco inteiro até o commit, com o mesmo efeito.
+    """
+    if not connection.features.has_select_for_update:
+        yield
+        return
+    with transaction.atomic(savepoint=False):
+        list(
+            Household.objects.select_for_update().filter(pk__in=household_ids)
+            .order_by('pk').values_list('pk', flat=True)
+        )
+        yield
+
+
+def record_changes(kind, household_id, ids, deleted=False):
+    """
+    Registra a alteração (ou exclusão) dos registros `ids` do grupo e publica o
+    evento correspondente após o commit. Retorna o novo cursor.
+    """
+    ids = list(ids)
+    if household_id is None or not ids:
+        return None
+    with lock_households([household_id]):
+        SyncChange.objects.filter(household_id=household_id, kind=kind, object_id__in=ids).delete()
+        created = SyncChange.objects.bulk_create(
+            [SyncChange(household_id=household_id, kind=kind, object_id=object_id, deleted=deleted)
+             for object_id in ids],
+            batch_size=1000
+        )
+    cursor = created[-1].pk
+    events.publish(household_id, {'kind': kind, 'ids': ids, 'deleted': deleted, 'cursor': cursor})
+    return cursor
+
+
+def record_queryset(kind, queryset):
+    """
+    Registra a alteração dos registros do queryset, para `queryset.update()` (que
+    não dispara sinais). Deve rodar na mesma transação e antes do UPDATE; são duas
+    instruções (DELETE e INSERT ... SELECT, mais o bloqueio dos grupos fora do
+    SQLite), independentemente do número de linhas.
+    """
+    with lock_households(queryset.order_by().values('household_id')):
+        SyncChange.objects.filter(
+            Exists(queryset.filter(pk=OuterRef('object_id'), household_id=OuterRef('household_id'))),
+            kind=kind
+        ).delete()
+        
+        quote = connection.ops.quote_name
+        columns = ', '.join(quote(column) for column in ('household_id', 'kind', 'object_id', 'deleted', 'changed_at'))
+        sql, params = queryset.order_by().values('household_id', 'id').query.sql_with_params()
+        returning = connection.features.can_return_columns_from_insert
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {quote(SyncChange._meta.db_table)} ({columns}) '
+                f'SELECT changed.household_id, %s, changed.id, %s, %s FROM ({sql}) changed '
+                f'WHERE changed.household_id IS NOT NULL ORDER BY changed.id'
+                + (f' RETURNING {quote("household_id")}, {quote("object_id")}, {quote("id")}' if returning else ''),
+                [kind, False, timezone.now(), *params]
+            )
+            rows = cursor.fetchall() if returning else []
+    
+    # Um evento por grupo afetado, sem consulta extra (RETURNING)
+    by_household = defaultdict(list)
+    for household_id, object_id, change_id in rows:
+        by_household[household_id].append((change_id, object_id))
+    for household_id, changes in by_household.items():
+        changes.sort()
+        events.publish(household_id, {
+            'kind': kind, 'ids': [object_id for _, object_id in changes], 'deleted': False, 'cursor': changes[-1][0]
+        })
+
+
+def record_move(owner_filters, previous_id, household_id):
+    """
+    Registros que mudaram de grupo: tombstone no grupo anterior e alteração no novo.
+    `owner_filters` é {tipo: filtro dos registros movidos}.
+    """
+    with lock_households([previous_id, household_id]):
+        for kind, lookup in owner_filters.items():
+            ids = list(SYNC_MODELS[kind].objects.filter(**lookup).values_list('id', flat=True))
+            record_changes(kind, previous_id, ids, deleted=True)
+            record_changes(kind, household_id, ids)
+
+
+def load_objects(kind, ids):
+    """Carrega os registros alterados (uma consulta, mais uma se algum foi arquivado)."""
+    model = SYNC_MODELS[kind]
+    queryset = model.objects.filter(pk__in=ids)
+    if kind in ARCHIVE_FALLBACK:
+        queryset = queryset.select_related('category')
+    objects = list(queryset)
+    
+    missing = set(ids) - {obj.pk for obj in objects}
+    if missing and kind in ARCHIVE_FALLBACK:
+        objects += list(ARCHIVE_FALLBACK[kind].objects.filter(pk__in=missing).select_related('category'))
+        missing -= {obj.pk for obj in objects}
+    return objects, missing
+
+
+def changes_since(household_id, since=0, limit=500):
+    """
+    Alterações do grupo depois do cursor `since`, em ordem de cursor, no máximo
+    `limit` registros. Retorna {'cursor', 'has_more', 'changes', 'deleted'}, com os
+    registros alterados por tipo (instâncias) e os ids excluídos por tipo.
+    """
+    rows = list(
+        SyncChange.objects.filter(household_id=household_id, id__gt=since)
+        .order_by('id').values_list('id', 'kind', 'object_id', 'deleted')[:limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    changed = defaultdict(list)
+    deleted = {kind: [] for kind in SYNC_MODELS}
+    for _, kind, object_id, is_deleted in rows:
+        (deleted[kind] if is_deleted else changed[kind]).append(object_id)
+    
+    changes = {kind: [] for kind in SYNC_MODELS}
+    for kind, ids in changed.items():
+        objects, missing = load_objects(kind, ids)
+        changes[kind] = sorted(objects, key=lambda obj: obj.pk)
+        # Removidos depois do registro da alteração (ex.: exclusão direta no banco)
+        deleted[kind].extend(sorted(missing))
+    
+    return {
+        'cursor': rows[-1][0] if rows else since,
+        'has_more': has_more,
+        'changes': changes,
+        'deleted': deleted,
+    }
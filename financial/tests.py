@@ -1,3 +1,1501 @@
-from django.test import TestCase
+import calendar
+import json
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from dateutil.relativedelta import relativedelta
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Sum
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import archive, budgets, columnar, currency, debts, events, ledger, scenarios, search, sync
+from .models import (
+    Category, Income, Expense, CashFlow, DailyRollup, BalanceCheckpoint, DueReminder, ArchivedIncome,
+    ArchivedExpense, Budget, BudgetUsage, MonthClose, SyncChange
+)
+from .reminders import send_due_reminders
+from .rollups import find_inconsistencies
+
+User = get_user_model()
+
+
+class FinancialTestMixin:
+    """
+    Dados básicos compartilhados pelos testes da API financeira.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='ana', email='ana@example.com', password='senha-segura-123',
+            first_name='Ana', last_name='Silva'
+        )
+        self.client.force_authenticate(self.user)
+        self.income_category = Category.objects.create(
+            name='Salário', type='income', created_by=self.user
+        )
+        self.expense_category = Category.objects.create(
+            name='Mercado', type='expense', created_by=self.user
+        )
+    
+    def create_income(self, **kwargs):
+        data = {
+            'description': 'Salário',
+            'amount': Decimal('5000.00'),
+            'category': self.income_category,
+            'entry_date': date.today(),
+            'start_date': date.today(),
+            'due_day': 5,
+            'entry_type': 'fixed',
+            'responsible': 'person1',
+            'created_by': self.user,
+        }
+        data.update(kwargs)
+        return Income.objects.create(**data)
+    
+    def create_expense(self, **kwargs):
+        data = {
+            'description': 'Compras',
+            'amount': Decimal('300.00'),
+            'category': self.expense_category,
+            'entry_date': date.today(),
+            'start_date': date.today(),
+            'due_day': 10,
+            'entry_type': 'single',
+            'responsible': 'both',
+            'created_by': self.user,
+        }
+        data.update(kwargs)
+        return Expense.objects.create(**data)
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class QueryBudgetTests(FinancialTestMixin, APITestCase):
+    """
+    Garante que as views financeiras respeitam seus orçamentos de consultas.
+    Um N+1 em views ou serializers faz estes testes falharem.
+    """
+    def test_metrics_within_budget(self):
+        CashFlow.objects.create(
+            description='Saldo inicial', amount=Decimal('1000.00'), flow_type='initial',
+            date=date.today(), responsible='both', created_by=self.user
+        )
+        self.create_income(status='paid', paid_date=date.today())
+        self.create_expense(status='paid', paid_date=date.today())
+        self.create_expense(entry_type='fixed', amount=Decimal('1200.00'))
+        self.create_expense(entry_type='installment', total_installments=10, current_installment=1)
+        
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('financial:metrics'))
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(response.data['current_balance']), Decimal('5700.00'))
+        self.assertEqual(Decimal(response.data['monthly_fixed_expenses']), Decimal('1200.00'))
+        self.assertEqual(Decimal(response.data['total_debt']), Decimal('3000.00'))
+        self.assertEqual(Decimal(response.data['pending_amount']), Decimal('1500.00'))
+        self.assertEqual(Decimal(response.data['paid_amount']), Decimal('300.00'))
+    
+    def test_entry_lists_within_budget(self):
+        for i in range(15):
+            self.create_income(description=f'Receita {i}')
+            self.create_expense(description=f'Despesa {i}')
+        
+        for name in ('financial:income-list', 'financial:expense-list',
+                     'financial:category-list', 'financial:cashflow-list'):
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, 200)
+
+
+class FullTextSearchTests(FinancialTestMixin, APITestCase):
+    def search(self, name, term, **params):
+        response = self.client.get(reverse(name), {'search': term, **params})
+        self.assertEqual(response.status_code, 200)
+        return [item['description'] for item in response.data['results']]
+    
+    def test_prefix_match_on_description_and_category(self):
+        self.create_expense(description='Supermercado do bairro')
+        self.create_expense(description='Conta de luz', category=Category.objects.create(
+            name='Energia', type='expense', created_by=self.user
+        ))
+        
+        self.assertEqual(self.search('financial:expense-list', 'super'), ['Supermercado do bairro'])
+        self.assertEqual(self.search('financial:expense-list', 'ener'), ['Conta de luz'])
+        self.assertEqual(self.search('financial:expense-list', 'merc'), ['Supermercado do bairro'])
+    
+    def test_accents_are_ignored_and_kinds_are_separated(self):
+        self.create_income(description='Salário março')
+        self.create_expense(description='Salario da diarista')
+        
+        self.assertEqual(self.search('financial:income-list', 'salario marc'), ['Salário março'])
+        self.assertEqual(self.search('financial:expense-list', 'salá'), ['Salario da diarista'])
+    
+    def test_results_ranked_by_relevance_unless_ordering_given(self):
+        self.create_expense(description='Farmácia', amount=Decimal('10.00'))
+        self.create_expense(description='Farmácia farmácia remédio', amount=Decimal('20.00'))
+        
+        self.assertEqual(self.search('financial:expense-list', 'farm')[0], 'Farmácia farmácia remédio')
+        self.assertEqual(
+            self.search('financial:expense-list', 'farm', ordering='amount'),
+            ['Farmácia', 'Farmácia farmácia remédio']
+        )
+    
+    def test_many_matches_use_a_single_index_lookup_per_query(self):
+        for index in range(40):
+            self.create_expense(description=f'Farmácia {index}')
+        self.create_expense(description='Farmácia farmácia farmácia')
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('financial:expense-list'), {'search': 'farm'})
+        
+        # COUNT e página; cada uma consulta o índice FTS5 uma única vez, em um JOIN
+        self.assertEqual(len(queries.captured_queries), 2)
+        for query in queries.captured_queries:
+            self.assertEqual(query['sql'].count('MATCH'), 1)
+        self.assertEqual(response.data['count'], 41)
+        self.assertEqual(response.data['results'][0]['description'], 'Farmácia farmácia farmácia')
+    
+    def test_index_follows_updates_deletes_and_category_renames(self):
+        expense = self.create_expense(description='Academia')
+        expense.description = 'Natação'
+        expense.save()
+        self.assertEqual(self.search('financial:expense-list', 'acad'), [])
+        self.assertEqual(self.search('financial:expense-list', 'nata'), ['Natação'])
+        
+        self.expense_category.name = 'Esportes'
+        self.expense_category.save()
+        self.assertEqual(self.search('financial:expense-list', 'esport'), ['Natação'])
+        
+        expense.delete()
+        self.assertEqual(self.search('financial:expense-list', 'nata'), [])
+    
+    def test_rebuild_command(self):
+        self.create_income(description='Freelance')
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM financial_entrysearch')
+        self.assertEqual(self.search('financial:income-list', 'free'), [])
+        
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        
+        self.assertIn('1 lançamentos indexados', out.getvalue())
+        self.assertEqual(self.search('financial:income-list', 'free'), ['Freelance'])
+    
+    def test_availability_is_rechecked_after_migrations(self):
+        self.create_expense(description='Supermercado do bairro')
+        self.assertTrue(search.search_available())
+        self.addCleanup(search.reset_availability)
+        
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TABLE financial_entrysearch')
+        call_command('migrate', 'financial', verbosity=0)
+        
+        # Sem o índice, a busca volta para o SearchFilter padrão
+        self.assertFalse(search.search_available())
+        self.assertEqual(self.search('financial:expense-list', 'Supermercado'), ['Supermercado do bairro'])
+
+
+class EntryAdminTests(FinancialTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin_user = User.objects.create_superuser(
+            username='root', email='root@example.com', password='senha-segura-123',
+            first_name='Root', last_name='Admin'
+        )
+        self.client.force_login(self.admin_user)
+        self.url = reverse('admin:financial_expense_changelist')
+        cache.clear()
+    
+    def test_changelist_footer_shows_filtered_totals(self):
+        self.create_expense(amount=Decimal('100.00'), status='paid', paid_date=date.today())
+        self.create_expense(amount=Decimal('50.50'), status='paid', paid_date=date.today())
+        self.create_expense(amount=Decimal('999.00'))
+        
+        response = self.client.get(self.url, {'status__exact': 'paid'})
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'R$ 150,50')
+        self.assertEqual(response.context['cl'].paginator.totals['count'], 2)
+    
+    def test_unfiltered_changelist_uses_estimated_count(self):
+        for _ in range(3):
+            self.create_expense()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE financial_expense')
+        
+        with override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=1):
+            response = self.client.get(self.url)
+        
+        paginator = response.context['cl'].paginator
+        self.assertTrue(paginator.estimated)
+        self.assertIsNone(paginator.totals)
+        self.assertContains(response, 'Aplique um filtro')
+    
+    def test_date_hierarchy_is_cached(self):
+        self.create_expense(entry_date=date(2024, 1, 10))
+        self.create_expense(entry_date=date(2025, 6, 1))
+        self.client.get(self.url)
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        
+        self.assertContains(response, '2024')
+        self.assertFalse(any('django_date_trunc' in query['sql'] for query in queries))
+        self.assertFalse(any('MIN(' in query['sql'] for query in queries))
+    
+    def test_mark_as_paid_sets_paid_date_in_bulk(self):
+        earlier = date(2024, 3, 1)
+        pending = self.create_expense()
+        already_paid = self.create_expense(status='paid', paid_date=earlier)
+        
+        self.client.post(self.url, {
+            'action': 'mark_as_paid',
+            '_selected_action': [pending.pk, already_paid.pk],
+        })
+        
+        pending.refresh_from_db()
+        already_paid.refresh_from_db()
+        self.assertEqual((pending.status, pending.paid_date), ('paid', date.today()))
+        self.assertEqual(already_paid.paid_date, earlier)
+
+
+class TimeSeriesTests(FinancialTestMixin, APITestCase):
+    def test_monthly_series_fills_empty_months(self):
+        self.create_income(entry_date=date(2025, 1, 15), amount=Decimal('1000.00'))
+        self.create_expense(entry_date=date(2025, 1, 20), amount=Decimal('200.00'))
+        self.create_expense(entry_date=date(2025, 3, 2), amount=Decimal('50.00'))
+        self.create_expense(entry_date=date(2025, 3, 28), amount=Decimal('25.00'))
+        
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('financial:timeseries'), {'from': '2025-01-01', 'to': '2025-04-30'})
+        
+        self.assertEqual(response.status_code, 200)
+        buckets = response.data['buckets']
+        self.assertEqual([bucket['period'] for bucket in buckets],
+                         ['2025-01-01', '2025-02-01', '2025-03-01', '2025-04-01'])
+        self.assertEqual(buckets[0]['incomes']['total'], '1000.00')
+        self.assertEqual(buckets[1]['expenses'], {'total': '0.00', 'count': 0})
+        self.assertEqual(buckets[2]['expenses'], {'total': '75.00', 'count': 2})
+    
+    def test_grouped_by_category_and_responsible(self):
+        other = Category.objects.create(name='Lazer', type='expense', created_by=self.user)
+        self.create_expense(entry_date=date(2025, 5, 1), amount=Decimal('10.00'))
+        self.create_expense(entry_date=date(2025, 5, 2), amount=Decimal('30.00'), category=other,
+                            responsible='person2')
+        
+        params = {'from': '2025-05-01', 'to': '2025-05-31'}
+        response = self.client.get(reverse('financial:timeseries'), {**params, 'group': 'category'})
+        groups = response.data['buckets'][0]['expenses']['groups']
+        self.assertEqual([(group['label'], group['total']) for group in groups],
+                         [('Lazer', '30.00'), ('Mercado', '10.00')])
+        
+        response = self.client.get(reverse('financial:timeseries'), {**params, 'group': 'responsible'})
+        labels = [group['label'] for group in response.data['buckets'][0]['expenses']['groups']]
+        self.assertEqual(labels, ['Ambos', 'Pessoa 2'])
+    
+    def test_weekly_interval_and_validation(self):
+        self.create_expense(entry_date=date(2025, 5, 7))
+        
+        response = self.client.get(reverse('financial:timeseries'),
+                                   {'from': '2025-05-07', 'to': '2025-05-20', 'interval': 'week'})
+        self.assertEqual([bucket['period'] for bucket in response.data['buckets']],
+                         ['2025-05-05', '2025-05-12', '2025-05-19'])
+        self.assertEqual(response.data['buckets'][0]['expenses']['count'], 1)
+        
+        response = self.client.get(reverse('financial:timeseries'), {'from': '2025-05-20', 'to': '2025-05-01'})
+        self.assertEqual(response.status_code, 400)
+
+
+class DailyRollupTests(FinancialTestMixin, APITestCase):
+    def rollup_totals(self, **filters):
+        return {
+            (row.kind, row.status): (row.total, row.count)
+            for row in DailyRollup.objects.filter(**filters).exclude(count=0)
+        }
+    
+    def assertConsistent(self):
+        self.assertEqual(find_inconsistencies(), [])
+    
+    def test_rollups_follow_entry_writes(self):
+        expense = self.create_expense(amount=Decimal('100.00'))
+        self.create_expense(amount=Decimal('50.00'))
+        self.assertEqual(self.rollup_totals(), {('expense', 'pending'): (Decimal('150.00'), 2)})
+        
+        expense.amount = Decimal('120.00')
+        expense.save()
+        expense.mark_as_paid()
+        self.assertEqual(self.rollup_totals(), {
+            ('expense', 'pending'): (Decimal('50.00'), 1),
+            ('expense', 'paid'): (Decimal('120.00'), 1),
+        })
+        
+        reloaded = Expense.objects.get(pk=expense.pk)
+        reloaded.entry_date = date(2024, 1, 1)
+        reloaded.save()
+        self.assertEqual(self.rollup_totals(date=date(2024, 1, 1)), {('expense', 'paid'): (Decimal('120.00'), 1)})
+        
+        reloaded.delete()
+        self.assertEqual(self.rollup_totals(), {('expense', 'pending'): (Decimal('50.00'), 1)})
+        self.assertConsistent()
+    
+    def test_admin_bulk_status_change_keeps_rollups_consistent(self):
+        admin_user = User.objects.create_superuser(
+            username='root', email='root@example.com', password='senha-segura-123',
+            first_name='Root', last_name='Admin'
+        )
+        entries = [self.create_income(amount=Decimal('10.00')) for _ in range(3)]
+        self.client.force_login(admin_user)
+        
+        self.client.post(reverse('admin:financial_income_changelist'), {
+            'action': 'mark_as_paid',
+            '_selected_action': [entry.pk for entry in entries[:2]],
+        })
+        
+        self.assertEqual(self.rollup_totals(), {
+            ('income', 'paid'): (Decimal('20.00'), 2),
+            ('income', 'pending'): (Decimal('10.00'), 1),
+        })
+        self.assertConsistent()
+    
+    def test_check_and_backfill_commands(self):
+        self.create_expense()
+        DailyRollup.objects.update(total=Decimal('1.00'))
+        
+        with self.assertRaises(CommandError):
+            call_command('check_rollups', stdout=StringIO())
+        
+        out = StringIO()
+        call_command('check_rollups', '--fix', stdout=out)
+        self.assertIn('1 divergências corrigidas', out.getvalue())
+        self.assertConsistent()
+        
+        DailyRollup.objects.all().delete()
+        call_command('backfill_rollups', stdout=StringIO())
+        self.assertConsistent()
+    
+    def test_breakdown_reads_only_rollups(self):
+        leisure = Category.objects.create(name='Lazer', type='expense', created_by=self.user)
+        self.create_expense(amount=Decimal('80.00'))
+        self.create_expense(amount=Decimal('20.00'), category=leisure)
+        self.create_expense(amount=Decimal('999.00'), entry_date=date.today() - timedelta(days=200))
+        
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('financial:breakdown'), {'days': 90, 'kind': 'expense'})
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(item['label'], item['total'], item['count']) for item in response.data['items']],
+            [('Mercado', '80.00', 1), ('Lazer', '20.00', 1)]
+        )
+        
+        response = self.client.get(reverse('financial:breakdown'), {'days': 365, 'group': 'status'})
+        self.assertEqual(response.data['items'][0]['label'], 'Pendente')
+        self.assertEqual(response.data['items'][0]['total'], '1099.00')
+
+
+class BalanceLedgerTests(FinancialTestMixin, APITestCase):
+    def create_cashflow(self, day, amount):
+        return CashFlow.objects.create(
+            description='Ajuste', amount=amount, flow_type='adjustment',
+            date=day, responsible='both', created_by=self.user
+        )
+    
+    def checkpoints(self):
+        return list(BalanceCheckpoint.objects.order_by('date').values_list('date', 'delta', 'balance'))
+    
+    def test_balance_as_of_uses_checkpoints(self):
+        self.create_cashflow(date(2025, 1, 1), Decimal('1000.00'))
+        self.create_income(status='paid', paid_date=date(2025, 1, 10), amount=Decimal('500.00'))
+        self.create_expense(status='paid', paid_date=date(2025, 2, 5), amount=Decimal('200.00'))
+        self.create_expense(amount=Decimal('999.00'))
+        
+        self.assertEqual(ledger.balance_as_of(self.user.household_id, date(2024, 12, 31)), Decimal('0'))
+        self.assertEqual(ledger.balance_as_of(self.user.household_id, date(2025, 1, 15)), Decimal('1500.00'))
+        with self.assertNumQueries(1):
+            self.assertEqual(ledger.balance_as_of(self.user.household_id, date(2025, 3, 1)), Decimal('1300.00'))
+    
+    def test_backdated_edit_rewrites_later_checkpoints(self):
+        self.create_cashflow(date(2025, 1, 1), Decimal('100.00'))
+        self.create_cashflow(date(2025, 3, 1), Decimal('50.00'))
+        expense = self.create_expense(status='paid', paid_date=date(2025, 2, 1), amount=Decimal('30.00'))
+        
+        self.assertEqual(self.checkpoints(), [
+            (date(2025, 1, 1), Decimal('100.00'), Decimal('100.00')),
+            (date(2025, 2, 1), Decimal('-30.00'), Decimal('70.00')),
+            (date(2025, 3, 1), Decimal('50.00'), Decimal('120.00')),
+        ])
+        
+        expense.paid_date = date(2025, 1, 1)
+        expense.save()
+        self.assertEqual(ledger.balance_as_of(self.user.household_id, date(2025, 1, 31)), Decimal('70.00'))
+        self.assertEqual(ledger.balance_as_of(self.user.household_id, date(2025, 3, 1)), Decimal('120.00'))
+        
+        expense.mark_as_pending()
+        self.assertEqual(ledger.balance_as_of(self.user.household_id, date(2025, 3, 1)), Decimal('150.00'))
+    
+    def test_mark_paid_endpoint_and_rebuild_agree(self):
+        income = self.create_income(amount=Decimal('800.00'))
+        self.client.post(reverse('financial:income-mark-paid', args=[income.pk]), {'paid_date': '2025-04-10'})
+        self.create_cashflow(date(2025, 4, 1), Decimal('200.00')).delete()
+        
+        self.assertEqual(ledger.balance_as_of(self.user.household_id, date(2025, 4, 30)), Decimal('800.00'))
+        
+        maintained = self.checkpoints()
+        out = StringIO()
+        call_command('rebuild_ledger', stdout=out)
+        self.assertEqual(
+            [(day, balance) for day, delta, balance in self.checkpoints()],
+            [(day, balance) for day, delta, balance in maintained if delta]
+        )
+    
+    def test_planning_starts_from_previous_month_balance(self):
+        first_day = date.today().replace(day=1)
+        self.create_cashflow(first_day - timedelta(days=1), Decimal('1000.00'))
+        self.create_cashflow(first_day, Decimal('5.00'))
+        
+        response = self.client.get(reverse('financial:planning'), {'months': 1})
+        
+        self.assertEqual(response.data[0]['accumulated_balance'], '1000.00')
+
+
+class MonthCloseTests(FinancialTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.staff = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='senha-segura-123'
+        )
+        self.january = self.create_expense(entry_date=date(2025, 1, 10), amount=Decimal('100.00'))
+        self.create_expense(entry_date=date(2025, 1, 20), amount=Decimal('50.00'), status='paid',
+                            paid_date=date(2025, 1, 20))
+        self.create_income(entry_date=date(2025, 1, 5), amount=Decimal('1000.00'))
+        self.february = self.create_expense(entry_date=date(2025, 2, 3), amount=Decimal('70.00'))
+    
+    def close(self, year=2025, month=1):
+        return self.client.post(reverse('financial:closes'), {'year': year, 'month': month})
+    
+    def test_close_month_writes_snapshot_and_lists_it(self):
+        response = self.close()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.close().status_code, 400)
+        future = date.today() + timedelta(days=40)
+        self.assertEqual(self.close(future.year, future.month).status_code, 400)
+        
+        response = self.client.get(reverse('financial:closes'))
+        self.assertEqual(response.data, [{
+            'year': 2025, 'month': 1, 'closed_at': response.data[0]['closed_at'],
+            'total_income': '1000.00', 'total_expenses': '150.00', 'entries': 3,
+        }])
+    
+    def test_entries_in_closed_month_are_locked_until_reopened(self):
+        self.close()
+        url = reverse('financial:expense-detail', args=[self.january.pk])
+        
+        response = self.client.patch(url, {'amount': '999.00'})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.client.delete(url).status_code, 409)
+        response = self.client.post(reverse('financial:expense-mark-paid', args=[self.january.pk]))
+        self.assertEqual(response.status_code, 409)
+        
+        # Mover um lançamento aberto para o mês fechado também é bloqueado
+        response = self.client.patch(reverse('financial:expense-detail', args=[self.february.pk]),
+                                     {'entry_date': '2025-01-31'})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.client.patch(reverse('financial:expense-detail', args=[self.february.pk]),
+                                           {'amount': '80.00'}).status_code, 200)
+        
+        self.assertEqual(self.client.delete(reverse('financial:close-detail', args=[2025, 1])).status_code, 204)
+        self.assertEqual(self.client.delete(reverse('financial:close-detail', args=[2025, 1])).status_code, 404)
+        self.assertEqual(self.client.patch(url, {'amount': '120.00'}).status_code, 200)
+    
+    def test_admin_blocks_bulk_actions_on_closed_months(self):
+        self.close()
+        self.client.force_login(self.staff)
+        
+        self.client.post(reverse('admin:financial_expense_changelist'), {
+            'action': 'mark_as_paid', '_selected_action': [self.january.pk, self.february.pk],
+        })
+        
+        self.january.refresh_from_db()
+        self.february.refresh_from_db()
+        self.assertEqual((self.january.status, self.february.status), ('pending', 'pending'))
+        response = self.client.get(reverse('admin:financial_expense_change', args=[self.january.pk]))
+        self.assertNotContains(response, 'name="_save"')
+    
+    def test_monthly_series_reads_snapshots_for_closed_months(self):
+        self.close()
+        # Alteração direta no banco não aparece enquanto o mês estiver fechado
+        Expense.objects.filter(pk=self.january.pk).update(amount=Decimal('900.00'))
+        
+        params = {'from': '2025-01-01', 'to': '2025-02-28', 'group': 'category'}
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('financial:timeseries'), params)
+        
+        january, february = response.data['buckets']
+        self.assertEqual(january['expenses']['total'], '150.00')
+        self.assertEqual(january['expenses']['groups'][0]['label'], 'Mercado')
+        self.assertEqual(january['incomes']['count'], 1)
+        self.assertEqual(february['expenses']['total'], '70.00')
+        
+        # Intervalo que começa no meio do mês lê os lançamentos
+        response = self.client.get(reverse('financial:timeseries'), {'from': '2025-01-15', 'to': '2025-01-31'})
+        self.assertEqual(response.data['buckets'][0]['expenses']['total'], '50.00')
+        
+        self.client.delete(reverse('financial:close-detail', args=[2025, 1]))
+        response = self.client.get(reverse('financial:timeseries'), params)
+        self.assertEqual(response.data['buckets'][0]['expenses']['total'], '950.00')
+
+
+class ColumnarEngineTests(FinancialTestMixin, APITestCase):
+    def test_cents_conversion_and_group_sum(self):
+        self.assertEqual(columnar.to_cents(Decimal('1234.56')), 123456)
+        self.assertEqual(columnar.to_cents('0.015'), 2)
+        self.assertEqual(columnar.from_cents(-5), Decimal('-0.05'))
+        self.assertEqual(columnar.group_sum([3, 1, 3], [100, 20, 5]), {3: 105, 1: 20})
+    
+    def test_planning_projects_all_months_from_one_load(self):
+        this_month = date.today().replace(day=1)
+        next_month = this_month + relativedelta(months=1)
+        self.create_income(amount=Decimal('5000.00'), entry_type='fixed')
+        self.create_income(amount=Decimal('200.50'), entry_type='single', start_date=next_month)
+        self.create_expense(amount=Decimal('100.00'), entry_type='fixed')
+        self.create_expense(amount=Decimal('300.00'), entry_type='installment', start_date=this_month,
+                            total_installments=3, current_installment=1)
+        self.create_expense(amount=Decimal('40.00'), entry_type='installment',
+                            start_date=next_month + timedelta(days=1), total_installments=2, current_installment=1)
+        
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('financial:planning'), {'months': 3})
+        
+        months = [
+            (month['total_income'], month['installment_expenses'], month['total_expenses'],
+             month['accumulated_balance'])
+            for month in response.data
+        ]
+        self.assertEqual(months, [
+            ('5000.00', '300.00', '400.00', '4600.00'),
+            ('5200.50', '300.00', '400.00', '9400.50'),
+            ('5000.00', '340.00', '440.00', '13960.50'),
+        ])
+        self.assertEqual(response.data[0]['month_name'], calendar.month_name[this_month.month])
+    
+    def test_benchmark_command_matches_decimal_path(self):
+        out = StringIO()
+        call_command('benchmark_engine', rows=300, months=6, stdout=out)
+        self.assertIn('Resultados idênticos.', out.getvalue())
+
+
+class ScenarioPlanningTests(FinancialTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.salary = self.create_income(amount=Decimal('5000.00'), entry_type='fixed')
+        self.rent = self.create_expense(amount=Decimal('2000.00'), entry_type='fixed')
+        self.create_expense(amount=Decimal('3500.00'), entry_type='single',
+                            start_date=date.today().replace(day=1) + relativedelta(months=1))
+        self.url = reverse('financial:planning-scenarios')
+    
+    def post(self, scenarios, months=3):
+        return self.client.post(self.url, {'months': months, 'scenarios': scenarios}, format='json')
+    
+    def balances(self, result):
+        return [month['accumulated_balance'] for month in result['months']]
+    
+    def test_scenarios_share_one_baseline_load(self):
+        with self.assertNumQueries(3):
+            response = self.post([
+                {'name': 'Financiamento', 'add': [{'type': 'expense', 'amount': '500.00',
+                                                   'entry_type': 'installment', 'total_installments': 24}]},
+                {'name': 'Sem aluguel', 'remove': [{'type': 'expense', 'id': self.rent.pk}]},
+                {'name': 'Aumento', 'change': [{'type': 'income', 'id': self.salary.pk, 'amount': '6000.00'}]},
+            ])
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.balances(response.data['baseline']), ['3000.00', '2500.00', '5500.00'])
+        financing, no_rent, raise_ = response.data['scenarios']
+        self.assertEqual(self.balances(financing), ['2500.00', '1500.00', '4000.00'])
+        self.assertEqual(financing['lowest_balance']['accumulated_balance'], '1500.00')
+        self.assertEqual(self.balances(no_rent), ['5000.00', '6500.00', '11500.00'])
+        self.assertEqual(no_rent['lowest_balance']['month'], date.today().month)
+        self.assertEqual(self.balances(raise_), ['4000.00', '4500.00', '8500.00'])
+        
+        # Nenhum dado real foi alterado
+        self.assertEqual(Expense.objects.count(), 2)
+        self.rent.refresh_from_db()
+        self.salary.refresh_from_db()
+        self.assertEqual((self.rent.amount, self.salary.amount), (Decimal('2000.00'), Decimal('5000.00')))
+    
+    def test_unknown_entries_and_invalid_batches_are_rejected(self):
+        other = User.objects.create_user(username='bia', email='bia@example.com', password='senha-segura-123')
+        foreign = self.create_expense(created_by=other)
+        
+        response = self.post([{'name': 'X', 'remove': [{'type': 'expense', 'id': foreign.pk}]}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.post([]).status_code, 400)
+        response = self.post([{'name': 'X', 'add': [{'type': 'expense', 'amount': '10.00',
+                                                     'entry_type': 'installment'}]}])
+        self.assertEqual(response.status_code, 400)
+    
+    def test_large_batches_use_process_pool_with_same_results(self):
+        batch = [
+            {'name': f'Cenário {index}', 'add': [{'type': 'income', 'amount': f'{index}.00', 'entry_type': 'fixed'}]}
+            for index in range(1, 7)
+        ]
+        serial = self.post(batch).data
+        
+        with override_settings(PLANNING_SCENARIO_POOL_THRESHOLD=2, PLANNING_SCENARIO_WORKERS=2):
+            pooled = self.post(batch).data
+        self.assertIsNotNone(scenarios._pool)
+        scenarios.reset_pool()
+        
+        self.assertEqual(pooled, serial)
+        self.assertEqual([result['name'] for result in pooled['scenarios']], [item['name'] for item in batch])
+    
+    def test_pool_workers_import_without_django_apps(self):
+        # Com spawn os workers importam os módulos do zero, sem os apps do Django
+        incomes = columnar.EntryColumns.from_queryset(Income.objects.all())
+        expenses = columnar.EntryColumns.from_queryset(Expense.objects.all())
+        batch = [{'name': str(index), 'remove': {}, 'amounts': {}, 'add': []} for index in range(4)]
+        args = (incomes, expenses, batch, date.today().replace(day=1), 3, 0)
+        
+        scenarios.reset_pool()
+        scenarios._pool = ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context('spawn'))
+        scenarios._pool_workers = 2
+        try:
+            with self.assertNoLogs('financial.scenarios'):
+                pooled = scenarios.evaluate_batch(*args, workers=2, pool_threshold=2)
+        finally:
+            scenarios.reset_pool()
+        self.assertEqual(pooled, scenarios.evaluate_chunk(*args))
+
+
+class DebtEngineTests(FinancialTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.this_month = date.today().replace(day=1)
+        self.car = self.create_expense(
+            description='Carro', amount=Decimal('300.00'), entry_type='installment',
+            start_date=self.this_month - relativedelta(months=2), total_installments=10, current_installment=1
+        )
+        self.phone = self.create_expense(
+            description='Celular', amount=Decimal('100.00'), entry_type='installment', start_date=self.this_month,
+            total_installments=3, current_installment=1, status='paid', paid_date=date.today()
+        )
+    
+    def test_advance_installments_is_set_based_and_idempotent(self):
+        finished = self.create_expense(entry_type='installment', start_date=self.this_month - relativedelta(years=2),
+                                       total_installments=4, current_installment=2)
+        
+        # UPDATE + registro no feed de sincronização (DELETE e INSERT ... SELECT), em uma transação
+        with self.assertNumQueries(5):
+            self.assertEqual(debts.advance_installments(), 2)
+        self.assertEqual(debts.advance_installments(), 0)
+        
+        values = dict(Expense.objects.values_list('id', 'current_installment'))
+        self.assertEqual((values[self.car.pk], values[self.phone.pk], values[finished.pk]), (3, 1, 4))
+        
+        debts.advance_installments(today=self.this_month + relativedelta(months=1))
+        self.assertEqual(Expense.objects.get(pk=self.phone.pk).current_installment, 2)
+    
+    def test_advancing_a_paid_installment_keeps_the_payment_and_counts_the_new_parcel(self):
+        def phone_debt():
+            items = debts.compute_debts(debts.installment_debts(self.user.household_id))['items']
+            item = next(item for item in items if item['description'] == 'Celular')
+            return item['parcels_left'], item['remaining_balance']
+        
+        def sql_debt():
+            return Expense.objects.filter(pk=self.phone.pk).aggregate(
+                debt=Sum(debts.remaining_debt_expression())
+            )['debt']
+        
+        # Parcela 1 paga: restam 2 de 3, e continuam restando após avançar para a parcela 2
+        self.assertEqual((phone_debt(), sql_debt()), ((2, 20000), Decimal('200.00')))
+        balance_before = ledger.balance_as_of(self.user.household_id, date.today())
+        
+        debts.advance_installments(today=self.this_month + relativedelta(months=1))
+        
+        self.phone.refresh_from_db()
+        self.assertEqual((self.phone.current_installment, self.phone.status, self.phone.paid_date),
+                         (2, 'paid', date.today()))
+        self.assertEqual((phone_debt(), sql_debt()), ((2, 20000), Decimal('200.00')))
+        
+        # O pagamento da parcela anterior continua no razão e nos agregados
+        self.assertEqual(ledger.balance_as_of(self.user.household_id, date.today()), balance_before)
+        self.assertEqual(find_inconsistencies(), [])
+        
+        # Pagar a nova parcela a quita
+        self.phone.mark_as_paid(self.this_month + relativedelta(months=1))
+        self.assertEqual(phone_debt(), (1, 10000))
+    
+    def test_debt_endpoint_returns_remaining_balance_and_schedule(self):
+        call_command('advance_installments', stdout=StringIO())
+        
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('financial:debt'))
+        
+        data = response.data
+        self.assertEqual((data['total_remaining'], data['parcels_left']), ('2600.00', 10))
+        items = {item['description']: item for item in data['items']}
+        self.assertEqual((items['Carro']['parcels_left'], items['Carro']['remaining_balance']), (8, '2400.00'))
+        self.assertEqual(items['Celular']['next_due'], (self.this_month + relativedelta(months=1)).isoformat())
+        
+        schedule = [(row['payment'], row['remaining_after']) for row in data['schedule']]
+        self.assertEqual(len(schedule), 8)
+        self.assertEqual(schedule[:3], [('300.00', '2300.00'), ('400.00', '1900.00'), ('400.00', '1500.00')])
+        self.assertEqual(schedule[-1], ('300.00', '0.00'))
+        self.assertEqual(data['payoff_month'], (self.this_month + relativedelta(months=7)).isoformat())
+        
+        response = self.client.get(reverse('financial:metrics'))
+        self.assertEqual(response.data['total_debt'], '2600.00')
+
+
+class DueReminderTests(FinancialTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.today = date(2025, 2, 26)
+        self.partner = User.objects.create_user(
+            username='bia', email='bia@example.com', password='senha-segura-123', first_name='Bia'
+        )
+        start = date(2025, 1, 1)
+        self.rent = self.create_expense(description='Aluguel', amount=Decimal('1500.00'), entry_type='fixed',
+                                        due_day=27, start_date=start)
+        # Dia 31 vence no último dia de fevereiro
+        self.card = self.create_expense(description='Cartão', entry_type='installment', due_day=31,
+                                        start_date=start, total_installments=3, current_installment=2)
+        self.create_expense(description='Paga', due_day=27, start_date=start, entry_type='fixed', status='paid',
+                            paid_date=start)
+        self.create_expense(description='Parcelas encerradas', entry_type='installment', due_day=27,
+                            start_date=date(2024, 1, 1), total_installments=2, current_installment=2)
+        self.create_expense(description='Fora da janela', entry_type='fixed', due_day=10, start_date=start)
+        self.create_expense(description='Luz', amount=Decimal('80.00'), entry_type='single', due_day=1,
+                            start_date=date(2025, 3, 1), created_by=self.partner)
+    
+    @override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+    def test_digests_are_sent_once_per_user_and_due_date(self):
+        # Duas leituras para todos os usuários e um INSERT por lote (entre SAVEPOINT/RELEASE)
+        with self.assertNumQueries(5):
+            users, reminders = send_due_reminders(self.today, days=3)
+        self.assertEqual((users, reminders), (2, 3))
+        
+        self.assertEqual(len(mail.outbox), 2)
+        messages = {message.to[0]: message for message in mail.outbox}
+        body = messages['ana@example.com'].body
+        self.assertIn('27/02: Aluguel (R$ 1.500,00)', body)
+        self.assertIn('28/02: Cartão', body)
+        self.assertNotIn('Paga', body)
+        self.assertNotIn('encerradas', body)
+        self.assertIn('01/03: Luz', messages['bia@example.com'].body)
+        
+        # Repetir a execução não reenvia
+        self.assertEqual(send_due_reminders(self.today, days=3), (0, 0))
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(DueReminder.objects.count(), 3)
+    
+    @override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+    def test_dry_run_command_does_not_send(self):
+        out = StringIO()
+        call_command('send_due_reminders', '--dry-run', '--days', '400', stdout=out)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertFalse(DueReminder.objects.exists())
+
+
+class HouseholdTests(FinancialTestMixin, APITestCase):
+    """
+    Compartilhamento por grupo familiar (household_id nos lançamentos).
+    """
+    def setUp(self):
+        super().setUp()
+        self.partner = User.objects.create_user(
+            username='bia', email='bia@example.com', password='senha-segura-123', first_name='Bia'
+        )
+        self.child = User.objects.create_user(
+            username='caio', email='caio@example.com', password='senha-segura-123', first_name='Caio'
+        )
+    
+    def list_descriptions(self):
+        response = self.client.get(reverse('financial:expense-list'))
+        return sorted(item['description'] for item in response.data['results'])
+    
+    def test_entries_get_the_author_household(self):
+        self.assertNotEqual(self.user.household_id, self.partner.household_id)
+        expense = self.create_expense()
+        self.assertEqual(expense.household_id, self.user.household_id)
+        self.assertEqual(self.expense_category.household_id, self.user.household_id)
+    
+    def test_household_members_share_entries(self):
+        self.create_expense(description='Ana')
+        self.create_expense(description='Bia', created_by=self.partner)
+        self.create_expense(description='Caio', created_by=self.child)
+        self.assertEqual(self.list_descriptions(), ['Ana'])
+        
+        # Mais de dois membros; os lançamentos anteriores de cada um vão junto
+        self.user.household.add_member(self.partner)
+        self.user.household.add_member(self.child)
+        self.assertEqual(self.list_descriptions(), ['Ana', 'Bia', 'Caio'])
+        
+        self.client.force_authenticate(self.child)
+        self.assertEqual(self.list_descriptions(), ['Ana', 'Bia', 'Caio'])
+    
+    def test_listing_filters_by_household_equality(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('financial:expense-list'))
+        sql = queries.captured_queries[-1]['sql']
+        self.assertIn('"household_id" = ', sql)
+        self.assertNotIn('"created_by_id" IN', sql)
+    
+    def test_rollups_and_closes_follow_the_member(self):
+        self.create_expense(entry_date=date(2025, 1, 10), amount=Decimal('100.00'))
+        self.create_expense(entry_date=date(2025, 1, 12), amount=Decimal('40.00'), created_by=self.partner)
+        self.user.household.add_member(self.partner)
+        self.assertEqual(
+            set(DailyRollup.objects.values_list('household_id', flat=True)), {self.user.household_id}
+        )
+        
+        params = {'from': '2025-01-01', 'to': '2025-01-31', 'group': 'status'}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('financial:breakdown'), params)
+        self.assertEqual(response.data['items'][0]['total'], '140.00')
+        self.assertNotIn('"created_by_id" IN', queries.captured_queries[-1]['sql'])
+        
+        response = self.client.post(reverse('financial:closes'), {'year': 2025, 'month': 1})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            set(MonthClose.objects.values_list('created_by_id', 'household_id')),
+            {(self.user.pk, self.user.household_id), (self.partner.pk, self.user.household_id)}
+        )
+        self.assertEqual(self.client.get(reverse('financial:closes')).data[0]['total_expenses'], '140.00')
+    
+    def test_setting_partner_joins_household(self):
+        self.create_expense(description='Bia', created_by=self.partner)
+        self.client.force_authenticate(self.partner)
+        response = self.client.patch(reverse('authentication:profile_update'), {'partner': self.user.pk})
+        self.assertEqual(response.status_code, 200)
+        
+        self.partner.refresh_from_db()
+        self.assertEqual(self.partner.household_id, self.user.household_id)
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.list_descriptions(), ['Bia'])
+
+
+class ArchiveTests(FinancialTestMixin, APITestCase):
+    """
+    Arquivo de lançamentos antigos (tabelas ArchivedIncome / ArchivedExpense).
+    """
+    def setUp(self):
+        super().setUp()
+        self.old = self.create_expense(description='Antiga', entry_date=date(2020, 1, 10),
+                                       status='paid', paid_date=date(2020, 1, 12))
+        self.old_pending = self.create_expense(description='Pendente', entry_date=date(2020, 1, 15))
+        self.old_fixed = self.create_income(entry_date=date(2020, 1, 5), status='paid',
+                                            paid_date=date(2020, 1, 5), amount=Decimal('1000.00'))
+        self.old_single = self.create_income(description='Bônus', entry_date=date(2020, 1, 20),
+                                             entry_type='single', status='paid', paid_date=date(2020, 1, 20),
+                                             amount=Decimal('200.00'))
+        self.unclosed = self.create_expense(description='Sem fechamento', entry_date=date(2020, 2, 3),
+                                            status='paid', paid_date=date(2020, 2, 3))
+        self.recent = self.create_expense(description='Recente', status='paid', paid_date=date.today())
+        self.client.post(reverse('financial:closes'), {'year': 2020, 'month': 1})
+    
+    def archive(self):
+        moved = archive.archive_entries(date(2021, 1, 1))
+        # Recarrega o usuário autenticado com o `archived_through` atualizado
+        self.user = User.objects.select_related('household').get(pk=self.user.pk)
+        self.client.force_authenticate(self.user)
+        return moved
+    
+    def list_descriptions(self, **params):
+        response = self.client.get(reverse('financial:expense-list'), params)
+        return response.data['count'], [item['description'] for item in response.data['results']]
+    
+    def test_archives_only_single_paid_entries_of_closed_months(self):
+        self.assertEqual(self.archive(), {'income': 1, 'expense': 1})
+        
+        self.assertEqual(list(ArchivedExpense.objects.values_list('id', flat=True)), [self.old.pk])
+        self.assertEqual(list(ArchivedIncome.objects.values_list('id', flat=True)), [self.old_single.pk])
+        self.assertFalse(Expense.objects.filter(pk=self.old.pk).exists())
+        self.assertTrue(Income.objects.filter(pk=self.old_fixed.pk).exists())
+        self.assertEqual(self.user.household.archived_through, date(2020, 1, 20))
+        self.assertEqual(find_inconsistencies(), [])
+        self.assertEqual(self.archive(), {'income': 0, 'expense': 0})
+    
+    def test_listing_includes_archive_only_when_range_reaches_it(self):
+        self.archive()
+        
+        count, descriptions = self.list_descriptions(ordering='entry_date')
+        self.assertEqual(count, 4)
+        self.assertEqual(descriptions, ['Antiga', 'Pendente', 'Sem fechamento', 'Recente'])
+        self.assertEqual(self.list_descriptions(start_date='2020-01-01', end_date='2020-01-31'),
+                         (2, ['Pendente', 'Antiga']))
+        
+        with CaptureQueriesContext(connection) as queries:
+            count, descriptions = self.list_descriptions(start_date='2020-02-01')
+        self.assertEqual(descriptions, ['Recente', 'Sem fechamento'])
+        self.assertFalse(any('archived' in query['sql'] for query in queries.captured_queries))
+    
+    def test_archive_keeps_ledger_balance(self):
+        before = ledger.balance_as_of(self.user.household_id, date.today())
+        self.archive()
+        call_command('rebuild_ledger', stdout=StringIO())
+        self.assertEqual(ledger.balance_as_of(self.user.household_id, date.today()), before)
+    
+    def test_restore_by_command_and_by_reopening_month(self):
+        self.archive()
+        out = StringIO()
+        call_command('restore_archive', household=self.user.household_id, stdout=out)
+        self.assertIn('1 receitas e 1 despesas', out.getvalue())
+        self.assertTrue(Expense.objects.filter(pk=self.old.pk, description='Antiga').exists())
+        self.assertIsNone(User.objects.get(pk=self.user.pk).household.archived_through)
+        with self.assertRaises(CommandError):
+            call_command('restore_archive', stdout=out)
+        
+        self.archive()
+        self.assertEqual(self.client.delete(reverse('financial:close-detail', args=[2020, 1])).status_code, 204)
+        self.assertFalse(ArchivedExpense.objects.exists())
+        self.assertFalse(ArchivedIncome.objects.exists())
+        self.assertEqual(self.client.patch(reverse('financial:expense-detail', args=[self.old.pk]),
+                                           {'amount': '10.00'}).status_code, 200)
+
+
+class ChangeFeedTests(FinancialTestMixin, APITestCase):
+    """
+    Feed de alterações com tombstones (`/changes/?since=<cursor>`).
+    """
+    def changes(self, since=0, **params):
+        response = self.client.get(reverse('financial:changes'), {'since': since, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+    
+    def test_returns_only_records_changed_since_cursor(self):
+        expense = self.create_expense()
+        untouched = self.create_income()
+        cashflow = CashFlow.objects.create(description='Ajuste', amount=Decimal('10.00'), flow_type='adjustment',
+                                           date=date.today(), responsible='both', created_by=self.user)
+        
+        full = self.changes()
+        self.assertEqual(len(full['changes']['category']), 2)
+        self.assertEqual([item['id'] for item in full['changes']['income']], [untouched.pk])
+        self.assertFalse(full['has_more'])
+        
+        expense.amount = Decimal('350.00')
+        expense.save()
+        cashflow_id = cashflow.pk
+        cashflow.delete()
+        Category.objects.create(name='Lazer', type='expense', created_by=self.user)
+        
+        delta = self.changes(full['cursor'])
+        self.assertEqual([(item['id'], item['amount']) for item in delta['changes']['expense']],
+                         [(expense.pk, '350.00')])
+        self.assertEqual(delta['changes']['income'], [])
+        self.assertEqual([item['name'] for item in delta['changes']['category']], ['Lazer'])
+        self.assertEqual(delta['deleted']['cashflow'], [cashflow_id])
+        self.assertGreater(delta['cursor'], full['cursor'])
+        
+        self.assertEqual(self.changes(delta['cursor'])['changes']['expense'], [])
+        self.assertEqual(self.client.get(reverse('financial:changes'), {'since': -1}).status_code, 400)
+    
+    def test_pages_with_limit(self):
+        for day in range(1, 6):
+            self.create_expense(description=f'Compra {day}')
+        
+        first = self.changes(limit=4)
+        self.assertTrue(first['has_more'])
+        second = self.changes(first['cursor'], limit=4)
+        self.assertFalse(second['has_more'])
+        received = first['changes']['expense'] + second['changes']['expense']
+        self.assertEqual(len({item['id'] for item in received}), 5)
+    
+    def test_bulk_updates_and_household_moves_are_recorded(self):
+        parcel = self.create_expense(entry_type='installment', total_installments=10,
+                                     start_date=date.today() - relativedelta(months=2))
+        cursor = self.changes()['cursor']
+        self.assertEqual(debts.advance_installments(), 1)
+        self.assertEqual([item['current_installment'] for item in self.changes(cursor)['changes']['expense']],
+                         [3])
+        
+        partner = User.objects.create_user(
+            username='bia', email='bia@example.com', password='senha-segura-123', first_name='Bia'
+        )
+        previous_id = self.user.household_id
+        cursor = self.changes()['cursor']
+        partner.household.add_member(self.user)
+        
+        # O grupo anterior recebe o tombstone; o novo, o lançamento
+        self.assertEqual(sync.changes_since(previous_id, cursor)['deleted']['expense'], [parcel.pk])
+        self.client.force_authenticate(partner)
+        self.assertEqual([item['id'] for item in self.changes(cursor)['changes']['expense']], [parcel.pk])
+    
+    def test_backends_with_row_locks_lock_the_household_before_allocating_cursors(self):
+        """
+        Fora do SQLite, o grupo é bloqueado (FOR UPDATE) antes de cada gravação no
+        feed, para que os cursores do grupo sejam confirmados em ordem. O FOR UPDATE é
+        omitido do SQL para que o SQLite aceite a consulta.
+        """
+        self.create_expense(entry_type='installment', total_installments=10,
+                            start_date=date.today() - relativedelta(months=2))
+        household_table = self.user.household._meta.db_table
+        sync_table = SyncChange._meta.db_table
+        with mock.patch.object(connection.features, 'has_select_for_update', True), \
+                mock.patch.object(connection.ops, 'for_update_sql', return_value=''):
+            for write in (self.create_income, debts.advance_installments):
+                with CaptureQueriesContext(connection) as queries:
+                    write()
+                statements = [query['sql'] for query in queries]
+                lock = next(i for i, sql in enumerate(statements) if f'FROM "{household_table}"' in sql)
+                insert = next(i for i, sql in enumerate(statements) if f'INSERT INTO "{sync_table}"' in sql)
+                self.assertLess(lock, insert)
+
+
+class EventStreamTests(FinancialTestMixin, APITestCase):
+    """
+    Stream de eventos do grupo familiar (SSE) e broker em memória.
+    """
+    def run_stream(self, steps, **kwargs):
+        """Abre o stream, executa `steps(stream)` e o fecha (desinscrevendo a conexão)."""
+        async def scenario():
+            stream = events.stream(self.user.household_id, **kwargs)
+            try:
+                self.assertEqual(await stream.__anext__(), f'retry: {events.RETRY_MS}\n\n')
+                return await steps(stream)
+            finally:
+                await stream.aclose()
+        return async_to_sync(scenario)()
+    
+    def parse(self, message):
+        fields = dict(line.split(': ', 1) for line in message.strip().split('\n'))
+        return fields['event'], int(fields['id']), json.loads(fields['data'])
+    
+    def write(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.create_expense(**kwargs)
+    
+    def test_household_writes_are_pushed_with_metrics(self):
+        outsider = User.objects.create_user(username='bia', email='bia@example.com', password='senha-segura-123')
+        category = Category.objects.create(name='Mercado', type='expense', created_by=outsider)
+        
+        async def steps(stream):
+            await sync_to_async(self.write)(created_by=outsider, category=category)
+            expense = await sync_to_async(self.write)(amount=Decimal('120.00'))
+            return expense, await stream.__anext__()
+        
+        expense, message = self.run_stream(steps, with_metrics=True)
+        name, event_id, data = self.parse(message)
+        self.assertEqual(name, 'change')
+        self.assertEqual((data['kind'], data['ids'], data['deleted']), ('expense', [expense.pk], False))
+        self.assertEqual(event_id, data['cursor'])
+        self.assertEqual(data['metrics']['pending_amount'], '120.00')
+        self.assertEqual(events.get_broker().subscriber_count(self.user.household_id), 0)
+    
+    @override_settings(EVENTS_HEARTBEAT_SECONDS=0.01)
+    def test_heartbeat_and_resync_after_reconnect(self):
+        self.create_expense()
+        cursor = sync.changes_since(self.user.household_id)['cursor']
+        
+        async def steps(stream):
+            return [await stream.__anext__(), await stream.__anext__()]
+        
+        resync, ping = self.run_stream(steps, last_event_id=cursor - 1)
+        self.assertEqual(self.parse(resync), ('resync', cursor, {'cursor': cursor}))
+        self.assertEqual(ping, ': ping\n\n')
+    
+    def test_endpoint_accepts_token_in_query_string(self):
+        client = self.client_class()
+        url = reverse('financial:events')
+        self.assertEqual(client.get(url, HTTP_ACCEPT='text/event-stream').status_code, 401)
+        
+        token = str(AccessToken.for_user(self.user))
+        response = client.get(url, {'access_token': token}, HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertTrue(response.streaming)
+        response.close()
+
+
+class SparseFieldsetTests(FinancialTestMixin, APITestCase):
+    """
+    Campos escolhidos com `?fields=` / `?omit=` e poda das colunas consultadas.
+    """
+    def list_with_sql(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data['results'], queries.captured_queries[-1]['sql']
+    
+    def test_fields_prunes_output_and_columns(self):
+        self.create_expense(entry_type='installment', total_installments=3)
+        
+        results, sql = self.list_with_sql(reverse('financial:expense-list'),
+                                          {'fields': 'id,description,amount,category_name'})
+        self.assertEqual(list(results[0]), ['id', 'description', 'amount', 'category_name'])
+        self.assertEqual(results[0]['category_name'], 'Mercado')
+        self.assertIn('"financial_category"."name"', sql)
+        self.assertNotIn('"financial_category"."color"', sql)
+        self.assertNotIn('total_installments', sql)
+        self.assertNotIn('authentication_user', sql)
+        
+        results, sql = self.list_with_sql(reverse('financial:expense-list'),
+                                          {'fields': 'id,status_display,installment_info,is_overdue'})
+        self.assertEqual(results[0]['installment_info'], '1/3')
+        self.assertEqual(results[0]['status_display'], 'Pendente')
+        self.assertNotIn('JOIN', sql)
+    
+    def test_unknown_field_names_are_rejected(self):
+        url = reverse('financial:expense-list')
+        response = self.client.get(url, {'fields': 'descricao,valor'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'fields': ['Campos desconhecidos: descricao, valor.']})
+        
+        response = self.client.get(url, {'fields': 'id,amount', 'omit': 'amount,nope'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'omit': ['Campos desconhecidos: nope.']})
+    
+    def test_omit_drops_fields_and_joins(self):
+        CashFlow.objects.create(description='Ajuste', amount=Decimal('10.00'), flow_type='adjustment',
+                                date=date.today(), responsible='both', created_by=self.user)
+        self.create_income()
+        
+        results, sql = self.list_with_sql(reverse('financial:income-list'),
+                                          {'omit': 'category_name,category_color'})
+        self.assertNotIn('category_name', results[0])
+        self.assertIn('installment_info', results[0])
+        self.assertNotIn('JOIN', sql)
+        
+        results, sql = self.list_with_sql(reverse('financial:cashflow-list'), {'fields': 'id,amount'})
+        self.assertEqual(results, [{'id': results[0]['id'], 'amount': '10.00'}])
+        self.assertNotIn('"description"', sql)
+    
+    def test_writes_and_archived_listing_keep_working(self):
+        response = self.client.post(reverse('financial:category-list') + '?fields=id',
+                                    {'name': 'Lazer', 'type': 'expense'})
+        self.assertEqual(response.data['name'], 'Lazer')
+        
+        self.create_expense(description='Antiga', entry_date=date(2020, 1, 10), status='paid',
+                            paid_date=date(2020, 1, 12))
+        self.client.post(reverse('financial:closes'), {'year': 2020, 'month': 1})
+        archive.archive_entries(date(2021, 1, 1))
+        self.client.force_authenticate(User.objects.select_related('household').get(pk=self.user.pk))
+        
+        response = self.client.get(reverse('financial:expense-list'), {'fields': 'description,category_color'})
+        self.assertEqual(response.data['results'], [{'description': 'Antiga', 'category_color': '#007bff'}])
+
+
+@override_settings(BATCH_MAX_REQUESTS=5)
+class BatchRequestTests(FinancialTestMixin, APITestCase):
+    """
+    Requisições em lote (`/api/batch/`).
+    """
+    def batch(self, *requests):
+        return self.client.post(reverse('batch'), {'requests': list(requests)}, format='json')
+    
+    def test_runs_dashboard_reads_in_one_request(self):
+        self.create_expense(description='Mercado')
+        
+        response = self.batch(
+            {'id': 'metrics', 'path': '/api/financial/metrics/'},
+            {'id': 'categories', 'path': '/api/financial/categories/?type=expense'},
+            {'id': 'expenses', 'path': '/api/financial/expenses/', 'params': {'fields': 'description'}},
+            {'id': 'profile', 'path': '/api/auth/profile/'},
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        items = {item['id']: item for item in response.data['responses']}
+        self.assertEqual([item['status'] for item in response.data['responses']], [200] * 4)
+        self.assertEqual(items['metrics']['body']['pending_amount'], '300.00')
+        self.assertEqual([category['name'] for category in items['categories']['body']['results']], ['Mercado'])
+        self.assertEqual(items['expenses']['body']['results'], [{'description': 'Mercado'}])
+        self.assertEqual(items['profile']['body']['email'], 'ana@example.com')
+        self.assertEqual(response.json()['responses'][0]['body']['pending_amount'], '300.00')
+    
+    def test_item_errors_do_not_stop_the_batch(self):
+        response = self.batch(
+            {'path': '/api/financial/nope/'},
+            {'path': '/api/financial/expenses/999/'},
+            {'path': '/api/batch/'},
+            {'path': '/api/financial/events/'},
+            {'path': '/api/financial/debt/'},
+        )
+        
+        self.assertEqual([(item['id'], item['status']) for item in response.data['responses']],
+                         [('0', 404), ('1', 404), ('2', 400), ('3', 400), ('4', 200)])
+    
+    def test_validates_limits_and_methods(self):
+        self.assertEqual(self.batch(*[{'path': '/api/financial/debt/'}] * 6).status_code, 400)
+        self.assertEqual(self.batch({'path': '/api/financial/debt/', 'method': 'POST'}).status_code, 400)
+        self.assertEqual(self.batch({'path': '/admin/'}).status_code, 400)
+        self.assertEqual(self.batch().status_code, 400)
+        
+        self.client.logout()
+        self.client.force_authenticate(None)
+        self.assertEqual(self.batch({'path': '/api/financial/debt/'}).status_code, 401)
+
+
+class DashboardTests(FinancialTestMixin, APITestCase):
+    """
+    Painel composto (`/dashboard/`): todos os widgets de uma varredura por tabela.
+    """
+    def setUp(self):
+        super().setUp()
+        CashFlow.objects.create(
+            description='Saldo inicial', amount=Decimal('1000.00'), flow_type='initial',
+            date=date.today() - timedelta(days=40), responsible='both', created_by=self.user
+        )
+        self.create_income(status='paid', paid_date=date.today())
+        self.create_expense(status='paid', paid_date=date.today(), description='Pago')
+        self.create_expense(entry_type='fixed', amount=Decimal('1200.00'), description='Aluguel')
+        self.create_expense(entry_type='installment', total_installments=10, current_installment=1,
+                            description='Geladeira')
+        self.overdue = self.create_expense(start_date=date.today() - timedelta(days=40),
+                                           entry_date=date.today() - timedelta(days=40), description='Atrasada')
+    
+    def test_widgets_match_individual_endpoints_within_budget(self):
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('financial:dashboard'), {'recent': 3})
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['metrics'], self.client.get(reverse('financial:metrics')).data)
+        self.assertEqual(response.data['planning'], self.client.get(reverse('financial:planning')).data[0])
+        
+        self.assertEqual([(item['label'], item['count'], item['amount']) for item in response.data['overdue']],
+                         [('Mercado', 1, '300.00')])
+        self.assertEqual(
+            [(item['kind'], item['label'], item['total'], item['count']) for item in response.data['breakdown']],
+            [('income', 'Salário', '5000.00', 1), ('expense', 'Mercado', '1800.00', 3)]
+        )
+        self.assertEqual([item['description'] for item in response.data['recent']],
+                         ['Geladeira', 'Aluguel', 'Pago'])
+        self.assertEqual(response.data['recent'][0]['kind'], 'expense')
+        self.assertEqual(response.data['recent'][0]['category_name'], 'Mercado')
+    
+    def test_only_household_rows(self):
+        outsider = User.objects.create_user(username='bia', email='bia@example.com', password='senha-segura-123')
+        category = Category.objects.create(name='Outros', type='expense', created_by=outsider)
+        self.create_expense(created_by=outsider, category=category, description='Alheia')
+        
+        response = self.client.get(reverse('financial:dashboard'))
+        
+        self.assertNotIn('Alheia', [item['description'] for item in response.data['recent']])
+        self.assertNotIn('Outros', [item['label'] for item in response.data['breakdown']])
+        self.assertEqual(len(response.data['recent']), 5)
+        self.assertEqual(self.client.get(reverse('financial:dashboard'), {'recent': 100}).status_code, 400)
+
+
+class MultiCurrencyTests(FinancialTestMixin, APITestCase):
+    """
+    Lançamentos em moeda estrangeira convertidos para BRL pela cotação da data.
+    """
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(currency.clear_cache)
+        self.today = date.today()
+        self.load_rates(
+            'currency,date,rate\n'
+            f'USD,{self.today - timedelta(days=60)},5.00\n'
+            f'USD,{self.today - timedelta(days=10)},5.50\n'
+        )
+    
+    def load_rates(self, content, suffix='.csv'):
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        self.addCleanup(os.remove, path)
+        with os.fdopen(handle, 'w') as rates_file:
+            rates_file.write(content)
+        out = StringIO()
+        call_command('load_exchange_rates', path, stdout=out)
+        return out.getvalue()
+    
+    def test_aggregates_convert_in_sql(self):
+        self.create_expense(entry_type='fixed', amount=Decimal('100.00'), currency='USD')
+        self.create_expense(amount=Decimal('300.00'))
+        # Anterior à primeira cotação: usa a primeira (5,00)
+        self.create_expense(amount=Decimal('10.00'), currency='USD', entry_date=self.today - timedelta(days=90))
+        
+        with self.assertNumQueries(3):
+            metrics = self.client.get(reverse('financial:metrics'))
+        self.assertEqual(metrics.data['monthly_fixed_expenses'], '550.00')
+        self.assertEqual(metrics.data['pending_amount'], '900.00')
+        
+        planning = self.client.get(reverse('financial:planning')).data[0]
+        self.assertEqual(planning['fixed_expenses'], '550.00')
+        self.assertEqual(self.client.get(reverse('financial:dashboard')).data['metrics'], metrics.data)
+        
+        breakdown = self.client.get(reverse('financial:breakdown'), {'days': 365, 'kind': 'expense'})
+        self.assertEqual(breakdown.data['items'][0]['total'], '900.00')
+    
+    def test_ledger_and_single_entry_conversion(self):
+        CashFlow.objects.create(description='Conta no exterior', amount=Decimal('200.00'), currency='USD',
+                                flow_type='initial', date=self.today - timedelta(days=30), responsible='both',
+                                created_by=self.user)
+        income = self.create_income(amount=Decimal('100.00'), currency='USD', status='paid', paid_date=self.today)
+        
+        self.assertEqual(ledger.balance_as_of(self.user.household_id, self.today), Decimal('1550.00'))
+        
+        response = self.client.get(reverse('financial:income-detail', args=[income.pk]))
+        self.assertEqual((response.data['amount'], response.data['currency'], response.data['converted_amount']),
+                         ('100.00', 'USD', '550.00'))
+        
+        income.currency = 'BRL'
+        income.save()
+        self.assertEqual(ledger.balance_as_of(self.user.household_id, self.today), Decimal('1100.00'))
+        self.assertEqual(find_inconsistencies(), [])
+    
+    def test_requires_rates_for_foreign_currency(self):
+        data = {
+            'description': 'Hotel', 'amount': '80.00', 'category': self.expense_category.pk,
+            'entry_date': str(self.today), 'start_date': str(self.today), 'due_day': 10,
+            'entry_type': 'single', 'responsible': 'both',
+        }
+        response = self.client.post(reverse('financial:expense-list'), {**data, 'currency': 'EUR'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('currency', response.data)
+        
+        self.load_rates(json.dumps([{'currency': 'EUR', 'date': str(self.today), 'rate': '6.10'}]), suffix='.json')
+        response = self.client.post(reverse('financial:expense-list'), {**data, 'currency': 'EUR'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['converted_amount'], '488.00')
+    
+    def test_loader_rejects_invalid_files(self):
+        with self.assertRaises(CommandError):
+            self.load_rates('currency,date,rate\nUSD,ontem,5.00\n')
+        with self.assertRaises(CommandError):
+            self.load_rates('currency,date,rate\nBRL,2024-01-01,1\n')
+        
+        self.assertIn('1 cotações', self.load_rates(f'currency,date,rate\nUSD,{self.today},5.80\n'))
+        self.assertEqual(currency.get_rate('USD', self.today), Decimal('5.80'))
+
+
+class BudgetTests(FinancialTestMixin, APITestCase):
+    """
+    Orçamentos por categoria com contadores de consumo (`BudgetUsage`).
+    """
+    def setUp(self):
+        super().setUp()
+        self.today = date.today()
+        self.last_month = self.today.replace(day=1) - timedelta(days=1)
+        self.url = reverse('financial:budget-list')
+    
+    def create_budget(self, **kwargs):
+        data = {'category': self.expense_category.pk, 'period': 'monthly', 'limit': '1000.00'}
+        data.update(kwargs)
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data
+    
+    def usage(self, budget_id):
+        response = self.client.get(reverse('financial:budget-detail', args=[budget_id]))
+        return response.data['paid'], response.data['pending'], response.data['remaining']
+    
+    def assertConsistent(self):
+        self.assertEqual(budgets.find_drift(), [])
+    
+    def test_creating_budget_counts_existing_expenses(self):
+        self.create_expense(amount=Decimal('100.00'), status='paid', paid_date=self.today)
+        self.create_expense(amount=Decimal('50.00'), entry_date=self.last_month)
+        self.create_expense(amount=Decimal('70.00'), entry_date=date(self.today.year - 1, 6, 1))
+        
+        monthly = self.create_budget()
+        self.assertEqual((monthly['paid'], monthly['pending'], monthly['consumed'], monthly['remaining']),
+                         ('100.00', '0.00', '100.00', '900.00'))
+        self.assertEqual(monthly['period_start'], str(self.today.replace(day=1)))
+        
+        yearly = self.create_budget(period='yearly', limit='5000.00')
+        expected = Decimal('100.00') + (Decimal('50.00') if self.last_month.year == self.today.year else 0)
+        self.assertEqual(Decimal(yearly['consumed']), expected)
+        self.assertConsistent()
+    
+    def test_counters_follow_expense_writes(self):
+        budget = self.create_budget()
+        other = Category.objects.create(name='Lazer', type='expense', created_by=self.user)
+        
+        expense = self.create_expense(amount=Decimal('200.00'))
+        self.assertEqual(self.usage(budget['id']), ('0.00', '200.00', '800.00'))
+        
+        expense.amount = Decimal('250.00')
+        expense.save()
+        expense.mark_as_paid()
+        self.assertEqual(self.usage(budget['id']), ('250.00', '0.00', '750.00'))
+        
+        # Mudar de mês ou de categoria tira o valor do período atual
+        expense.entry_date = self.last_month
+        expense.save()
+        self.assertEqual(self.usage(budget['id']), ('0.00', '0.00', '1000.00'))
+        expense.entry_date = self.today
+        expense.category = other
+        expense.save()
+        self.assertEqual(self.usage(budget['id']), ('0.00', '0.00', '1000.00'))
+        
+        self.create_expense(amount=Decimal('80.00')).delete()
+        self.create_expense(amount=Decimal('1200.00'))
+        self.assertEqual(self.usage(budget['id']), ('0.00', '1200.00', '-200.00'))
+        self.assertConsistent()
+    
+    def test_admin_bulk_status_change_moves_consumption(self):
+        budget = self.create_budget()
+        entries = [self.create_expense(amount=Decimal('10.00')) for _ in range(3)]
+        admin_user = User.objects.create_superuser(
+            username='root', email='root@example.com', password='senha-segura-123',
+            first_name='Root', last_name='Admin'
+        )
+        self.client.force_login(admin_user)
+        
+        self.client.post(reverse('admin:financial_expense_changelist'), {
+            'action': 'mark_as_paid',
+            '_selected_action': [entry.pk for entry in entries[:2]],
+        })
+        
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.usage(budget['id']), ('20.00', '10.00', '970.00'))
+        self.assertConsistent()
+    
+    def test_list_reads_only_the_counters(self):
+        for name in ('Farmácia', 'Transporte', 'Lazer'):
+            category = Category.objects.create(name=name, type='expense', created_by=self.user)
+            Budget.objects.create(category=category, limit=Decimal('500.00'), created_by=self.user)
+            self.create_expense(category=category, amount=Decimal('40.00'))
+        
+        with self.assertNumQueries(2) as queries:
+            response = self.client.get(self.url)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any('financial_expense' in query['sql'] for query in queries))
+        self.assertEqual([(item['category_name'], item['consumed']) for item in response.data['results']],
+                         [('Farmácia', '40.00'), ('Lazer', '40.00'), ('Transporte', '40.00')])
+    
+    def test_validates_category_and_duplicates(self):
+        self.create_budget()
+        response = self.client.post(self.url, {'category': self.expense_category.pk, 'limit': '10.00'},
+                                    format='json')
+        self.assertEqual(response.status_code, 400)
+        
+        response = self.client.post(self.url, {'category': self.income_category.pk, 'limit': '10.00'},
+                                    format='json')
+        self.assertIn('category', response.data)
+        
+        outsider = User.objects.create_user(username='bia', email='bia@example.com', password='senha-segura-123')
+        foreign = Category.objects.create(name='Outros', type='expense', created_by=outsider)
+        response = self.client.post(self.url, {'category': foreign.pk, 'limit': '10.00'}, format='json')
+        self.assertIn('category', response.data)
+        self.assertEqual(Budget.objects.count(), 1)
+    
+    def test_reconcile_command_repairs_drift(self):
+        budget = self.create_budget()
+        self.create_expense(amount=Decimal('300.00'))
+        BudgetUsage.objects.update(pending=Decimal('1.00'))
+        Expense.objects.filter(pk=self.create_expense(amount=Decimal('5.00')).pk).update(status='paid')
+        
+        with self.assertRaises(CommandError):
+            call_command('reconcile_budgets', dry_run=True, stdout=StringIO())
+        
+        out = StringIO()
+        call_command('reconcile_budgets', stdout=out)
+        self.assertIn('1 divergências corrigidas', out.getvalue())
+        self.assertEqual(self.usage(budget['id']), ('5.00', '300.00', '695.00'))
+        self.assertConsistent()
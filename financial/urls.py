@@ -5,8 +5,17 @@ from .views import (
     IncomeViewSet,
     ExpenseViewSet,
     CashFlowViewSet,
+    BudgetViewSet,
     FinancialMetricsView,
     FuturePlanningView,
+    ScenarioPlanningView,
+    TimeSeriesView,
+    BreakdownView,
+    DebtView,
+    MonthCloseView,
+    ChangeFeedView,
+    DashboardView,
+    EventStreamView,
     quick_entry
 )
 
@@ -18,6 +27,7 @@ router.register(r'categories', CategoryViewSet, basename='category')
 router.register(r'incomes', IncomeViewSet, basename='income')
 router.register(r'expenses', ExpenseViewSet, basename='expense')
 router.register(r'cashflow', CashFlowViewSet, basename='cashflow')
+router.register(r'budgets', BudgetViewSet, basename='budget')
 
 urlpatterns = [
     # URLs dos ViewSets
@@ -26,6 +36,15 @@ urlpatterns = [
     # Endpoints especializados
     path('metrics/', FinancialMetricsView.as_view(), name='metrics'),
     path('planning/', FuturePlanningView.as_view(), name='planning'),
+    path('planning/scenarios/', ScenarioPlanningView.as_view(), name='planning-scenarios'),
+    path('timeseries/', TimeSeriesView.as_view(), name='timeseries'),
+    path('breakdown/', BreakdownView.as_view(), name='breakdown'),
+    path('debt/', DebtView.as_view(), name='debt'),
+    path('closes/', MonthCloseView.as_view(), name='closes'),
+    path('closes/<int:year>/<int:month>/', MonthCloseView.as_view(), name='close-detail'),
+    path('changes/', ChangeFeedView.as_view(), name='changes'),
+    path('dashboard/', DashboardView.as_view(), name='dashboard'),
+    path('events/', EventStreamView.as_view(), name='events'),
     path('quick-entry/', quick_entry, name='quick_entry'),
 ]
 
@@ -1,34 +1,80 @@
-from rest_framework import viewsets, status, permissions, filters
+from rest_framework import viewsets, status, permissions, filters, renderers
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.db.models import Q, Sum, Count
-from django.db.models.functions import Coalesce
+from django.db.models import F, Q, Sum, Count, Max, prefetch_related_objects
+from django.db.models.functions import Coalesce, TruncMonth, TruncWeek, TruncDay
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.db import transaction
 from django.utils import timezone
 from datetime import date, timedelta
-from dateutil.relativedelta import relativedelta
 from decimal import Decimal
 import calendar
+import json
 
-from .models import Category, Income, Expense, CashFlow, FinancialSummary
+from authentication.authentication import QueryStringJWTAuthentication
+
+from . import archive, budgets, columnar, currency, dashboard, debts, events, ledger, periods, rollups, scenarios, sync
+from .models import (
+    Category, BaseFinancialEntry, Income, Expense, ArchivedIncome, ArchivedExpense, CashFlow, FinancialSummary,
+    MonthClose, Budget
+)
+from .filters import FullTextSearchFilter
+from .metrics import current_metrics
 from .serializers import (
     CategorySerializer,
     IncomeSerializer,
     ExpenseSerializer,
     CashFlowSerializer,
+    BudgetSerializer,
     FinancialSummarySerializer,
     FinancialMetricsSerializer,
     FuturePlanningSerializer,
-    QuickEntrySerializer
+    QuickEntrySerializer,
+    TimeSeriesQuerySerializer,
+    TimeSeriesBucketSerializer,
+    BreakdownQuerySerializer,
+    BreakdownItemSerializer,
+    MonthCloseRequestSerializer,
+    MonthCloseSerializer,
+    ScenarioRequestSerializer,
+    ScenarioResultSerializer,
+    DebtSerializer,
+    ChangesQuerySerializer,
+    ChangeFeedSerializer,
+    DashboardQuerySerializer,
+    DashboardSerializer
 )
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class SparseFieldsetViewMixin:
+    """
+    Poda o queryset de leitura para os campos pedidos com `?fields=` / `?omit=`:
+    carrega só as colunas usadas (`only`) e faz join apenas com as relações lidas.
+    """
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method not in permissions.SAFE_METHODS:
+            return queryset
+        
+        serializer = self.get_serializer()
+        if not getattr(serializer, 'is_sparse', False):
+            return queryset
+        columns, relations = serializer.model_columns()
+        queryset = queryset.select_related(None)
+        if relations:
+            queryset = queryset.select_related(*relations)
+        return queryset.only(*columns)
+
+
+class CategoryViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
     ViewSet para gerenciamento de categorias.
     """
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 3
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name']
     ordering_fields = ['name', 'type', 'created_at']
@@ -36,10 +82,9 @@ class CategoryViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         user = self.request.user
-        shared_users = user.get_shared_users()
         
         queryset = Category.objects.filter(
-            Q(created_by__in=shared_users) | Q(is_default=True)
+            Q(household_id=user.household_id) | Q(is_default=True)
         ).distinct()
         
         # Filtro por tipo
@@ -64,22 +109,25 @@ class CategoryViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class IncomeViewSet(viewsets.ModelViewSet):
+class ArchivedEntriesMixin:
     """
-    ViewSet para gerenciamento de receitas.
+    Consulta e listagem compartilhadas por receitas e despesas.
+    
+    A listagem inclui os lançamentos arquivados (UNION ALL com a tabela de arquivo,
+    mesmos filtros e ordenação) apenas quando o período pedido alcança a data até
+    onde o grupo familiar foi arquivado; caso contrário lê só a tabela principal.
     """
-    serializer_class = IncomeSerializer
-    permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['description', 'category__name']
-    ordering_fields = ['entry_date', 'amount', 'due_day', 'created_at']
-    ordering = ['-entry_date', '-created_at']
+    entry_model = None
+    archive_model = None
     
     def get_queryset(self):
-        user = self.request.user
-        shared_users = user.get_shared_users()
-        
-        queryset = Income.objects.filter(created_by__in=shared_users).select_related('category', 'created_by')
+        return self.filter_entries(self.entry_model.objects.select_related('category', 'created_by'))
+    
+    def get_archive_queryset(self):
+        return self.filter_entries(self.archive_model.objects.all())
+    
+    def filter_entries(self, queryset):
+        queryset = queryset.filter(household_id=self.request.user.household_id)
         
         # Filtros
         entry_type = self.request.query_params.get('entry_type')
@@ -108,6 +156,44 @@ class IncomeViewSet(viewsets.ModelViewSet):
         
         return queryset
     
+    def list(self, request, *args, **kwargs):
+        if not archive.reaches_archive(request.user.household, request.query_params.get('start_date')):
+            return super().list(request, *args, **kwargs)
+        
+        queryset = archive.combine(
+            self.filter_queryset(self.get_queryset()),
+            self.filter_queryset(self.get_archive_queryset())
+        )
+        page = self.paginate_queryset(queryset)
+        entries = archive.as_instances(self.entry_model, page if page is not None else queryset)
+        serializer = self.get_serializer(entries, many=True)
+        if not serializer.child.is_sparse or 'category' in serializer.child.model_columns()[1]:
+            prefetch_related_objects(entries, 'category')
+        
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
+
+class IncomeViewSet(SparseFieldsetViewMixin, ArchivedEntriesMixin, viewsets.ModelViewSet):
+    """
+    ViewSet para gerenciamento de receitas.
+    """
+    serializer_class = IncomeSerializer
+    entry_model = Income
+    archive_model = ArchivedIncome
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = 3
+    filter_backends = [filters.OrderingFilter, FullTextSearchFilter]
+    search_fields = ['description', 'category__name']
+    ordering_fields = ['entry_date', 'amount', 'due_day', 'created_at']
+    ordering = ['-entry_date', '-created_at']
+    
+    def perform_destroy(self, instance):
+        # Verifica antes de abrir a transação da exclusão
+        periods.check_entry_open(instance)
+        instance.delete()
+    
     @action(detail=True, methods=['post'])
     def mark_paid(self, request, pk=None):
         """Marca uma receita como paga."""
@@ -132,49 +218,24 @@ class IncomeViewSet(viewsets.ModelViewSet):
         })
 
 
-class ExpenseViewSet(viewsets.ModelViewSet):
+class ExpenseViewSet(SparseFieldsetViewMixin, ArchivedEntriesMixin, viewsets.ModelViewSet):
     """
     ViewSet para gerenciamento de despesas.
     """
     serializer_class = ExpenseSerializer
+    entry_model = Expense
+    archive_model = ArchivedExpense
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    query_budget = 3
+    filter_backends = [filters.OrderingFilter, FullTextSearchFilter]
     search_fields = ['description', 'category__name']
     ordering_fields = ['entry_date', 'amount', 'due_day', 'created_at']
     ordering = ['-entry_date', '-created_at']
     
-    def get_queryset(self):
-        user = self.request.user
-        shared_users = user.get_shared_users()
-        
-        queryset = Expense.objects.filter(created_by__in=shared_users).select_related('category', 'created_by')
-        
-        # Filtros (mesma lógica do IncomeViewSet)
-        entry_type = self.request.query_params.get('entry_type')
-        if entry_type:
-            queryset = queryset.filter(entry_type=entry_type)
-        
-        status_filter = self.request.query_params.get('status')
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-        
-        responsible = self.request.query_params.get('responsible')
-        if responsible:
-            queryset = queryset.filter(responsible=responsible)
-        
-        category = self.request.query_params.get('category')
-        if category:
-            queryset = queryset.filter(category_id=category)
-        
-        # Filtro por data
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
-        if start_date:
-            queryset = queryset.filter(entry_date__gte=start_date)
-        if end_date:
-            queryset = queryset.filter(entry_date__lte=end_date)
-        
-        return queryset
+    def perform_destroy(self, instance):
+        # Verifica antes de abrir a transação da exclusão
+        periods.check_entry_open(instance)
+        instance.delete()
     
     @action(detail=True, methods=['post'])
     def mark_paid(self, request, pk=None):
@@ -211,12 +272,13 @@ class ExpenseViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class CashFlowViewSet(viewsets.ModelViewSet):
+class CashFlowViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
     ViewSet para gerenciamento de fluxo de caixa.
     """
     serializer_class = CashFlowSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 3
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['description']
     ordering_fields = ['date', 'amount', 'created_at']
@@ -224,9 +286,8 @@ class CashFlowViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         user = self.request.user
-        shared_users = user.get_shared_users()
         
-        queryset = CashFlow.objects.filter(created_by__in=shared_users)
+        queryset = CashFlow.objects.filter(household_id=user.household_id)
         
         # Filtros
         flow_type = self.request.query_params.get('flow_type')
@@ -248,104 +309,49 @@ class CashFlowViewSet(viewsets.ModelViewSet):
         return queryset
 
 
+class BudgetViewSet(viewsets.ModelViewSet):
+    """
+    ViewSet para orçamentos por categoria do grupo familiar.
+    
+    Limite, consumo (pago e em aberto) e saldo restante do período atual de cada
+    orçamento saem dos contadores de consumo, em uma consulta, sem somar despesas.
+    """
+    serializer_class = BudgetSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = 2
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['limit', 'consumed', 'remaining', 'created_at']
+    ordering = ['category__name', 'period']
+    
+    def get_queryset(self):
+        queryset = Budget.objects.filter(household_id=self.request.user.household_id).select_related('category')
+        
+        period = self.request.query_params.get('period')
+        if period:
+            queryset = queryset.filter(period=period)
+        
+        return budgets.with_usage(queryset)
+    
+    def perform_create(self, serializer):
+        serializer.save()
+        # Recarrega com o consumo já calculado para a resposta
+        serializer.instance = self.get_queryset().get(pk=serializer.instance.pk)
+    
+    def perform_update(self, serializer):
+        serializer.save()
+        serializer.instance = self.get_queryset().get(pk=serializer.instance.pk)
+
+
 class FinancialMetricsView(APIView):
     """
     View para métricas financeiras do mês atual.
     """
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 3
     
     def get(self, request):
         user = request.user
-        shared_users = user.get_shared_users()
-        today = date.today()
-        
-        # Saldo atual em caixa
-        cash_flow_total = CashFlow.objects.filter(
-            created_by__in=shared_users
-        ).aggregate(
-            total=Coalesce(Sum('amount'), Decimal('0'))
-        )['total']
-        
-        # Receitas pagas no mês atual
-        income_paid = Income.objects.filter(
-            created_by__in=shared_users,
-            status='paid',
-            paid_date__year=today.year,
-            paid_date__month=today.month
-        ).aggregate(
-            total=Coalesce(Sum('amount'), Decimal('0'))
-        )['total']
-        
-        # Despesas pagas no mês atual
-        expenses_paid = Expense.objects.filter(
-            created_by__in=shared_users,
-            status='paid',
-            paid_date__year=today.year,
-            paid_date__month=today.month
-        ).aggregate(
-            total=Coalesce(Sum('amount'), Decimal('0'))
-        )['total']
-        
-        # Saldo atual considerando movimentações
-        current_balance = cash_flow_total + income_paid - expenses_paid
-        
-        # Despesas fixas do mês
-        fixed_expenses = Expense.objects.filter(
-            created_by__in=shared_users,
-            entry_type='fixed'
-        ).aggregate(
-            total=Coalesce(Sum('amount'), Decimal('0'))
-        )['total']
-        
-        # Total de endividamento (parcelas pendentes)
-        total_debt = Expense.objects.filter(
-            created_by__in=shared_users,
-            entry_type='installment',
-            status='pending'
-        ).aggregate(
-            total=Coalesce(Sum('amount'), Decimal('0'))
-        )['total']
-        
-        # Receitas do mês
-        monthly_income = Income.objects.filter(
-            created_by__in=shared_users,
-            entry_type__in=['fixed', 'single'],
-            start_date__year=today.year,
-            start_date__month=today.month
-        ).aggregate(
-            total=Coalesce(Sum('amount'), Decimal('0'))
-        )['total']
-        
-        # Valores pendentes e atrasados
-        pending_amount = Expense.objects.filter(
-            created_by__in=shared_users,
-            status='pending'
-        ).aggregate(
-            total=Coalesce(Sum('amount'), Decimal('0'))
-        )['total']
-        
-        overdue_expenses = Expense.objects.filter(
-            created_by__in=shared_users,
-            status='pending',
-            start_date__lt=today
-        )
-        
-        overdue_amount = overdue_expenses.aggregate(
-            total=Coalesce(Sum('amount'), Decimal('0'))
-        )['total']
-        
-        overdue_count = overdue_expenses.count()
-        
-        metrics = {
-            'current_balance': current_balance,
-            'monthly_fixed_expenses': fixed_expenses,
-            'total_debt': total_debt,
-            'monthly_income': monthly_income,
-            'paid_amount': expenses_paid,
-            'pending_amount': pending_amount,
-            'overdue_amount': overdue_amount,
-            'overdue_count': overdue_count,
-        }
+        metrics = current_metrics(user.household_id)
         
         serializer = FinancialMetricsSerializer(metrics)
         return Response(serializer.data)
@@ -354,110 +360,476 @@ class FinancialMetricsView(APIView):
 class FuturePlanningView(APIView):
     """
     View para planejamento futuro (próximos meses).
+    
+    Receitas e despesas são carregadas uma única vez em colunas de centavos (motor
+    colunar) e todos os meses são projetados em memória, sem uma consulta por mês.
     """
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 3
     
     def get(self, request):
         user = request.user
-        shared_users = user.get_shared_users()
         
         # Número de meses para projetar (padrão: 4)
         months_ahead = int(request.query_params.get('months', 4))
         
-        planning_data = []
         current_date = date.today().replace(day=1)  # Primeiro dia do mês atual
         
-        # Saldo inicial (saldo atual)
-        cash_flow_total = CashFlow.objects.filter(
-            created_by__in=shared_users
-        ).aggregate(
-            total=Coalesce(Sum('amount'), Decimal('0'))
-        )['total']
-        
-        accumulated_balance = cash_flow_total
-        
-        for i in range(months_ahead):
-            month_date = current_date + relativedelta(months=i)
-            year = month_date.year
-            month = month_date.month
-            month_name = calendar.month_name[month]
-            
-            # Receitas fixas
-            fixed_income = Income.objects.filter(
-                created_by__in=shared_users,
-                entry_type='fixed'
-            ).aggregate(
-                total=Coalesce(Sum('amount'), Decimal('0'))
-            )['total']
-            
-            # Receitas únicas do mês
-            single_income = Income.objects.filter(
-                created_by__in=shared_users,
-                entry_type='single',
-                start_date__year=year,
-                start_date__month=month
-            ).aggregate(
-                total=Coalesce(Sum('amount'), Decimal('0'))
-            )['total']
-            
-            # Receitas parceladas do mês
-            installment_income = Income.objects.filter(
-                created_by__in=shared_users,
-                entry_type='installment',
-                start_date__lte=month_date
-            ).aggregate(
-                total=Coalesce(Sum('amount'), Decimal('0'))
-            )['total']
-            
-            total_income = fixed_income + single_income + installment_income
-            
-            # Despesas fixas
-            fixed_expenses = Expense.objects.filter(
-                created_by__in=shared_users,
-                entry_type='fixed'
-            ).aggregate(
-                total=Coalesce(Sum('amount'), Decimal('0'))
-            )['total']
-            
-            # Despesas parceladas do mês
-            installment_expenses = Expense.objects.filter(
-                created_by__in=shared_users,
-                entry_type='installment',
-                start_date__lte=month_date
-            ).aggregate(
-                total=Coalesce(Sum('amount'), Decimal('0'))
-            )['total']
-            
-            # Despesas únicas do mês
-            single_expenses = Expense.objects.filter(
-                created_by__in=shared_users,
-                entry_type='single',
-                start_date__year=year,
-                start_date__month=month
-            ).aggregate(
-                total=Coalesce(Sum('amount'), Decimal('0'))
-            )['total']
-            
-            total_expenses = fixed_expenses + installment_expenses + single_expenses
-            estimated_balance = total_income - total_expenses
-            accumulated_balance += estimated_balance
-            
-            planning_data.append({
-                'year': year,
-                'month': month,
-                'month_name': month_name,
-                'total_income': total_income,
-                'fixed_expenses': fixed_expenses,
-                'installment_expenses': installment_expenses,
-                'total_expenses': total_expenses,
-                'estimated_balance': estimated_balance,
-                'accumulated_balance': accumulated_balance,
-            })
+        # Saldo inicial: saldo no fim do mês anterior, lido do razão de saldos
+        opening_balance = ledger.balance_as_of(user.household_id, current_date - timedelta(days=1))
+        
+        incomes = columnar.EntryColumns.from_queryset(Income.objects.filter(household_id=user.household_id))
+        expenses = columnar.EntryColumns.from_queryset(Expense.objects.filter(household_id=user.household_id))
+        
+        planning_data = columnar.project_months(
+            incomes, expenses, current_date, months_ahead, columnar.to_cents(opening_balance)
+        )
+        for month in planning_data:
+            month['month_name'] = calendar.month_name[month['month']]
         
         serializer = FuturePlanningSerializer(planning_data, many=True)
         return Response(serializer.data)
 
 
+class ScenarioPlanningView(APIView):
+    """
+    View para simulação de cenários sobre o planejamento futuro.
+    
+    Recebe vários cenários (lançamentos adicionados, removidos ou com valor alterado),
+    carrega os lançamentos uma única vez e projeta cada cenário sobre essa mesma base,
+    sem alterar dados reais. Lotes grandes são distribuídos em um pool de processos.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = 3
+    
+    def post(self, request):
+        serializer = ScenarioRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        months = serializer.validated_data['months']
+        
+        household_id = request.user.household_id
+        first_month = date.today().replace(day=1)
+        opening_balance = columnar.to_cents(
+            ledger.balance_as_of(household_id, first_month - timedelta(days=1))
+        )
+        incomes = columnar.EntryColumns.from_queryset(Income.objects.filter(household_id=household_id))
+        expenses = columnar.EntryColumns.from_queryset(Expense.objects.filter(household_id=household_id))
+        
+        known_ids = {'income': set(incomes.id), 'expense': set(expenses.id)}
+        try:
+            batch = [
+                self.build_scenario(scenario, first_month, known_ids)
+                for scenario in serializer.validated_data['scenarios']
+            ]
+        except ValueError as error:
+            return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        baseline = scenarios.evaluate(
+            incomes, expenses, self.build_scenario({'name': 'baseline'}, first_month, known_ids),
+            first_month, months, opening_balance
+        )
+        results = scenarios.evaluate_batch(
+            incomes, expenses, batch, first_month, months, opening_balance,
+            workers=settings.PLANNING_SCENARIO_WORKERS,
+            pool_threshold=settings.PLANNING_SCENARIO_POOL_THRESHOLD
+        )
+        
+        return Response({
+            'months': months,
+            'baseline': ScenarioResultSerializer(baseline).data,
+            'scenarios': ScenarioResultSerializer(results, many=True).data,
+        })
+    
+    def build_scenario(self, data, first_month, known_ids):
+        """Converte o cenário validado em estruturas simples, com valores em centavos."""
+        scenario = {
+            'name': data['name'],
+            'remove': {'income': set(), 'expense': set()},
+            'amounts': {'income': {}, 'expense': {}},
+            'add': [],
+        }
+        for key in ('remove', 'change'):
+            for item in data.get(key, []):
+                if item['id'] not in known_ids[item['type']]:
+                    raise ValueError(f"Cenário '{data['name']}': lançamento {item['id']} não encontrado.")
+                if key == 'remove':
+                    scenario['remove'][item['type']].add(item['id'])
+                else:
+                    scenario['amounts'][item['type']][item['id']] = columnar.to_cents(item['amount'])
+        
+        for entry in data.get('add', []):
+            scenario['add'].append({
+                'kind': entry['type'],
+                'amount': columnar.to_cents(entry['amount']),
+                'entry_type': entry['entry_type'],
+                'start_date': entry.get('start_date') or first_month,
+                'total_installments': entry.get('total_installments'),
+            })
+        return scenario
+
+
+class TimeSeriesView(APIView):
+    """
+    View para séries temporais de receitas e despesas (mensal, semanal ou diária).
+    
+    Cada tabela é agregada em uma única consulta (Trunc + values + annotate) sobre a
+    data do lançamento; períodos sem lançamentos são preenchidos com zero.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = 2
+    
+    TRUNC_FUNCTIONS = {
+        'month': TruncMonth,
+        'week': TruncWeek,
+        'day': TruncDay,
+    }
+    
+    GROUP_FIELDS = {
+        'category': ('category_id', 'category__name'),
+        'responsible': ('responsible', None),
+        'entry_type': ('entry_type', None),
+    }
+    
+    def get(self, request):
+        query_serializer = TimeSeriesQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        params = query_serializer.validated_data
+        
+        interval = params['interval']
+        group = params.get('group')
+        end = params.get('to') or date.today()
+        start = params.get('from') or columnar.add_months(end, -11)
+        
+        periods = self.get_periods(start, end, interval)
+        if len(periods) > TimeSeriesQuerySerializer.MAX_BUCKETS:
+            return Response(
+                {'error': f'Intervalo muito longo: máximo de {TimeSeriesQuerySerializer.MAX_BUCKETS} períodos.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        incomes = self.aggregate(Income, request.user, start, end, interval, group)
+        expenses = self.aggregate(Expense, request.user, start, end, interval, group)
+        
+        buckets = [
+            {
+                'period': period,
+                'incomes': incomes.get(period, self.empty_value(group)),
+                'expenses': expenses.get(period, self.empty_value(group)),
+            }
+            for period in periods
+        ]
+        
+        return Response({
+            'from': start,
+            'to': end,
+            'interval': interval,
+            'group': group,
+            'buckets': TimeSeriesBucketSerializer(buckets, many=True).data,
+        })
+    
+    def get_periods(self, start, end, interval):
+        """Gera o início de cada período entre as datas, incluindo os vazios."""
+        if interval == 'month':
+            return [
+                columnar.month_from_index(index)
+                for index in range(columnar.month_index(start), columnar.month_index(end) + 1)
+            ]
+        if interval == 'week':
+            current, step = start - timedelta(days=start.weekday()), timedelta(weeks=1)
+        else:
+            current, step = start, timedelta(days=1)
+        
+        periods = []
+        while current <= end:
+            periods.append(current)
+            current += step
+        return periods
+    
+    def empty_value(self, group):
+        value = {'total': Decimal('0'), 'count': 0}
+        if group:
+            value['groups'] = []
+        return value
+    
+    def aggregate(self, model, user, start, end, interval, group):
+        """
+        Agrega a tabela por período (e grupo) em uma única consulta.
+        Retorna {período: {'total', 'count', 'groups'}}.
+        
+        Na série mensal, os meses fechados inteiramente contidos no intervalo vêm dos
+        totais congelados (MonthSnapshot), unidos na mesma consulta; os lançamentos
+        só são lidos para os meses abertos.
+        """
+        values = ['period']
+        ordering = ['period']
+        key_field = label_field = None
+        if group:
+            key_field, label_field = self.GROUP_FIELDS[group]
+            values.append(key_field)
+            if label_field:
+                values.append(label_field)
+            ordering.append(label_field or key_field)
+        
+        queryset = model.objects.filter(
+            household_id=user.household_id,
+            entry_date__gte=start,
+            entry_date__lte=end
+        )
+        closed_range = periods.full_months(start, end) if interval == 'month' else None
+        if closed_range:
+            queryset = queryset.filter(~periods.closed_month_exists(start=closed_range[0], end=closed_range[1]))
+        
+        rows = queryset.annotate(
+            period=self.TRUNC_FUNCTIONS[interval]('entry_date')
+        ).values(*values).annotate(
+            sum=Sum(currency.converted()),
+            entries=Count('id')
+        ).order_by()
+        
+        if closed_range:
+            snapshots = periods.snapshot_rows(
+                user.household_id, model._meta.model_name, *closed_range
+            ).annotate(
+                period=F('close__month')
+            ).values(*values).annotate(
+                sum=Sum('total'),
+                entries=Sum('count')
+            ).order_by()
+            rows = rows.union(snapshots, all=True)
+        
+        choices = dict(model._meta.get_field(key_field).choices or []) if group and not label_field else {}
+        
+        result = {}
+        for row in rows.order_by(*ordering):
+            bucket = result.setdefault(row['period'], self.empty_value(group))
+            bucket['total'] += row['sum']
+            bucket['count'] += row['entries']
+            if group:
+                key = row[key_field]
+                groups = bucket.setdefault('_by_key', {})
+                if key not in groups:
+                    groups[key] = {
+                        'key': key,
+                        'label': row[label_field] if label_field else choices.get(key, key),
+                        'total': Decimal('0'),
+                        'count': 0,
+                    }
+                    bucket['groups'].append(groups[key])
+                groups[key]['total'] += row['sum']
+                groups[key]['count'] += row['entries']
+        
+        for bucket in result.values():
+            bucket.pop('_by_key', None)
+        return result
+
+
+class BreakdownView(APIView):
+    """
+    View para a distribuição de receitas e despesas em um período (ex.: últimos 30/90/365 dias).
+    
+    Lê apenas os agregados diários (DailyRollup), sem varrer as tabelas de lançamentos.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = 1
+    
+    def get(self, request):
+        query_serializer = BreakdownQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        params = query_serializer.validated_data
+        
+        end = params.get('to') or date.today()
+        if params.get('from'):
+            start = params['from']
+        else:
+            start = end - timedelta(days=params.get('days', 30) - 1)
+        group = params['group']
+        
+        labels = {
+            'responsible': dict(BaseFinancialEntry.RESPONSIBLE_CHOICES),
+            'status': dict(BaseFinancialEntry.STATUS_CHOICES),
+        }.get(group, {})
+        group_field = 'category_id' if group == 'category' else group
+        
+        items = []
+        for row in rollups.breakdown(request.user.household_id, start, end, params.get('kind'), group):
+            key = row[group_field]
+            items.append({
+                'kind': row['kind'],
+                'key': key,
+                'label': row['category__name'] if group == 'category' else labels.get(key, key),
+                'color': row.get('category__color'),
+                'total': row['sum'],
+                'count': row['entries'],
+            })
+        
+        return Response({
+            'from': start,
+            'to': end,
+            'group': group,
+            'items': BreakdownItemSerializer(items, many=True).data,
+        })
+
+
+class DebtView(APIView):
+    """
+    View para as dívidas parceladas: saldo devedor, parcelas restantes e cronograma
+    de quitação mês a mês, calculados em uma única passada sobre os parcelados.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = 1
+    
+    def get(self, request):
+        rows = debts.installment_debts(request.user.household_id)
+        return Response(DebtSerializer(debts.compute_debts(rows)).data)
+
+
+class ChangeFeedView(APIView):
+    """
+    View para o feed de alterações (sincronização incremental).
+    
+    Retorna as categorias, receitas, despesas e movimentações de caixa do grupo
+    familiar criadas, alteradas ou excluídas depois do cursor `since`, e o novo
+    cursor. Com `has_more` o cliente repete a chamada a partir do cursor devolvido.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = 5
+    
+    def get(self, request):
+        serializer = ChangesQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        
+        feed = sync.changes_since(
+            request.user.household_id,
+            since=serializer.validated_data['since'],
+            limit=serializer.validated_data['limit']
+        )
+        return Response(ChangeFeedSerializer(feed, context={'request': request}).data)
+
+
+class DashboardView(APIView):
+    """
+    View para o painel: métricas, linha do mês no planejamento, despesas vencidas
+    por categoria, distribuição do mês e lançamentos recentes em uma resposta.
+    
+    Cada tabela é varrida uma única vez com todos os agregados condicionais (ver
+    `dashboard`); `recent` define quantos lançamentos recentes retornar.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = 4
+    
+    def get(self, request):
+        serializer = DashboardQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        
+        user = request.user
+        data = dashboard.build_dashboard(user.household_id, recent=serializer.validated_data['recent'])
+        data['planning']['month_name'] = calendar.month_name[data['planning']['month']]
+        return Response(DashboardSerializer(data).data)
+
+
+class EventStreamRenderer(renderers.BaseRenderer):
+    """
+    Renderer de `text/event-stream`, para a negociação de conteúdo aceitar o
+    EventSource; respostas de erro saem como JSON.
+    """
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data)
+
+
+class EventStreamView(APIView):
+    """
+    View para o stream de eventos do grupo familiar (Server-Sent Events).
+    
+    Mantém a conexão aberta e envia um evento compacto a cada gravação de categoria,
+    receita, despesa ou movimentação de caixa por qualquer membro do grupo, com o
+    cursor do feed de alterações. `?metrics=1` inclui as métricas do mês já
+    recalculadas. Requer um servidor ASGI (ex.: `uvicorn backend.asgi:application`).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    authentication_classes = [QueryStringJWTAuthentication]
+    renderer_classes = [EventStreamRenderer, renderers.JSONRenderer]
+    query_budget = 1
+    
+    def get(self, request):
+        try:
+            last_event_id = int(request.headers.get('Last-Event-ID', ''))
+        except ValueError:
+            last_event_id = None
+        
+        response = StreamingHttpResponse(
+            events.stream(
+                request.user.household_id,
+                last_event_id=last_event_id,
+                with_metrics=request.query_params.get('metrics') in ('1', 'true')
+            ),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Desativa o buffer de proxies (nginx) para entregar cada evento na hora
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+class MonthCloseView(APIView):
+    """
+    View para fechamento de meses.
+    
+    GET lista os meses fechados com os totais congelados; POST fecha um mês para
+    todos os membros do grupo familiar. Lançamentos de meses fechados não podem ser
+    alterados até a reabertura (DELETE em closes/<ano>/<mês>/).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request):
+        zero = Decimal('0')
+        closes = MonthClose.objects.filter(
+            household_id=request.user.household_id
+        ).values('month').annotate(
+            closed_at=Max('closed_at'),
+            total_income=Coalesce(Sum('snapshots__total', filter=Q(snapshots__kind='income')), zero),
+            total_expenses=Coalesce(Sum('snapshots__total', filter=Q(snapshots__kind='expense')), zero),
+            entries=Coalesce(Sum('snapshots__count'), 0)
+        ).order_by('-month')
+        
+        return Response(MonthCloseSerializer(closes, many=True).data)
+    
+    def post(self, request):
+        serializer = MonthCloseRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        month = serializer.validated_data['date']
+        
+        closes = periods.close_month(request.user.household_id, month, closed_by=request.user)
+        if not closes:
+            return Response({'error': 'Este mês já está fechado.'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'message': f'Mês {month:%m/%Y} fechado com sucesso!',
+            'year': month.year,
+            'month': month.month,
+        }, status=status.HTTP_201_CREATED)
+    
+    def delete(self, request, year, month):
+        """Reabre o mês, liberando a edição dos lançamentos."""
+        try:
+            month_date = date(year, month, 1)
+        except ValueError:
+            return Response({'error': 'Mês inválido.'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        household_id = request.user.household_id
+        with transaction.atomic():
+            # Lançamentos arquivados do mês voltam às tabelas principais antes da reabertura
+            archive.restore_entries(
+                household_id=household_id, start=month_date, end=columnar.add_months(month_date, 1) - timedelta(days=1)
+            )
+            if not periods.reopen_month(household_id, month_date):
+                return Response({'error': 'Este mês não está fechado.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def quick_entry(request):
@@ -476,6 +848,7 @@ def quick_entry(request):
         entry_data = {
             'description': data['description'],
             'amount': data['amount'],
+            'currency': data['currency'],
             'category': category,
             'responsible': data['responsible'],
             'due_day': data['due_day'],
@@ -0,0 +1,39 @@
+from django.conf import settings
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Levantada quando uma view executa mais consultas SQL do que o orçamento declarado.
+    """
+    pass
+
+
+def query_budget(limit):
+    """
+    Decorator para declarar o orçamento de consultas de views baseadas em função.
+    
+    Deve ser aplicado por cima de @api_view, para marcar a view final.
+    Em views baseadas em classe, basta declarar o atributo `query_budget`.
+    """
+    def decorator(view_func):
+        view_func.query_budget = limit
+        return view_func
+    return decorator
+
+
+def get_query_budget(view_func):
+    """
+    Retorna o orçamento de consultas declarado para a view, ou None se não houver.
+    """
+    budget = getattr(view_func, 'query_budget', None)
+    if budget is not None:
+        return budget
+    
+    # ViewSets e APIViews expõem a classe original em `cls` ou `view_class`
+    view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    return getattr(view_class, 'query_budget', None)
+
+
+def is_strict():
+    """Indica se orçamentos estourados devem falhar a requisição (usado nos testes)."""
+    return getattr(settings, 'QUERY_BUDGET_STRICT', False)
@@ -0,0 +1,55 @@
+import io
+import pstats
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from monitoring.profiling import get_profile_dir, list_profiles
+
+
+class Command(BaseCommand):
+    """
+    Lista os perfis gravados pelo ProfilingMiddleware e resume as funções mais custosas.
+    """
+    help = 'Lista perfis .prof gravados e mostra as funções com maior tempo cumulativo.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('name', nargs='?', help='Arquivo de perfil a resumir (padrão: apenas listar).')
+        parser.add_argument('--latest', action='store_true', help='Resume o perfil mais recente.')
+        parser.add_argument('--limit', type=int, default=25, help='Número de funções exibidas no resumo.')
+        parser.add_argument('--sort', default='cumulative', help='Critério de ordenação do pstats.')
+    
+    def handle(self, *args, **options):
+        profiles = list_profiles()
+        name = options['name']
+        
+        if options['latest']:
+            if not profiles:
+                raise CommandError('Nenhum perfil encontrado.')
+            name = profiles[0].name
+        
+        if not name:
+            self.list(profiles)
+            return
+        
+        path = get_profile_dir() / name
+        if not path.is_file():
+            raise CommandError(f'Perfil "{name}" não encontrado em {get_profile_dir()}.')
+        self.summarize(path, options['sort'], options['limit'])
+    
+    def list(self, profiles):
+        if not profiles:
+            self.stdout.write('Nenhum perfil encontrado.')
+            return
+        
+        for path in profiles:
+            stat = path.stat()
+            modified = datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
+            self.stdout.write(f'{modified}  {stat.st_size / 1024:8.1f} KB  {path.name}')
+    
+    def summarize(self, path, sort, limit):
+        stream = io.StringIO()
+        stats = pstats.Stats(str(path), stream=stream)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        self.stdout.write(f'Perfil: {path.name}')
+        self.stdout.write(stream.getvalue())
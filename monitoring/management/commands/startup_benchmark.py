@@ -0,0 +1,88 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from monitoring.startup import HEAVY_MODULES, parse_importtime
+
+# Executado em um processo novo: simula o boot de um worker e mede o warm-up à parte
+BOOT_SCRIPT = '''
+import json, sys, time
+started = time.perf_counter()
+from {module} import {attribute}
+booted = time.perf_counter()
+from monitoring.startup import warm_up
+views, serializers = warm_up()
+print(json.dumps({{
+    "boot_ms": (booted - started) * 1000,
+    "warmup_ms": (time.perf_counter() - booted) * 1000,
+    "views": views,
+    "serializers": serializers,
+}}))
+'''
+
+
+class Command(BaseCommand):
+    """
+    Mede a inicialização de um worker em um processo novo com `-X importtime`:
+    custo de importação por pacote e por módulo, módulos pesados carregados no boot
+    e tempo do warm-up.
+    """
+    help = 'Mede o tempo de inicialização do worker e o custo de importação por módulo.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=15, help='Número de pacotes e módulos exibidos.')
+        parser.add_argument('--asgi', action='store_true', help='Mede a aplicação ASGI em vez da WSGI.')
+    
+    def handle(self, *args, **options):
+        target = 'backend.asgi.application' if options['asgi'] else settings.WSGI_APPLICATION
+        module, attribute = target.rsplit('.', 1)
+        
+        env = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'backend.settings'),
+            # O warm-up é medido separadamente, não dentro do import da aplicação
+            'STARTUP_WARMUP': 'False',
+        }
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT.format(module=module, attribute=attribute)],
+            capture_output=True, text=True, env=env, cwd=settings.BASE_DIR
+        )
+        if result.returncode != 0:
+            raise CommandError(f'Falha ao iniciar a aplicação:\n{result.stderr[-2000:]}')
+        
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+        rows = parse_importtime(result.stderr)
+        self.report(target, rows, timings, options['top'])
+    
+    def report(self, target, rows, timings, top):
+        by_package = defaultdict(int)
+        for name, own, _, _ in rows:
+            by_package[name.split('.')[0]] += own
+        total = sum(by_package.values())
+        
+        self.stdout.write(f'Aplicação: {target}')
+        self.stdout.write(f'Boot: {timings["boot_ms"]:.0f} ms ({len(rows)} módulos, {total / 1000:.0f} ms em imports)')
+        self.stdout.write(f'Warm-up: {timings["warmup_ms"]:.0f} ms '
+                          f'({timings["views"]} views, {timings["serializers"]} serializers)')
+        
+        self.stdout.write('')
+        self.stdout.write(f'{"pacote":<40}{"próprio (ms)":>14}{"%":>7}')
+        for package, own in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]:
+            self.stdout.write(f'{package:<40}{own / 1000:>14.1f}{own / total * 100 if total else 0:>7.1f}')
+        
+        self.stdout.write('')
+        self.stdout.write(f'{"módulo":<40}{"próprio (ms)":>14}{"cumulativo (ms)":>17}')
+        for name, own, cumulative, _ in sorted(rows, key=lambda row: row[2], reverse=True)[:top]:
+            self.stdout.write(f'{name:<40}{own / 1000:>14.1f}{cumulative / 1000:>17.1f}')
+        
+        self.stdout.write('')
+        loaded = sorted({name.split('.')[0] for name, *_ in rows} & set(HEAVY_MODULES))
+        if loaded:
+            self.stdout.write(self.style.WARNING(f'Módulos pesados carregados no boot: {", ".join(loaded)}'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Módulos pesados carregados no boot: nenhum'))
@@ -0,0 +1,299 @@
+import json
+import os
+import resource
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+
+PREFIX = 'gestor'
+
+# Limites (em segundos) dos buckets do histograma de latência
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+COUNTER_HELP = {
+    'http_requests_total': 'Total de requisições HTTP por view, método e status.',
+    'db_queries_total': 'Total de consultas SQL executadas por view.',
+    'db_query_seconds_total': 'Tempo total gasto no banco por view.',
+    'cache_requests_total': 'Acessos ao cache por resultado (hit/miss).',
+}
+
+HISTOGRAM_HELP = {
+    'http_request_duration_seconds': 'Latência das requisições HTTP por view.',
+}
+
+
+def get_metrics_dir():
+    """Retorna o diretório compartilhado entre os workers, criando-o se necessário."""
+    metrics_dir = Path(getattr(settings, 'METRICS_DIR', settings.BASE_DIR / 'metrics_data'))
+    metrics_dir.mkdir(parents=True, exist_ok=True)
+    return metrics_dir
+
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class MetricsRegistry:
+    """
+    Registro de métricas do processo atual.
+    
+    Cada worker acumula seus valores em memória e os grava periodicamente em
+    `<METRICS_DIR>/worker-<pid>-<início>.json` (escrita atômica; o horário de início
+    impede que um PID reutilizado sobrescreva o arquivo de outro processo). O
+    endpoint /metrics soma os arquivos de todos os workers, então qualquer worker
+    responde pelo conjunto. Na primeira gravação, o worker remove os arquivos de
+    processos encerrados.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        self.pid = os.getpid()
+        self.started_at = time.time()
+        self.counters = defaultdict(float)
+        self.histograms = {}
+        self.in_flight = 0
+        self.requests_handled = 0
+        self.last_flush = 0.0
+        self.pruned = False
+    
+    def _ensure_process(self):
+        # Após um fork (ex.: gunicorn --preload), o filho começa com registro vazio
+        if os.getpid() != self.pid:
+            self.reset()
+    
+    def inc(self, name, labels, value=1):
+        with self.lock:
+            self._ensure_process()
+            self.counters[(name, _labels_key(labels))] += value
+    
+    def observe(self, name, labels, value):
+        with self.lock:
+            self._ensure_process()
+            key = (name, _labels_key(labels))
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {
+                    'buckets': [0] * len(LATENCY_BUCKETS), 'sum': 0.0, 'count': 0
+                }
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound:
+                    histogram['buckets'][index] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+    
+    def request_started(self):
+        with self.lock:
+            self._ensure_process()
+            self.in_flight += 1
+    
+    def request_finished(self):
+        with self.lock:
+            self.in_flight -= 1
+            self.requests_handled += 1
+    
+    def snapshot(self):
+        with self.lock:
+            self._ensure_process()
+            return {
+                'pid': self.pid,
+                'started_at': self.started_at,
+                'updated_at': time.time(),
+                'gauges': {
+                    'worker_in_flight_requests': self.in_flight,
+                    'worker_requests_handled': self.requests_handled,
+                    'worker_max_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+                    'worker_start_time_seconds': self.started_at,
+                },
+                'counters': [
+                    [name, dict(labels), value] for (name, labels), value in self.counters.items()
+                ],
+                'histograms': [
+                    [name, dict(labels), histogram] for (name, labels), histogram in self.histograms.items()
+                ],
+            }
+    
+    def flush(self, force=False):
+        """
+        Grava o snapshot do worker no diretório compartilhado.
+        Fora do modo `force`, respeita o intervalo METRICS_FLUSH_INTERVAL.
+        """
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 1.0)
+        now = time.monotonic()
+        if not force and now - self.last_flush < interval:
+            return
+        self.last_flush = now
+        
+        data = self.snapshot()
+        if not self.pruned:
+            prune_dead_workers(data['pid'], data['started_at'])
+            self.pruned = True
+        path = get_metrics_dir() / worker_filename(data['pid'], data['started_at'])
+        tmp_path = path.with_suffix(f'.tmp{threading.get_ident()}')
+        tmp_path.write_text(json.dumps(data))
+        os.replace(tmp_path, path)
+
+
+registry = MetricsRegistry()
+
+
+def record_cache_access(hit, cache):
+    """Registra um acesso a um uso do cache (`cache`), para calcular a taxa de acerto."""
+    registry.inc('cache_requests_total', {'cache': cache, 'result': 'hit' if hit else 'miss'})
+
+
+def worker_filename(pid, started_at):
+    return f'worker-{pid}-{int(started_at * 1000)}.json'
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def prune_dead_workers(pid, started_at):
+    """
+    Remove os arquivos de workers encerrados e os de execuções anteriores do PID
+    `pid` (o worker atual, iniciado em `started_at`). Retorna o número de arquivos
+    removidos.
+    """
+    own = worker_filename(pid, started_at)
+    removed = 0
+    for path in get_metrics_dir().glob('worker-*.json'):
+        try:
+            file_pid = int(path.stem.split('-')[1])
+        except (IndexError, ValueError):
+            continue
+        if path.name == own or (file_pid != pid and _pid_alive(file_pid)):
+            continue
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            continue
+        removed += 1
+    return removed
+
+
+def collect():
+    """
+    Lê e agrega os arquivos de todos os workers.
+    
+    Contadores e histogramas de workers encerrados continuam somados até a
+    inicialização do próximo worker, que remove seus arquivos (o Prometheus trata a
+    queda como reinício do contador); gauges só são exibidos para workers vivos.
+    """
+    counters = defaultdict(float)
+    histograms = {}
+    workers = []
+    
+    for path in sorted(get_metrics_dir().glob('worker-*.json')):
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        
+        for name, labels, value in data['counters']:
+            counters[(name, _labels_key(labels))] += value
+        
+        for name, labels, histogram in data['histograms']:
+            key = (name, _labels_key(labels))
+            total = histograms.setdefault(key, {
+                'buckets': [0] * len(LATENCY_BUCKETS), 'sum': 0.0, 'count': 0
+            })
+            for index, count in enumerate(histogram['buckets']):
+                total['buckets'][index] += count
+            total['sum'] += histogram['sum']
+            total['count'] += histogram['count']
+        
+        if _pid_alive(data['pid']):
+            workers.append(data)
+    
+    return counters, histograms, workers
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _format_value(value):
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def render():
+    """
+    Gera o texto no formato de exposição do Prometheus (text/plain; version=0.0.4).
+    """
+    registry.flush(force=True)
+    counters, histograms, workers = collect()
+    lines = []
+    
+    by_name = defaultdict(list)
+    for (name, labels), value in counters.items():
+        by_name[name].append((labels, value))
+    
+    for name in sorted(by_name):
+        metric = f'{PREFIX}_{name}'
+        lines.append(f'# HELP {metric} {COUNTER_HELP.get(name, name)}')
+        lines.append(f'# TYPE {metric} counter')
+        for labels, value in sorted(by_name[name]):
+            lines.append(f'{metric}{_format_labels(labels)} {_format_value(value)}')
+    
+    # Taxa de acerto do cache derivada dos contadores
+    cache_totals = defaultdict(lambda: {'hit': 0.0, 'miss': 0.0})
+    for labels, value in by_name.get('cache_requests_total', []):
+        labels = dict(labels)
+        cache_totals[labels['cache']][labels['result']] += value
+    if cache_totals:
+        metric = f'{PREFIX}_cache_hit_ratio'
+        lines.append(f'# HELP {metric} Fração de acessos ao cache que resultaram em hit.')
+        lines.append(f'# TYPE {metric} gauge')
+        for cache, totals in sorted(cache_totals.items()):
+            total = totals['hit'] + totals['miss']
+            ratio = totals['hit'] / total if total else 0.0
+            lines.append(f'{metric}{_format_labels([("cache", cache)])} {_format_value(ratio)}')
+    
+    histogram_names = sorted({name for name, _ in histograms})
+    for name in histogram_names:
+        metric = f'{PREFIX}_{name}'
+        lines.append(f'# HELP {metric} {HISTOGRAM_HELP.get(name, name)}')
+        lines.append(f'# TYPE {metric} histogram')
+        for (hist_name, labels), histogram in sorted(histograms.items()):
+            if hist_name != name:
+                continue
+            for bound, count in zip(LATENCY_BUCKETS, histogram['buckets']):
+                bucket_labels = labels + (('le', repr(bound)),)
+                lines.append(f'{metric}_bucket{_format_labels(bucket_labels)} {count}')
+            lines.append(f'{metric}_bucket{_format_labels(labels + (("le", "+Inf"),))} {histogram["count"]}')
+            lines.append(f'{metric}_sum{_format_labels(labels)} {_format_value(histogram["sum"])}')
+            lines.append(f'{metric}_count{_format_labels(labels)} {histogram["count"]}')
+    
+    gauge_names = sorted({name for worker in workers for name in worker['gauges']})
+    for name in gauge_names:
+        metric = f'{PREFIX}_{name}'
+        lines.append(f'# TYPE {metric} gauge')
+        for worker in workers:
+            labels = [('pid', worker['pid'])]
+            lines.append(f'{metric}{_format_labels(labels)} {_format_value(worker["gauges"][name])}')
+    
+    metric = f'{PREFIX}_workers'
+    lines.append(f'# TYPE {metric} gauge')
+    lines.append(f'{metric} {len(workers)}')
+    
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,182 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .budgets import QueryBudgetExceeded, get_query_budget, is_strict
+from .metrics import registry
+
+logger = logging.getLogger('monitoring.requests')
+profile_logger = logging.getLogger('monitoring.profiling')
+
+
+class QueryCounter:
+    """
+    Wrapper de execução (connection.execute_wrapper) que conta consultas e tempo gasto no banco.
+    """
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+    
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class QueryBudgetMiddleware:
+    """
+    Middleware que mede as consultas SQL de cada requisição.
+    
+    Publica contagem e tempo no header Server-Timing, registra uma linha de log
+    estruturada e compara o total com o orçamento declarado pela view.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        counter = QueryCounter()
+        request.query_counter = counter
+        request.query_budget = None
+        start = time.perf_counter()
+        
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        
+        total = time.perf_counter() - start
+        response['Server-Timing'] = (
+            f'db;dur={counter.duration * 1000:.1f};desc="{counter.count} queries", '
+            f'app;dur={total * 1000:.1f}'
+        )
+        
+        budget = request.query_budget
+        over_budget = budget is not None and counter.count > budget
+        self.log_request(request, response, counter, total, budget, over_budget)
+        
+        if over_budget and is_strict():
+            raise QueryBudgetExceeded(
+                f'{request.method} {request.path} executou {counter.count} consultas '
+                f'(orçamento: {budget}).'
+            )
+        
+        return response
+    
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = get_query_budget(view_func)
+        return None
+    
+    def log_request(self, request, response, counter, total, budget, over_budget):
+        match = getattr(request, 'resolver_match', None)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'queries': counter.count,
+            'db_ms': round(counter.duration * 1000, 1),
+            'total_ms': round(total * 1000, 1),
+            'budget': budget,
+        }
+        level = logging.WARNING if over_budget else logging.INFO
+        logger.log(level, json.dumps(record))
+
+
+class ProfilingMiddleware:
+    """
+    Middleware de profiling sob demanda, restrito a usuários staff.
+    
+    Ativado pelo header `X-Profile: 1` ou pelo parâmetro `?profile=1` (outros valores
+    são ignorados). O cProfile só é carregado quando acionado; sem o gatilho, o custo
+    é a leitura do header e do parâmetro.
+    """
+    header = 'HTTP_X_PROFILE'
+    query_param = 'profile'
+    
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        if not self.is_triggered(request) or not self.is_staff(request):
+            return self.get_response(request)
+        
+        import cProfile
+        from .profiling import build_profile_path, rotate_profiles
+        
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        
+        path = build_profile_path(request)
+        profiler.dump_stats(path)
+        rotate_profiles()
+        
+        response['X-Profile-File'] = path.name
+        profile_logger.info(json.dumps({'path': request.path, 'profile': path.name}))
+        return response
+    
+    def is_triggered(self, request):
+        return request.META.get(self.header) == '1' or request.GET.get(self.query_param) == '1'
+    
+    def is_staff(self, request):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return user.is_staff
+        
+        # A API usa JWT, autenticado apenas dentro da view: valida o token aqui
+        from rest_framework.exceptions import AuthenticationFailed
+        from rest_framework_simplejwt.authentication import JWTAuthentication
+        from rest_framework_simplejwt.exceptions import InvalidToken
+        
+        try:
+            result = JWTAuthentication().authenticate(request)
+        except (AuthenticationFailed, InvalidToken):
+            return False
+        return bool(result and result[0].is_staff)
+
+
+class MetricsMiddleware:
+    """
+    Middleware que alimenta o registro de métricas exposto em /metrics.
+    
+    Deve ficar antes do QueryBudgetMiddleware para aproveitar a contagem de consultas.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        registry.request_started()
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            registry.request_finished()
+        duration = time.perf_counter() - start
+        
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name or 'unnamed') if match else 'unresolved'
+        registry.inc('http_requests_total', {
+            'view': view, 'method': request.method, 'status': str(response.status_code)
+        })
+        registry.observe('http_request_duration_seconds', {'view': view}, duration)
+        
+        counter = getattr(request, 'query_counter', None)
+        if counter is not None:
+            registry.inc('db_queries_total', {'view': view}, counter.count)
+            registry.inc('db_query_seconds_total', {'view': view}, counter.duration)
+        
+        registry.flush()
+        return response
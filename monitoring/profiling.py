@@ -0,0 +1,56 @@
+import hashlib
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.utils.text import slugify
+
+PROFILE_SUFFIX = '.prof'
+
+
+def get_profile_dir():
+    """Retorna o diretório de perfis, criando-o se necessário."""
+    profile_dir = Path(getattr(settings, 'PROFILING_DIR', settings.BASE_DIR / 'profiles'))
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    return profile_dir
+
+
+def request_fingerprint(request):
+    """
+    Gera um identificador curto para a requisição (método, caminho completo e usuário).
+    """
+    user = getattr(request, 'user', None)
+    user_id = getattr(user, 'pk', None) or ''
+    raw = f'{request.method}|{request.get_full_path()}|{user_id}'
+    return hashlib.sha1(raw.encode()).hexdigest()[:10]
+
+
+def build_profile_path(request):
+    """
+    Monta o caminho do arquivo .prof: timestamp, método, rota e fingerprint.
+    """
+    now = time.time()
+    timestamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(now)) + f'{int(now * 1000) % 1000:03d}'
+    route = slugify(request.path.replace('/', '-')) or 'root'
+    name = f'{timestamp}-{request.method.lower()}-{route}-{request_fingerprint(request)}{PROFILE_SUFFIX}'
+    return get_profile_dir() / name
+
+
+def list_profiles(profile_dir=None):
+    """Lista os arquivos de perfil, do mais recente para o mais antigo."""
+    profile_dir = Path(profile_dir or get_profile_dir())
+    profiles = [path for path in profile_dir.glob(f'*{PROFILE_SUFFIX}') if path.is_file()]
+    return sorted(profiles, key=lambda path: (path.stat().st_mtime, path.name), reverse=True)
+
+
+def rotate_profiles(max_files=None):
+    """
+    Mantém apenas os `max_files` perfis mais recentes no diretório.
+    """
+    if max_files is None:
+        max_files = getattr(settings, 'PROFILING_MAX_FILES', 50)
+    removed = 0
+    for path in list_profiles()[max_files:]:
+        path.unlink(missing_ok=True)
+        removed += 1
+    return removed
@@ -0,0 +1,112 @@
+"""
+Inicialização rápida dos workers.
+
+- `lazy_import`: módulos pesados e opcionais (NumPy, reportlab) só são carregados
+  no primeiro acesso a um atributo, não na importação do app.
+- `warm_up`: com STARTUP_WARMUP, o wsgi/asgi prepara o processo antes do primeiro
+  request: compila os padrões de URL, monta as tabelas de reverse e os campos dos
+  serializers das views (o que também preenche os caches de `_meta` dos modelos e
+  carrega os catálogos de tradução).
+- `parse_importtime`: leitura da saída de `python -X importtime`, usada pelo
+  comando `startup_benchmark`.
+"""
+import importlib.util
+import logging
+import re
+import sys
+import time
+
+from django.conf import settings
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+# Módulos que não devem ser carregados na inicialização do worker
+HEAVY_MODULES = ('numpy', 'reportlab', 'dateutil', 'pandas')
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$')
+
+
+def lazy_import(name):
+    """
+    Retorna o módulo `name` com carregamento adiado para o primeiro acesso a um
+    atributo, ou None se ele não estiver instalado (dependência opcional).
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        return None
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def iter_views(patterns):
+    """Views (funções ou classes) de todos os padrões de URL, recursivamente."""
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_views(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            # Compila a expressão regular do padrão (feita no primeiro acesso)
+            pattern.pattern.regex
+            callback = pattern.callback
+            yield getattr(callback, 'cls', None) or getattr(callback, 'view_class', None) or callback
+
+
+def build_fields(serializer, seen):
+    """Monta os campos do serializer e dos serializers aninhados."""
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    if not isinstance(serializer, serializers.Serializer) or type(serializer) in seen:
+        return
+    seen.add(type(serializer))
+    for field in serializer.fields.values():
+        build_fields(field, seen)
+
+
+def warm_up():
+    """
+    Resolve o URLconf e monta os campos dos serializers das views.
+    Retorna (views, serializers) aquecidos.
+    """
+    resolver = get_resolver()
+    # Tabelas de reverse e de namespaces (montadas no primeiro `reverse`)
+    resolver.reverse_dict
+    resolver.namespace_dict
+    
+    views = set(iter_views(resolver.url_patterns))
+    seen = set()
+    for view in views:
+        serializer_class = getattr(view, 'serializer_class', None)
+        if serializer_class is not None:
+            build_fields(serializer_class(), seen)
+    return len(views), len(seen)
+
+
+def warm_up_on_boot():
+    """Chamado pelo wsgi/asgi após criar a aplicação."""
+    if not settings.STARTUP_WARMUP:
+        return
+    started = time.perf_counter()
+    views, serializer_count = warm_up()
+    logger.info('Warm-up: %d views e %d serializers em %.0f ms',
+                views, serializer_count, (time.perf_counter() - started) * 1000)
+
+
+def parse_importtime(text):
+    """
+    Lê a saída de `-X importtime`. Retorna tuplas (módulo, próprio_us,
+    cumulativo_us, nível), onde nível 0 são as importações de primeiro nível.
+    """
+    rows = []
+    for line in text.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            own, cumulative, indent, module = match.groups()
+            rows.append((module, int(own), int(cumulative), (len(indent) - 1) // 2))
+    return rows
@@ -0,0 +1,248 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from authentication import blacklist
+
+from . import metrics
+from .budgets import QueryBudgetExceeded, get_query_budget, query_budget
+from .middleware import QueryBudgetMiddleware
+from .profiling import list_profiles
+from .startup import lazy_import, parse_importtime, warm_up
+
+User = get_user_model()
+
+
+@query_budget(0)
+def budgeted_view(request):
+    return HttpResponse('ok')
+
+
+class QueryBudgetMiddlewareTests(SimpleTestCase):
+    databases = ['default']
+    
+    def setUp(self):
+        self.factory = RequestFactory()
+    
+    def run_request(self, queries):
+        def get_response(request):
+            middleware.process_view(request, budgeted_view, (), {})
+            with connection.cursor() as cursor:
+                for _ in range(queries):
+                    cursor.execute('SELECT 1')
+            return budgeted_view(request)
+        
+        middleware = QueryBudgetMiddleware(get_response)
+        return middleware(self.factory.get('/'))
+    
+    def test_server_timing_header(self):
+        response = self.run_request(queries=0)
+        self.assertIn('desc="0 queries"', response['Server-Timing'])
+        self.assertIn('app;dur=', response['Server-Timing'])
+    
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_strict_mode_raises_when_over_budget(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.run_request(queries=1)
+    
+    def test_over_budget_only_logs_outside_strict_mode(self):
+        with self.assertLogs('monitoring.requests', level='WARNING'):
+            response = self.run_request(queries=2)
+        self.assertIn('desc="2 queries"', response['Server-Timing'])
+    
+    def test_budget_resolved_from_view_class(self):
+        from financial.views import FinancialMetricsView
+        self.assertEqual(get_query_budget(FinancialMetricsView.as_view()), 3)
+        self.assertIsNone(get_query_budget(lambda request: None))
+
+
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir)
+        self.settings_override = override_settings(
+            PROFILING_ENABLED=True, PROFILING_DIR=self.profile_dir, PROFILING_MAX_FILES=2
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.staff = User.objects.create_user(
+            username='admin', email='admin@example.com', password='senha-segura-123',
+            first_name='Admin', last_name='Staff', is_staff=True
+        )
+        self.regular = User.objects.create_user(
+            username='bia', email='bia@example.com', password='senha-segura-123',
+            first_name='Bia', last_name='Souza'
+        )
+    
+    def test_untriggered_request_is_not_profiled(self):
+        self.client.force_login(self.staff)
+        response = self.client.get('/api/auth/health/')
+        self.assertNotIn('X-Profile-File', response)
+        
+        # Apenas o valor 1 aciona o profiling
+        for query in ('profile=0', 'profile=', 'myprofile=1'):
+            response = self.client.get(f'/api/auth/health/?{query}')
+            self.assertNotIn('X-Profile-File', response)
+        response = self.client.get('/api/auth/health/', HTTP_X_PROFILE='0')
+        self.assertNotIn('X-Profile-File', response)
+        self.assertEqual(os.listdir(self.profile_dir), [])
+    
+    def test_non_staff_cannot_profile(self):
+        self.client.force_login(self.regular)
+        response = self.client.get('/api/auth/health/?profile=1')
+        self.assertNotIn('X-Profile-File', response)
+    
+    def test_staff_profile_is_written_and_rotated(self):
+        self.client.force_login(self.staff)
+        for _ in range(3):
+            response = self.client.get('/api/auth/health/', HTTP_X_PROFILE='1')
+            self.assertIn('X-Profile-File', response)
+        
+        self.assertEqual(len(list_profiles(self.profile_dir)), 2)
+        
+        out = StringIO()
+        call_command('profiles', '--latest', '--limit', '5', stdout=out)
+        self.assertIn(response['X-Profile-File'], out.getvalue())
+        self.assertIn('cumulative', out.getvalue())
+
+
+class MetricsEndpointTests(TestCase):
+    def setUp(self):
+        self.metrics_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.metrics_dir)
+        self.settings_override = override_settings(METRICS_DIR=self.metrics_dir, METRICS_TOKEN='')
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        metrics.registry.reset()
+        self.staff = User.objects.create_user(
+            username='admin', email='admin@example.com', password='senha-segura-123',
+            first_name='Admin', last_name='Staff', is_staff=True
+        )
+    
+    def test_exposes_per_view_counters_and_histograms(self):
+        self.client.force_login(self.staff)
+        self.client.get('/api/auth/health/')
+        self.client.get('/api/auth/health/')
+        
+        response = self.client.get('/metrics')
+        body = response.content.decode()
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn(
+            'gestor_http_requests_total{method="GET",status="200",view="authentication:health_check"} 2',
+            body
+        )
+        self.assertIn(
+            'gestor_http_request_duration_seconds_bucket{view="authentication:health_check",le="+Inf"} 2',
+            body
+        )
+        self.assertIn('gestor_db_queries_total{view="authentication:health_check"}', body)
+        self.assertIn(f'gestor_worker_in_flight_requests{{pid="{os.getpid()}"}} 1', body)
+    
+    def write_worker_file(self, pid, started_at=0, counters=(), gauges=None):
+        path = os.path.join(self.metrics_dir, metrics.worker_filename(pid, started_at))
+        with open(path, 'w') as handle:
+            json.dump({
+                'pid': pid,
+                'started_at': started_at,
+                'updated_at': 0,
+                'gauges': gauges or {},
+                'counters': list(counters),
+                'histograms': [],
+            }, handle)
+        return path
+    
+    def test_aggregates_files_from_other_workers(self):
+        metrics.registry.flush(force=True)
+        dead_pid = 2 ** 22 + 1
+        self.write_worker_file(dead_pid, gauges={'worker_in_flight_requests': 7},
+                               counters=[['cache_requests_total', {'cache': 'jwt_blacklist', 'result': 'hit'}, 3]])
+        metrics.record_cache_access(False, 'jwt_blacklist')
+        
+        body = metrics.render()
+        
+        self.assertIn('gestor_cache_requests_total{cache="jwt_blacklist",result="hit"} 3', body)
+        self.assertIn('gestor_cache_hit_ratio{cache="jwt_blacklist"} 0.75', body)
+        self.assertNotIn(f'pid="{dead_pid}"', body)
+        self.assertIn('gestor_workers 1', body)
+    
+    def test_new_worker_prunes_dead_and_reused_pid_files(self):
+        dead = self.write_worker_file(2 ** 22 + 1)
+        reused = self.write_worker_file(os.getpid(), started_at=1)
+        live = self.write_worker_file(os.getppid())
+        
+        metrics.registry.flush(force=True)
+        
+        self.assertFalse(os.path.exists(dead))
+        self.assertFalse(os.path.exists(reused))
+        self.assertTrue(os.path.exists(live))
+        own = metrics.worker_filename(os.getpid(), metrics.registry.started_at)
+        self.assertTrue(os.path.exists(os.path.join(self.metrics_dir, own)))
+    
+    def test_cache_paths_record_hits_and_misses(self):
+        jti = 'metrics-test-token'
+        blacklist.is_blacklisted(jti)
+        blacklist.blacklist(jti, timezone.now() + timedelta(hours=1))
+        blacklist.is_blacklisted(jti)
+        
+        self.assertIn('gestor_cache_hit_ratio{cache="jwt_blacklist"} 0.5', metrics.render())
+    
+    def test_without_token_only_staff_or_debug_can_read(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.client.force_login(User.objects.create_user(
+            username='bia', email='bia@example.com', password='senha-segura-123', first_name='Bia'
+        ))
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+        
+        self.client.logout()
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get('/metrics').status_code, 200)
+    
+    @override_settings(METRICS_TOKEN='segredo')
+    def test_token_is_required_when_configured(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer segredo')
+        self.assertEqual(response.status_code, 200)
+
+
+class StartupTests(SimpleTestCase):
+    def test_parse_importtime(self):
+        rows = parse_importtime(
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:        77 |         77 |   dateutil._common\n'
+            'import time:       124 |       7242 | dateutil.relativedelta\n'
+            'linha qualquer\n'
+        )
+        self.assertEqual(rows, [('dateutil._common', 77, 77, 1), ('dateutil.relativedelta', 124, 7242, 0)])
+    
+    def test_lazy_import(self):
+        self.assertIsNone(lazy_import('modulo_que_nao_existe'))
+        self.assertIs(lazy_import('json'), sys.modules['json'])
+    
+    def test_warm_up_covers_api_views_and_serializers(self):
+        views, serializers = warm_up()
+        self.assertGreater(views, 10)
+        self.assertGreater(serializers, 5)
+    
+    def test_benchmark_reports_no_heavy_modules_at_boot(self):
+        out = StringIO()
+        call_command('startup_benchmark', '--top', '3', stdout=out)
+        output = out.getvalue()
+        self.assertIn('Aplicação: backend.wsgi.application', output)
+        self.assertIn('django', output)
+        self.assertIn('Módulos pesados carregados no boot: nenhum', output)
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+from . import metrics
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Exposição das métricas no formato texto do Prometheus.
+    
+    Se METRICS_TOKEN estiver configurado, exige `Authorization: Bearer <token>`. Sem
+    token, as métricas só são servidas com DEBUG ativo ou para usuários staff
+    (sessão do admin).
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        header = request.META.get('HTTP_AUTHORIZATION', '')
+        if not constant_time_compare(header, f'Bearer {token}'):
+            return HttpResponseForbidden('Token de métricas inválido.')
+    elif not settings.DEBUG and not request.user.is_staff:
+        return HttpResponseForbidden('Defina METRICS_TOKEN para expor as métricas.')
+    
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')